@@ -0,0 +1,102 @@
+"""
+Runs the benchmark suite and compares it with a saved baseline.
+
+    $ python -m benchmarks --save        # record a baseline
+    $ python -m benchmarks               # compare against it
+
+Exits with a non-zero status if any benchmark is slower than its baseline by
+more than the threshold. Baselines depend on the machine, so they are not
+committed.
+"""
+from typing import Dict, List
+import argparse
+import fnmatch
+import json
+import os
+import sys
+
+from benchmarks.suite import GROUPS, Result
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    """
+    Reads a saved baseline
+    :param path: The baseline file
+    :return: The seconds per operation by benchmark name, empty if there is
+    no baseline
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict()
+
+
+def regressions(results: List[Result], baseline: Dict[str, float],
+                threshold: float) -> List[str]:
+    """
+    Finds the benchmarks which got slower than the threshold allows
+    :param results: The new results
+    :param baseline: The baseline seconds per operation by benchmark name
+    :param threshold: The allowed slowdown as a fraction of the baseline
+    :return: The names of the slower benchmarks
+    """
+    return [result.name for result in results
+            if result.name in baseline
+            and result.seconds > baseline[result.name] * (1 + threshold)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='The baseline file')
+    parser.add_argument('--save', action='store_true',
+                        help='Save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='The allowed slowdown as a fraction of the '
+                             'baseline')
+    parser.add_argument('--filter', default='*',
+                        help='Only run benchmarks matching a glob pattern')
+    parser.add_argument('--quick', action='store_true',
+                        help='Run fewer iterations, for a smoke test')
+    args = parser.parse_args()
+
+    scale = 0.1 if args.quick else 1.0
+    baseline = load_baseline(args.baseline)
+    results: List[Result] = []
+
+    def selected(name: str) -> bool:
+        return fnmatch.fnmatch(name, args.filter)
+
+    for group in GROUPS.values():
+        for result in group(scale, selected):
+            results.append(result)
+            line = f'{result.name:>28}: {result.seconds * 1e6:12.2f} us'
+
+            if result.name in baseline:
+                change = result.seconds / baseline[result.name] - 1
+                line += f'  {change:+7.1%}'
+
+            print(line, flush=True)
+
+    if args.save:
+        baseline.update((result.name, result.seconds) for result in results)
+
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+
+        print(f'Saved the baseline to {args.baseline}')
+        return
+
+    slower = regressions(results, baseline, args.threshold)
+
+    for name in slower:
+        print(f'{name} regressed by more than {args.threshold:.0%}')
+
+    sys.exit(1 if slower else 0)
+
+
+if __name__ == '__main__':
+    main()
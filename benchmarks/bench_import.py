@@ -0,0 +1,54 @@
+"""
+Measures how long importing the CLI takes, which dominates the startup time
+of short lived invocations such as ``pybunpro --help``.
+
+    $ python -m benchmarks.bench_import [--threshold MS]
+
+Exits with a non-zero status if the best time exceeds the threshold.
+"""
+import argparse
+import subprocess
+import sys
+
+TARGETS = ('pybunpro', 'pybunpro.__main__')
+
+
+def import_time(module: str) -> float:
+    """
+    Imports a module in a fresh interpreter
+    :param module: The module to import
+    :return: The cumulative import time in milliseconds
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             f'import {module}'],
+                            check=True, capture_output=True, text=True)
+
+    for line in reversed(result.stderr.splitlines()):
+        _, cumulative, name = line.split('|')
+
+        if name.strip() == module:
+            return int(cumulative) / 1000
+
+    raise RuntimeError(f'No import time reported for {module}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threshold', type=float, default=50,
+                        help='The maximum allowed import time in ms')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+
+    for module in TARGETS:
+        best = min(import_time(module) for _ in range(args.repeat))
+        status = 'ok' if best <= args.threshold else 'TOO SLOW'
+        failed = failed or best > args.threshold
+        print(f'{module:>18}: {best:8.2f} ms  {status}')
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares the installed JSON decoders on recent_items response bodies.
+
+    $ python -m benchmarks.bench_json
+"""
+import json
+import random
+import timeit
+
+from pybunpro.jsonlib import available_decoders
+
+GRAMMAR_POINTS = ['でも', 'から', 'ので', 'けど', 'ながら', 'たら', 'ば', 'なら',
+                  'ように', 'ために', 'ばかり', 'だけ', 'しか', 'ほど', 'くらい']
+
+
+def recent_items_body(count: int = 50, seed: int = 0) -> bytes:
+    """
+    Builds a realistic recent_items response body
+    :param count: The number of grammar points
+    :param seed: The random seed
+    :return: The encoded body
+    """
+    rng = random.Random(seed)
+    created = 1514235831
+
+    items = []
+    for _ in range(count):
+        created_at = created + rng.randint(0, 50000000)
+        items.append(dict(
+            grammar_point=rng.choice(GRAMMAR_POINTS),
+            created_at_date=created_at,
+            updated_at_date=created_at + rng.randint(0, 5000000)))
+
+    return json.dumps(dict(
+        user_information=dict(username='username', grammar_point_count=512,
+                              ghost_review_count=23, creation_date=created),
+        requested_information=items)).encode()
+
+
+def main() -> None:
+    body = recent_items_body()
+    number = 2000
+
+    print(f'Decoding a {len(body)} byte recent_items body with 50 items')
+
+    for name, loads in available_decoders().items():
+        best = min(timeit.repeat(lambda: loads(body), number=number,
+                                 repeat=5))
+        print(f'{name:>8}: {best / number * 1e6:8.2f} us/decode')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+The benchmarks run by ``python -m benchmarks``. Every benchmark measures
+seconds per operation, so lower is better.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, NamedTuple
+import json
+import subprocess
+import sys
+import timeit
+
+from benchmarks.bench_import import import_time
+from benchmarks.bench_json import recent_items_body
+
+#: Decides whether a benchmark runs, given its name
+Selected = Callable[[str], bool]
+
+#: The concurrency levels of the throughput curve
+CONCURRENCY = (1, 2, 4, 8, 16, 32)
+
+#: The simulated server latency of the throughput curve, in seconds
+CURVE_LATENCY = 0.02
+
+STUDY_QUEUE = dict(
+    user_information=dict(username='username', grammar_point_count=512,
+                          ghost_review_count=23, creation_date=1514235831),
+    requested_information=dict(reviews_available=7,
+                               next_review_date=1557279000,
+                               reviews_available_next_hour=8,
+                               reviews_available_next_day=12))
+
+
+class Result(NamedTuple):
+    """
+    The outcome of a benchmark
+    """
+    name: str
+    #: The best time per operation in seconds
+    seconds: float
+
+
+def best(func: Callable[[], object], number: int, repeat: int) -> float:
+    """
+    Times a function
+    :param func: The function
+    :param number: The number of calls per measurement
+    :param repeat: The number of measurements
+    :return: The best time per call in seconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+@contextmanager
+def stub_process(latency: float) -> Iterator[str]:
+    """
+    Runs the stub server in a separate process, so that serving requests
+    does not compete with the client for the GIL
+    :param latency: The latency of every response in seconds
+    :return: The base URL of the stub
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'pybunpro.stubserver', '--port', '0',
+         '--latency', str(latency), '--seed', '0'],
+        stdout=subprocess.PIPE, text=True)
+
+    try:
+        # The stub announces its URL once it is listening
+        assert process.stdout is not None
+        yield process.stdout.readline().split()[-1]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def schema_benchmarks(scale: float, selected: Selected) -> Iterator[Result]:
+    """
+    Times loading responses with the schemas and the fast decoders
+    :param scale: The fraction of the full number of iterations to run
+    :param selected: Whether to run a benchmark
+    """
+    from pybunpro.decoders import (_GRAMMAR_POINT_DECODER,
+                                   _STUDY_QUEUE_DECODER,
+                                   _USER_INFORMATION_DECODER)
+    from pybunpro.schemas import (GrammarPointSchema, StudyQueueSchema,
+                                  UserInformationSchema)
+
+    recent_items = json.loads(recent_items_body())
+    user_information = STUDY_QUEUE['user_information']
+    requested = STUDY_QUEUE['requested_information']
+    grammar_points = recent_items['requested_information']
+    number = max(int(2000 * scale), 1)
+
+    benchmarks = {
+        'schema.user_information':
+            lambda: UserInformationSchema().load(user_information),
+        'schema.study_queue':
+            lambda: StudyQueueSchema().load(requested),
+        'schema.grammar_points':
+            lambda: GrammarPointSchema(many=True).load(grammar_points),
+        'fast.user_information':
+            lambda: _USER_INFORMATION_DECODER.load(user_information),
+        'fast.study_queue':
+            lambda: _STUDY_QUEUE_DECODER.load(requested),
+        'fast.grammar_points':
+            lambda: _GRAMMAR_POINT_DECODER.load_many(grammar_points),
+    }
+
+    for name, func in benchmarks.items():
+        if selected(name):
+            yield Result(name, best(func, number, 5))
+
+
+def client_benchmarks(scale: float, selected: Selected) -> Iterator[Result]:
+    """
+    Times round-trips through the client against the local stub server, and
+    the time per request of study_queues at increasing concurrency. The
+    requests of the curve take CURVE_LATENCY and are served by another
+    process, so that it measures how well the client overlaps them rather
+    than contention for the GIL.
+    :param scale: The fraction of the full number of iterations to run
+    :param selected: Whether to run a benchmark
+    """
+    from pybunpro.client import BunproClient
+    from pybunpro.stubserver import StubServer
+
+    round_trip_names = [name for name in ('client.study_queue',
+                                          'client.recent_items',
+                                          'client.snapshot')
+                        if selected(name)]
+    concurrencies = [c for c in CONCURRENCY
+                     if selected(f'client.study_queues.c{c}')]
+    number = max(int(200 * scale), 1)
+
+    if round_trip_names:
+        with StubServer(seed=0) as stub, \
+                BunproClient(base_url=stub.url) as client:
+            round_trips: Dict[str, Callable[[], object]] = {
+                'client.study_queue':
+                    lambda: client.study_queue(api_key='key'),
+                'client.recent_items':
+                    lambda: client.recent_items(limit=50, api_key='key'),
+                'client.snapshot':
+                    lambda: client.snapshot(api_key='key', limit=50),
+            }
+
+            for name in round_trip_names:
+                yield Result(name, best(round_trips[name], number, 3))
+
+    if not concurrencies:
+        return
+
+    # Enough keys for every level to run several rounds of requests
+    rounds = max(int(8 * scale), 2)
+
+    with stub_process(CURVE_LATENCY) as url, \
+            BunproClient(pool_maxsize=max(CONCURRENCY),
+                         base_url=url) as client:
+        for concurrency in concurrencies:
+            keys = [f'key{i}' for i in range(concurrency * rounds)]
+            seconds = best(lambda: list(client.study_queues(keys,
+                                                            concurrency)),
+                           1, 3)
+            yield Result(f'client.study_queues.c{concurrency}',
+                         seconds / len(keys))
+
+
+def import_benchmarks(scale: float, selected: Selected) -> Iterator[Result]:
+    """
+    Times importing the CLI in a fresh interpreter
+    :param scale: The fraction of the full number of iterations to run
+    :param selected: Whether to run a benchmark
+    """
+    if not selected('import.cli'):
+        return
+
+    repeat = max(int(5 * scale), 1)
+    seconds = min(import_time('pybunpro.__main__') for _ in range(repeat))
+    yield Result('import.cli', seconds / 1000)
+
+
+#: Every group of benchmarks by name
+GROUPS = {
+    'schema': schema_benchmarks,
+    'client': client_benchmarks,
+    'import': import_benchmarks,
+}
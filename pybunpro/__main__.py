@@ -1,10 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import (TYPE_CHECKING, IO, Any, Dict, Iterable, Iterator,
+                    NoReturn, Optional)
 import logging
 import sys
 
 import click
 
-from pybunpro import BunproClient, BunproAPIError
+if TYPE_CHECKING:  # pragma: no cover
+    from pybunpro.client import BunproClient
+    from pybunpro.models import BulkResult
 
 logger = logging.getLogger(__name__)
 handler = logging.StreamHandler(sys.stdout)
@@ -15,60 +19,287 @@ logger.addHandler(handler)
 
 @dataclass
 class AppContext(object):
-    client: BunproClient
+    api_key: Optional[str]
+    api_key_file: Optional[IO[str]] = None
+    concurrency: int = 10
+    cache_path: Optional[str] = None
+    cache_ttl: float = 60
+    base_url: Optional[str] = None
+    timeout: Optional[float] = None
+    _client: Optional['BunproClient'] = field(default=None, repr=False)
+
+    @property
+    def client(self) -> 'BunproClient':
+        """
+        The client for the API key, created on first use so that --help and
+        argument errors do not pay for importing the HTTP stack
+        """
+        if self._client is None:
+            from pybunpro.cache import ValidatorCache
+            from pybunpro.client import DEFAULT_BASE_URL, BunproClient
+
+            cache = None
+
+            if self.cache_path is not None:
+                from pybunpro.sqlitecache import SQLiteCache
+
+                cache = SQLiteCache(self.cache_path, ttl=self.cache_ttl)
+
+            # Repeated polls can then be revalidated instead of re-parsed
+            self._client = BunproClient(self.api_key,
+                                        pool_maxsize=self.concurrency,
+                                        cache=cache,
+                                        validator_cache=ValidatorCache(16),
+                                        base_url=self.base_url
+                                        or DEFAULT_BASE_URL,
+                                        deadline=self.timeout)
+            logger.debug('Created bunpro client with key %s', self.api_key)
+
+        return self._client
+
+    @property
+    def batch(self) -> bool:
+        """
+        Whether the API keys are read from a file
+        """
+        return self.api_key_file is not None
+
+    def api_keys(self) -> Iterator[str]:
+        """
+        Reads the API keys from the key file, one per line, as they are needed
+        :return: The API keys
+        """
+        assert self.api_key_file is not None, 'Not reading keys from a file'
+
+        for line in self.api_key_file:
+            api_key = line.strip()
+
+            if api_key:
+                yield api_key
+
+    def close(self) -> None:
+        """
+        Closes the client's connections if it was created
+        """
+        if self._client is not None:
+            self._client.close()
 
 
 @click.group()
-@click.option('--api-key', required=True, help='The Bunpro API key to use')
+@click.option('--api-key', help='The Bunpro API key to use')
+@click.option('--api-key-file', type=click.File('r'),
+              help='Read API keys from a file, one per line, and write one '
+                   'record per key. Use - for stdin.')
+@click.option('--concurrency', type=click.IntRange(min=1), default=10,
+              show_default=True,
+              help='The maximum number of requests in flight with '
+                   '--api-key-file')
+@click.option('--cache', 'cache_path', type=click.Path(dir_okay=False),
+              envvar='PYBUNPRO_CACHE',
+              help='A SQLite file caching responses between runs')
+@click.option('--cache-ttl', type=float, default=60, show_default=True,
+              help='The number of seconds cached responses stay fresh')
+@click.option('--base-url', envvar='PYBUNPRO_BASE_URL',
+              help='The URL of the API, e.g. a local stub server')
+@click.option('--timeout', type=float,
+              help='The maximum number of seconds each request may take, '
+                   'including retries')
 @click.option('--debug', default=False, is_flag=True, help='Run in debug mode')
 @click.pass_context
 def cli(ctx, **kwargs):
     debug = kwargs.pop('debug')
     api_key = kwargs.pop('api_key')
+    api_key_file = kwargs.pop('api_key_file')
+    concurrency = kwargs.pop('concurrency')
+    cache_path = kwargs.pop('cache_path')
+    cache_ttl = kwargs.pop('cache_ttl')
+    base_url = kwargs.pop('base_url')
+    timeout = kwargs.pop('timeout')
+
+    if (api_key is None) == (api_key_file is None):
+        raise click.UsageError(
+            'Exactly one of --api-key and --api-key-file is required')
 
     if debug:
         logger.setLevel(logging.DEBUG)
         logger.debug('Debug Mode Enabled')
 
-    client = BunproClient(api_key)
-    logger.debug('Created bunpro client with key %s', api_key)
+    ctx.obj = AppContext(api_key, api_key_file, concurrency, cache_path,
+                         cache_ttl, base_url, timeout)
+    ctx.call_on_close(ctx.obj.close)
+
+
+#: The output formats of the commands. repr prints the models' reprs.
+FORMATS = ('repr', 'json', 'ndjson', 'csv')
+
+format_option = click.option(
+    '--format', 'output_format', type=click.Choice(FORMATS),
+    help='The output format. Defaults to repr, or ndjson with '
+         '--api-key-file.')
+
+
+def resolve_format(app_context: AppContext, output_format: Optional[str],
+                   watch: bool = False) -> str:
+    """
+    Picks the output format of a command
+    :param app_context: The application context
+    :param output_format: The requested format, if any
+    :param watch: Whether the command keeps polling
+    :return: The output format
+    :raises click.UsageError: If the format cannot be used
+    """
+    if output_format is None:
+        return 'ndjson' if app_context.batch else 'repr'
+
+    if app_context.batch and output_format == 'repr':
+        raise click.UsageError('--format repr cannot be used with '
+                               '--api-key-file')
+
+    if watch and output_format == 'json':
+        raise click.UsageError('--format json cannot be used with --watch, '
+                               'use ndjson instead')
+
+    return output_format
 
-    ctx.obj = AppContext(client)
+
+def write_records(records: Iterable[Dict[str, Any]], requested: str,
+                  output_format: str, many: bool, batch: bool) -> None:
+    """
+    Writes records to stdout as they are produced
+    :param records: The records
+    :param requested: The name of the requested information
+    :param output_format: The output format
+    :param many: Whether there may be more than one record
+    :param batch: Whether the records are bulk results
+    """
+    from pybunpro import output
+
+    if output_format == 'json':
+        count = output.write_json(records, sys.stdout, many=many)
+    elif output_format == 'csv':
+        count = output.write_csv(output.csv_rows(records, requested),
+                                 sys.stdout,
+                                 output.csv_columns(requested, batch))
+    else:
+        count = output.write_ndjson(records, sys.stdout)
+
+    logger.debug('Wrote %d records', count)
+
+
+def write_bulk_results(results: Iterable['BulkResult'], requested: str,
+                       output_format: str) -> None:
+    """
+    Writes one record per API key to stdout as the results arrive
+    :param results: The results of a bulk request
+    :param requested: The name of the requested information
+    :param output_format: The output format
+    """
+    from pybunpro.output import bulk_result_record
+
+    records = (bulk_result_record(result, requested) for result in results)
+    write_records(records, requested, output_format, many=True, batch=True)
+
+
+def fail(error: Exception) -> NoReturn:
+    """
+    Reports an API error or timeout and exits
+    :param error: The error
+    """
+    from pybunpro.errors import BunproAPIError
+
+    logger.debug('Raw Exception: %s', error)
+    click.echo('The following errors occurred:')
+    click.echo(error.errors if isinstance(error, BunproAPIError)
+               else [str(error)])
+    sys.exit(1)
 
 
 @click.command()
 @click.pass_obj
-def study_queue(app_context):
+@click.option('--watch', default=False, is_flag=True,
+              help='Keep polling and print the study queue when it changes')
+@click.option('--min-interval', type=float, default=30, show_default=True,
+              help='The minimum number of seconds between polls')
+@click.option('--max-interval', type=float, default=900, show_default=True,
+              help='The maximum number of seconds between polls')
+@format_option
+def study_queue(app_context, watch, min_interval, max_interval,
+                output_format):
+    from pybunpro.errors import BunproAPIError, BunproTimeoutError
+    from pybunpro.watch import watch_study_queue
+
+    if min_interval > max_interval:
+        raise click.UsageError('--min-interval must not be greater than '
+                               '--max-interval')
+
+    output_format = resolve_format(app_context, output_format, watch)
     client = app_context.client
+
+    if app_context.batch:
+        if watch:
+            raise click.UsageError('--watch cannot be used with '
+                                   '--api-key-file')
+
+        write_bulk_results(client.study_queues(app_context.api_keys(),
+                                               app_context.concurrency),
+                           'study_queue', output_format)
+        return
+
     try:
-        user_info, study_queue = client.study_queue()
-    except BunproAPIError as e:
-        logger.debug('Raw Exception: %s', e)
-        click.echo('The following errors occurred:')
-        click.echo(e.errors)
-        sys.exit(1)
+        if watch:
+            results = watch_study_queue(client, min_interval=min_interval,
+                                        max_interval=max_interval)
+        else:
+            results = [client.study_queue()]
+
+        if output_format == 'repr':
+            for user_info, study_queue in results:
+                click.echo(user_info)
+                click.echo(study_queue)
+        else:
+            from pybunpro.output import study_queue_record
 
-    click.echo(user_info)
-    click.echo(study_queue)
+            write_records((study_queue_record(*result) for result in results),
+                          'study_queue', output_format, many=watch,
+                          batch=False)
+    except (BunproAPIError, BunproTimeoutError) as e:
+        fail(e)
+    except KeyboardInterrupt:
+        logger.debug('Stopped watching')
 
 
 @click.command()
 @click.pass_obj
-@click.option('--limit', type=int,
+@click.option('--limit', type=click.IntRange(1, 50),
               help='The max number of items to return [1-50]')
-def recent_items(app_context, limit):
+@format_option
+def recent_items(app_context, limit, output_format):
+    from pybunpro.errors import BunproAPIError, BunproTimeoutError
+
+    output_format = resolve_format(app_context, output_format)
     client = app_context.client
 
+    if app_context.batch:
+        write_bulk_results(
+            client.recent_items_many(app_context.api_keys(), limit=limit,
+                                     concurrency=app_context.concurrency),
+            'recent_items', output_format)
+        return
+
     try:
         user_info, recent_items = client.recent_items(limit=limit)
-    except BunproAPIError as e:
-        logger.debug('Raw Exception: %s', e)
-        click.echo('The following errors occurred:')
-        click.echo(e.errors)
-        sys.exit(1)
-
-    click.echo(user_info)
-    click.echo(recent_items)
+    except (BunproAPIError, BunproTimeoutError) as e:
+        fail(e)
+
+    if output_format == 'repr':
+        click.echo(user_info)
+        click.echo(recent_items)
+        return
+
+    from pybunpro.output import recent_items_record
+
+    write_records([recent_items_record(user_info, recent_items)],
+                  'recent_items', output_format, many=False, batch=False)
 
 
 cli.add_command(study_queue)
@@ -0,0 +1,611 @@
+from itertools import islice
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, Iterable,
+                    List, Set, Tuple, Optional, Union)
+import asyncio
+import logging
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError('The asyncio client requires aiohttp. '
+                      'Install it with: pip install pybunpro[async]')
+
+from pybunpro.cache import Cache, ValidatorCache, CacheKey
+from pybunpro.client import (DEFAULT_BASE_URL, DEFAULT_RETRY_POLICY,
+                             _BaseClient, _Response)
+from pybunpro.errors import BunproAPIError, BunproTimeoutError
+from pybunpro.hedging import HedgePolicy
+from pybunpro.jsonlib import JSONDecoder
+from pybunpro.metrics import CACHE_HIT, MetricsSink, RequestMetrics
+from pybunpro.models import (UserInformation, StudyQueue, GrammarPoint,
+                             BulkResult, UserSnapshot)
+from pybunpro.ratelimit import RateLimiter, RetryPolicy
+from pybunpro.singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+async def _on_connection_queued_start(session, context, params) -> None:
+    context.queued_at = time.perf_counter()
+
+
+async def _on_connection_queued_end(session, context, params) -> None:
+    if context.trace_request_ctx is not None:
+        context.trace_request_ctx.queue_wait += \
+            time.perf_counter() - context.queued_at
+
+
+async def _on_connection_create_start(session, context, params) -> None:
+    context.connecting_at = time.perf_counter()
+
+
+async def _on_connection_create_end(session, context, params) -> None:
+    if context.trace_request_ctx is not None:
+        context.trace_request_ctx.connect = \
+            time.perf_counter() - context.connecting_at
+
+
+def _metrics_trace_config() -> aiohttp.TraceConfig:
+    """
+    Creates a trace config which adds the time spent waiting for a pooled
+    connection and opening a new one to the RequestMetrics passed as a
+    request's trace_request_ctx
+    :return: The trace config
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_queued_start.append(
+        _on_connection_queued_start)  # type: ignore
+    trace_config.on_connection_queued_end.append(
+        _on_connection_queued_end)  # type: ignore
+    trace_config.on_connection_create_start.append(
+        _on_connection_create_start)  # type: ignore
+    trace_config.on_connection_create_end.append(
+        _on_connection_create_end)  # type: ignore
+    return trace_config
+
+
+class AsyncBunproClient(_BaseClient):
+    """
+    Bunpro REST API Client for use with asyncio
+    """
+
+    def __init__(self, api_key: str = None, connection_limit: int = 100,
+                 connection_limit_per_host: int = 0,
+                 keep_alive: bool = True, cache: Cache = None,
+                 validator_cache: ValidatorCache = None,
+                 coalesce: bool = False, rate_limiter: RateLimiter = None,
+                 retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+                 fast_decode: bool = False,
+                 json_decoder: Union[str, JSONDecoder] = 'auto',
+                 base_url: str = DEFAULT_BASE_URL,
+                 metrics: MetricsSink = None,
+                 hedge_policy: HedgePolicy = None,
+                 connect_timeout: Optional[float] = 10,
+                 read_timeout: Optional[float] = 30,
+                 deadline: float = None):
+        """
+        :param api_key: The Bunpro API key to use
+        :param connection_limit: The maximum number of simultaneous
+        connections. 0 for no limit.
+        :param connection_limit_per_host: The maximum number of simultaneous
+        connections to a single host. 0 for no limit.
+        :param keep_alive: Whether to keep connections alive between requests
+        :param cache: An optional cache for parsed responses, either a
+        ResponseCache in memory or a SQLiteCache shared between processes.
+        Cached objects are shared between callers and should not be
+        modified.
+        :param validator_cache: An optional cache of ETag/Last-Modified
+        validators. Repeat requests are made conditional and unchanged
+        responses reuse the previously parsed objects.
+        :param coalesce: Whether concurrent identical calls should share a
+        single request
+        :param rate_limiter: An optional rate limiter. Calls wait until the
+        limiter allows them to be sent.
+        :param retry_policy: The policy for retrying requests rejected with
+        429 Too Many Requests or 503 Service Unavailable, or None to never
+        retry
+        :param fast_decode: Whether to build the models directly from the
+        responses, only checking that the required fields are present with
+        the right types, instead of loading them with the schemas
+        :param json_decoder: The JSON decoder used to parse response bodies:
+        'orjson', 'ujson', 'json', a function which parses bytes, or 'auto'
+        to use the fastest one installed
+        :param base_url: The URL of the API, e.g. to use a local stand-in
+        such as pybunpro.stubserver
+        :param metrics: An optional sink for the timings, sizes, status codes
+        and cache and retry outcomes of every call
+        :param hedge_policy: An optional policy for sending a duplicate of a
+        request which takes longer than usual, using whichever response
+        arrives first and cancelling the others. Duplicates are only sent if
+        the rate limiter allows them right away.
+        :param connect_timeout: The number of seconds to wait for a
+        connection, or None to wait forever
+        :param read_timeout: The number of seconds to wait for each read from
+        the server, or None to wait forever
+        :param deadline: The default number of seconds a call may take in
+        total, including rate limiting, retries and backoff, or None for no
+        limit. A call which passes its deadline is cancelled.
+        """
+        super().__init__(api_key, cache, validator_cache, rate_limiter,
+                         retry_policy, fast_decode, json_decoder, base_url,
+                         metrics, hedge_policy, connect_timeout, read_timeout,
+                         deadline)
+
+        self._single_flight = AsyncSingleFlight() if coalesce else None
+
+        self._connection_limit = connection_limit
+        self._connection_limit_per_host = connection_limit_per_host
+        self._keep_alive = keep_alive
+
+        # The session must be created from within a running event loop, so it
+        # is created on first use.
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        logger.debug('Initialized async client with base url: %s',
+                     self._user_base_url)
+
+    async def __aenter__(self) -> 'AsyncBunproClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Closes the client's pooled connections
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.debug('Closed client session')
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Gets the client's session, creating it if needed
+        :return: The session
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._connection_limit,
+                limit_per_host=self._connection_limit_per_host,
+                force_close=not self._keep_alive)
+            timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=self._connect_timeout,
+                sock_read=self._read_timeout)
+            trace_configs = [] if self._metrics is None else \
+                [_metrics_trace_config()]
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout,
+                trace_configs=trace_configs)
+
+        return self._session
+
+    async def _get(self, url: str, headers: Dict[str, str] = None,
+                   metrics: RequestMetrics = None) -> _Response:
+        """
+        Sends a GET request over the pooled session
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the call, if measured
+        :return: The response
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the server takes too long to respond
+        """
+        if metrics is not None:
+            metrics.connect = None
+
+        started = time.perf_counter()
+
+        try:
+            async with self._get_session().get(
+                    url, headers=headers,
+                    trace_request_ctx=metrics) as resp:  # type: ignore
+                received = time.perf_counter()
+                content = await resp.read()
+        except asyncio.TimeoutError as e:
+            logger.error('Request to %s timed out: %s', url, e)
+            raise BunproTimeoutError(f'Request timed out: {e}') from e
+
+        self._measure_response(metrics, resp.status, content, started,
+                               received)
+        logger.debug('GET request to %s', url)
+
+        try:
+            resp.raise_for_status()
+        except aiohttp.ClientResponseError as e:
+            logger.error('API Error: %s', e)
+
+            try:
+                # The body has already been read, so this does not need the
+                # connection
+                body = await resp.json(content_type=None)
+            except ValueError:
+                body = dict()
+
+            raise BunproAPIError(e, status_code=resp.status,
+                                 body=body, headers=resp.headers)
+
+        return _Response(resp.status, resp.headers, content)
+
+    async def _timed_get(self, policy: HedgePolicy, url: str,
+                         headers: Optional[Dict[str, str]],
+                         metrics: Optional[RequestMetrics]) -> _Response:
+        """
+        Sends a GET request and reports its latency to the hedge policy. A
+        request cancelled because another attempt won reports the time it
+        had taken so far, since it would have taken at least as long.
+        :param policy: The hedge policy
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the attempt, if measured
+        :return: The response
+        :raises BunproAPIError: If there is an error response from the API
+        """
+        started = time.perf_counter()
+
+        try:
+            response = await self._get(url, headers, metrics)
+        except asyncio.CancelledError:
+            policy.observe(time.perf_counter() - started)
+            raise
+
+        policy.observe(time.perf_counter() - started)
+        return response
+
+    async def _hedged_get(self, policy: HedgePolicy, api_key: str, url: str,
+                          headers: Optional[Dict[str, str]],
+                          metrics: Optional[RequestMetrics]) -> _Response:
+        """
+        Sends a GET request, sending duplicates if it takes longer than the
+        hedge policy's delay, and returns the first successful response
+        :param policy: The hedge policy
+        :param api_key: The API key the request is for
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the call, if measured
+        :return: The response
+        :raises BunproAPIError: If every attempt failed with an error
+        response from the API
+        """
+        attempt = self._attempt_metrics(metrics)
+        task: asyncio.Future = asyncio.ensure_future(
+            self._timed_get(policy, url, headers, attempt))
+        sent: Dict[asyncio.Future, Optional[RequestMetrics]] = {task: attempt}
+        pending: Set[asyncio.Future] = {task}
+        failed: List[asyncio.Future] = []
+        hedging = True
+
+        try:
+            while pending:
+                timeout = policy.delay() if hedging else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is None:
+                        self._merge_attempt(metrics, sent[task], len(sent))
+                        return task.result()
+
+                    failed.append(task)
+
+                if done:
+                    continue
+
+                hedging = self._can_hedge(api_key)
+
+                if hedging:
+                    logger.debug('No response after %.3fs, hedging', timeout)
+                    attempt = self._attempt_metrics(metrics)
+                    task = asyncio.ensure_future(
+                        self._timed_get(policy, url, headers, attempt))
+                    sent[task] = attempt
+                    pending.add(task)
+                    hedging = len(sent) <= policy.max_hedges
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Every attempt failed, so the first failure is reported
+        self._merge_attempt(metrics, sent[failed[0]], len(sent))
+        error = failed[0].exception()
+        assert error is not None
+        raise error
+
+    async def _send(self, api_key: str, url: str,
+                    headers: Optional[Dict[str, str]],
+                    metrics: Optional[RequestMetrics]) -> _Response:
+        """
+        Sends a GET request, hedging it if there is a hedge policy
+        :param api_key: The API key the request is for
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the call, if measured
+        :return: The response
+        :raises BunproAPIError: If there is an error response from the API
+        """
+        policy = self._hedge_policy
+
+        if policy is None:
+            return await self._get(url, headers, metrics)
+
+        return await self._hedged_get(policy, api_key, url, headers, metrics)
+
+    async def _fetch(self, api_key: str, url: str,
+                     parse: Callable[[dict], tuple],
+                     metrics: RequestMetrics = None,
+                     deadline_at: float = None) -> tuple:
+        """
+        Requests and parses a URL, revalidating the last response if possible
+        and retrying if the request is rejected
+        :param api_key: The API key the request is for
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The parsed response
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the call would pass its deadline
+        :raises SchemaError: If the response cannot be parsed
+        """
+        validators = self._validators_for(url)
+        headers = validators.request_headers() if validators else None
+        attempt = 0
+
+        while True:
+            if self._rate_limiter is not None:
+                waited = time.perf_counter()
+                acquired = await self._rate_limiter.acquire_async(
+                    api_key, self._remaining(deadline_at))
+
+                if metrics is not None:
+                    metrics.queue_wait += time.perf_counter() - waited
+
+                if not acquired:
+                    raise BunproTimeoutError('The deadline would pass before '
+                                             'the rate limiter allowed the '
+                                             'request')
+
+            try:
+                response = await self._send(api_key, url, headers, metrics)
+                break
+            except BunproAPIError as e:
+                delay = self._retry_delay(e, attempt, deadline_at)
+
+                if delay is None:
+                    raise
+
+                await asyncio.sleep(delay)
+                attempt += 1
+
+                if metrics is not None:
+                    metrics.retry_wait += delay
+
+        return self._decode(url, response, validators, parse, metrics)
+
+    async def _load(self, key: CacheKey, url: str,
+                    parse: Callable[[dict], tuple],
+                    metrics: RequestMetrics = None,
+                    deadline_at: float = None) -> tuple:
+        """
+        Fetches a URL and caches the parsed response
+        :param key: The cache key
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The parsed response
+        """
+        result = await self._fetch(key[0], url, parse, metrics, deadline_at)
+        self._cache_set(key, result)
+        return result
+
+    async def _within(self, awaitable: Awaitable[Any],
+                      deadline_at: Optional[float]) -> Any:
+        """
+        Awaits an awaitable, cancelling it if it passes a deadline
+        :param awaitable: The awaitable
+        :param deadline_at: The deadline by time.monotonic, if any
+        :return: The awaitable's result
+        :raises BunproTimeoutError: If the deadline passes first
+        """
+        if deadline_at is None:
+            return await awaitable
+
+        try:
+            return await asyncio.wait_for(awaitable,
+                                          self._remaining(deadline_at))
+        except BunproTimeoutError:
+            raise
+        except asyncio.TimeoutError as e:
+            raise BunproTimeoutError('The deadline passed') from e
+
+    async def _call(self, key: CacheKey, url: str,
+                    parse: Callable[[dict], tuple],
+                    deadline: float = None) -> Any:
+        """
+        Gets a parsed response from the cache, an identical in-flight call,
+        or the API
+        :param key: The cache key
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+        :return: The parsed response
+        """
+        metrics = self._start_metrics(key)
+        started = time.perf_counter()
+        deadline_at = self._deadline_at(deadline)
+
+        try:
+            result = self._cache_get(key)
+
+            if result is not None:
+                if metrics is not None:
+                    metrics.outcome = CACHE_HIT
+            elif self._single_flight is None:
+                result = await self._within(
+                    self._load(key, url, parse, metrics, deadline_at),
+                    deadline_at)
+            else:
+                # The shared call is shielded, so a caller passing its
+                # deadline does not cancel it for the others
+                result = await self._within(
+                    self._single_flight.do(
+                        key, lambda: self._load(key, url, parse, metrics,
+                                                deadline_at)),
+                    deadline_at)
+        except Exception as e:
+            self._record_metrics(metrics, started, e)
+            raise
+
+        self._record_metrics(metrics, started)
+        return result
+
+    async def study_queue(self, api_key: str = None,
+                          deadline: float = None) \
+            -> Tuple[UserInformation, StudyQueue]:
+        """
+        Gets the user's study queue
+        :param api_key: The API key to use
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+
+        :return: The user info and study queue
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the call takes too long
+        :raises SchemaError: If the response cannot be parsed
+        """
+        url = self._study_queue_url(api_key)
+        key = self._cache_key('study_queue', api_key)
+        return await self._call(key, url, self._parse_study_queue, deadline)
+
+    async def recent_items(self, limit: int = None, api_key: str = None,
+                           deadline: float = None) \
+            -> Tuple[UserInformation, List[GrammarPoint]]:
+        """
+        Gets the recently added grammer
+
+        :param limit: The maximum number of items to return. 1 to 50 inclusive.
+        :param api_key: The API key to use
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+        :return: The user information and recent grammar points
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the call takes too long
+        :raises SchemaError: If the response cannot be parsed
+        """
+        url = self._recent_items_url(limit, api_key)
+        key = self._cache_key('recent_items', api_key, limit)
+        return await self._call(key, url, self._parse_recent_items,
+                                deadline)
+
+    async def snapshot(self, api_key: str = None, limit: int = None,
+                       deadline: float = None) -> UserSnapshot:
+        """
+        Gets the user's study queue and recent grammar with concurrent
+        requests, parsing the user information they share only once
+
+        :param api_key: The API key to use
+        :param limit: The maximum number of recent items to return. 1 to 50
+        inclusive.
+        :param deadline: The number of seconds each request may take, or None
+        to use the client's default
+        :return: The user information, study queue and recent grammar points
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If a request takes too long
+        :raises SchemaError: If a response cannot be parsed
+        """
+        study_queue_url = self._study_queue_url(api_key)
+        recent_items_url = self._recent_items_url(limit, api_key)
+        parse_study_queue, parse_recent_items = self._snapshot_parsers()
+
+        study_queue = asyncio.ensure_future(self._call(
+            self._cache_key('study_queue', api_key), study_queue_url,
+            parse_study_queue, deadline))
+        recent_items = asyncio.ensure_future(self._call(
+            self._cache_key('recent_items', api_key, limit),
+            recent_items_url, parse_recent_items, deadline))
+
+        try:
+            await asyncio.gather(study_queue, recent_items)
+        finally:
+            # If one request failed or the caller was cancelled, the other
+            # request is no longer needed
+            study_queue.cancel()
+            recent_items.cancel()
+
+        return self._snapshot(study_queue.result(), recent_items.result())
+
+    def study_queues(self, api_keys: Iterable[str], concurrency: int = 10) \
+            -> AsyncIterator[BulkResult]:
+        """
+        Gets the study queues of many users concurrently
+
+        :param api_keys: The API keys to fetch. Consumed lazily.
+        :param concurrency: The maximum number of requests in flight
+        :return: An async iterator of results in order of completion
+        """
+        return self._bulk(lambda key: self.study_queue(api_key=key),
+                          api_keys, concurrency)
+
+    def recent_items_many(self, api_keys: Iterable[str], limit: int = None,
+                          concurrency: int = 10) \
+            -> AsyncIterator[BulkResult]:
+        """
+        Gets the recently added grammar of many users concurrently
+
+        :param api_keys: The API keys to fetch. Consumed lazily.
+        :param limit: The maximum number of items to return per user
+        :param concurrency: The maximum number of requests in flight
+        :return: An async iterator of results in order of completion
+        """
+        return self._bulk(
+            lambda key: self.recent_items(limit=limit, api_key=key),
+            api_keys, concurrency)
+
+    async def _bulk(self, fetch: Callable[[str], Awaitable[tuple]],
+                    api_keys: Iterable[str], concurrency: int) \
+            -> AsyncIterator[BulkResult]:
+        """
+        Runs a request for each API key as a bounded set of tasks, yielding
+        results as they complete. At most concurrency keys are pulled from
+        api_keys ahead of the results, so memory use does not grow with the
+        number of keys.
+        :param fetch: Performs the request for a single API key
+        :param api_keys: The API keys to fetch
+        :param concurrency: The maximum number of requests in flight
+        :return: An async iterator of results in order of completion
+        """
+        self._check_concurrency(concurrency)
+        keys = iter(api_keys)
+
+        pending: Dict[asyncio.Future, str] = {
+            asyncio.ensure_future(fetch(key)): key
+            for key in islice(keys, concurrency)}
+
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for key in islice(keys, len(done)):
+                    pending[asyncio.ensure_future(fetch(key))] = key
+
+                for task in done:
+                    api_key = pending.pop(task)
+                    error = task.exception()
+
+                    if error is None:
+                        yield self._bulk_result(api_key, task.result())
+                    elif isinstance(error, Exception):
+                        yield self._bulk_result(api_key, error=error)
+                    else:
+                        # e.g. KeyboardInterrupt, which should not be
+                        # reported as one key's failure
+                        raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,234 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Sequence, Tuple, Union
+import logging
+import time
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    raise ImportError('The analytics module requires NumPy. '
+                      'Install it with: pip install pybunpro[analytics]')
+
+from pybunpro.models import StudyQueue
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+#: The fields analysed, named as in the snapshot log
+FIELDS = ('next_review', 'reviews_available', 'next_hour', 'next_day')
+
+#: The review count fields
+COUNTS = ('reviews_available', 'next_hour', 'next_day')
+
+#: The structured dtype of study queue arrays
+STUDY_QUEUE_DTYPE = np.dtype([('next_review', '<f8'),
+                              ('reviews_available', '<u4'),
+                              ('next_hour', '<u4'), ('next_day', '<u4')])
+
+#: Study queues as a sequence of StudyQueue instances, or a structured array
+#: with the FIELDS such as the snapshots read from a SnapshotLog
+StudyQueues = Union[Iterable[StudyQueue], np.ndarray]
+
+
+@dataclass
+class Forecast(object):
+    """
+    The number of reviews expected to be available over time, summed over
+    every user and at percentiles across users
+    """
+    #: The number of seconds from now of each point of the curves
+    times: np.ndarray
+    #: The total number of reviews available at each time
+    total: np.ndarray
+    #: The per-user number of reviews available at each time, keyed by
+    #: percentile
+    percentiles: Dict[float, np.ndarray] = field(default_factory=dict)
+
+
+def study_queue_array(study_queues: Iterable[StudyQueue]) -> np.ndarray:
+    """
+    Converts study queues to a structured array with the FIELDS
+    :param study_queues: The study queues
+    :return: The array
+    """
+    return np.array([(q.next_review_timestamp, q.reviews_available,
+                      q.reviews_available_next_hour,
+                      q.reviews_available_next_day) for q in study_queues],
+                    dtype=STUDY_QUEUE_DTYPE)
+
+
+def _columns(study_queues: StudyQueues) -> np.ndarray:
+    """
+    Gets study queues as a structured array with the FIELDS
+    :param study_queues: The study queues
+    :return: The array
+    :raises ValueError: If an array is missing a field
+    """
+    if isinstance(study_queues, np.ndarray):
+        missing = set(FIELDS) - set(study_queues.dtype.names or ())
+
+        if missing:
+            raise ValueError(f'Missing fields: {", ".join(sorted(missing))}')
+
+        return study_queues
+
+    return study_queue_array(study_queues)
+
+
+def latest_per_user(snapshots: np.ndarray) -> np.ndarray:
+    """
+    Selects the latest snapshot of every user from snapshots read from a
+    SnapshotLog
+    :param snapshots: The snapshots
+    :return: The latest snapshot of each user, ordered by user id
+    """
+    order = np.lexsort((snapshots['epoch'], snapshots['user']))
+    users = snapshots['user'][order]
+
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = users[1:] != users[:-1]
+    return snapshots[order[last]]
+
+
+def next_review_in(study_queues: StudyQueues, now: float = None) \
+        -> np.ndarray:
+    """
+    Calculates how long each user has until their next review
+    :param study_queues: The study queues
+    :param now: The current time in seconds since the epoch, defaults to now
+    :return: The number of seconds until each user's next review, or 0 if it
+    is due
+    """
+    if now is None:
+        now = time.time()
+
+    return np.maximum(_columns(study_queues)['next_review'] - now, 0)
+
+
+def histogram(study_queues: StudyQueues, field: str = 'reviews_available',
+              bins: Union[int, Sequence[float]] = 10) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts the users by the value of a field
+    :param study_queues: The study queues
+    :param field: The field to count by, one of COUNTS
+    :param bins: The number of equal width bins, or the bin edges
+    :return: The number of users in each bin and the bin edges
+    """
+    if field not in COUNTS:
+        raise ValueError(f'Cannot make a histogram of {field}')
+
+    return np.histogram(_columns(study_queues)[field], bins=bins)
+
+
+def percentiles(study_queues: StudyQueues,
+                q: Sequence[float] = (50, 90, 99)) -> Dict[str, np.ndarray]:
+    """
+    Calculates percentiles of the review counts across users
+    :param study_queues: The study queues
+    :param q: The percentiles to calculate, between 0 and 100
+    :return: The percentiles of each of the COUNTS, in the order of q
+    """
+    columns = _columns(study_queues)
+    return {name: np.percentile(columns[name], q) for name in COUNTS}
+
+
+class _Curves(object):
+    """
+    Estimates how many reviews each user will have available over time.
+    The count stays at reviews_available until the next review is due, then
+    rises linearly to reviews_available_next_hour an hour from now and to
+    reviews_available_next_day a day from now, never decreasing.
+    """
+
+    def __init__(self, columns: np.ndarray, now: float):
+        """
+        :param columns: The study queues
+        :param now: The current time in seconds since the epoch
+        """
+        self.available = columns['reviews_available'].astype(np.float64)
+        self.next_hour = np.maximum(columns['next_hour'], self.available)
+        self.next_day = np.maximum(columns['next_day'], self.next_hour)
+        self.due_in = np.clip(columns['next_review'] - now, 0, HOUR)
+
+        # The rate each user's count rises at during the first hour
+        rising = HOUR - self.due_in
+        self.slope = np.divide(self.next_hour - self.available, rising,
+                               out=np.zeros_like(rising), where=rising > 0)
+
+    def at(self, t: float) -> np.ndarray:
+        """
+        Estimates every user's count at a point in time
+        :param t: The number of seconds from now
+        :return: The count of each user
+        """
+        if t >= HOUR:
+            return self.next_hour + (self.next_day - self.next_hour) * \
+                min((t - HOUR) / (DAY - HOUR), 1.0)
+
+        return self.available + self.slope * np.maximum(t - self.due_in, 0)
+
+    def total(self, times: np.ndarray) -> np.ndarray:
+        """
+        Sums the counts of every user at many points in time, in
+        O((users + times) log users) rather than building the count of
+        every user at every time
+        :param times: The number of seconds from now of each point
+        :return: The total count at each time
+        """
+        # Within the first hour each user contributes available plus
+        # slope * (t - due_in) once t has passed due_in, so the total is
+        # the sum of available plus t * sum(slope) - sum(slope * due_in)
+        # over the users whose review is due before t
+        order = np.argsort(self.due_in, kind='stable')
+        due_in = self.due_in[order]
+        slope = np.concatenate(([0.0], np.cumsum(self.slope[order])))
+        offset = np.concatenate(
+            ([0.0], np.cumsum(self.slope[order] * due_in)))
+        due = np.searchsorted(due_in, times, side='left')
+        first_hour = (self.available.sum() + times * slope[due]
+                      - offset[due])
+
+        hour_total = self.next_hour.sum()
+        rest_of_day = hour_total + (self.next_day.sum() - hour_total) * \
+            np.clip((times - HOUR) / (DAY - HOUR), 0, 1)
+
+        return np.where(times < HOUR, first_hour, rest_of_day)
+
+
+def forecast(study_queues: StudyQueues, now: float = None,
+             horizon: float = DAY, step: float = HOUR,
+             q: Sequence[float] = ()) -> Forecast:
+    """
+    Forecasts how many reviews will be available over the next day.
+    Each user's count stays at reviews_available until their next review is
+    due, then rises linearly to reviews_available_next_hour an hour from now
+    and to reviews_available_next_day a day from now.
+    :param study_queues: The study queues
+    :param now: The time the study queues were fetched in seconds since the
+    epoch, defaults to now
+    :param horizon: How far to forecast, in seconds
+    :param step: The number of seconds between points of the curves
+    :param q: The percentiles across users to forecast, between 0 and 100.
+    Each costs a pass over the users per point.
+    :return: The forecast
+    """
+    if now is None:
+        now = time.time()
+
+    columns = _columns(study_queues)
+    times = np.arange(0, horizon + step, step, dtype=np.float64)
+    curves = _Curves(columns, now)
+
+    result = Forecast(times, curves.total(times))
+
+    if len(q) and len(columns):
+        at = np.array([np.percentile(curves.at(t), q) for t in times])
+
+        for i, percentile in enumerate(q):
+            result.percentiles[percentile] = at[:, i]
+
+    return result
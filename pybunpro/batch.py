@@ -0,0 +1,184 @@
+from array import array
+from typing import Iterable, Iterator, List, Sequence, Union, overload
+import sys
+
+from pybunpro.errors import SchemaError
+from pybunpro.models import GrammarPoint
+
+
+def _readonly(values: array) -> memoryview:
+    """
+    Exposes an array as a read-only buffer, without copying it where
+    memoryview.toreadonly is available (Python 3.8+)
+    :param values: The array
+    :return: The read-only view
+    """
+    if sys.version_info >= (3, 8):
+        return memoryview(values).toreadonly()
+
+    return memoryview(values.tobytes()).cast(values.typecode)
+
+
+class GrammarPointBatch(Sequence[GrammarPoint]):
+    """
+    A compact, column oriented sequence of grammar points.
+    The grammar points are stored as interned strings and the creation and
+    update dates as arrays of epoch seconds, instead of one object with two
+    datetimes per grammar point. Indexing builds GrammarPoint instances with
+    lazy timestamps on demand, and the epoch columns can be used directly,
+    e.g. with ``numpy.asarray(batch.created_at_epochs)``, without creating
+    any.
+    """
+    __slots__ = ('_grammar_points', '_created_at', '_updated_at')
+
+    def __init__(self, grammar_points: Iterable[str] = (),
+                 created_at_epochs: Iterable[float] = (),
+                 updated_at_epochs: Iterable[float] = ()):
+        """
+        :param grammar_points: The grammar points
+        :param created_at_epochs: When each grammar point was added, in
+        seconds since the epoch
+        :param updated_at_epochs: When each grammar point was last updated, in
+        seconds since the epoch
+        :raises ValueError: If the columns have different lengths
+        """
+        self._grammar_points: List[str] = [sys.intern(g)
+                                           for g in grammar_points]
+        self._created_at = array('d', created_at_epochs)
+        self._updated_at = array('d', updated_at_epochs)
+
+        if not (len(self._grammar_points) == len(self._created_at)
+                == len(self._updated_at)):
+            raise ValueError('All columns must have the same length')
+
+    @classmethod
+    def from_grammar_points(cls, grammar_points: Iterable[GrammarPoint]) \
+            -> 'GrammarPointBatch':
+        """
+        Creates a batch from grammar points
+        :param grammar_points: The grammar points
+        :return: The batch
+        """
+        batch = cls()
+        batch.extend(grammar_points)
+        return batch
+
+    @classmethod
+    def from_json(cls, items: List[dict]) -> 'GrammarPointBatch':
+        """
+        Creates a batch directly from the requested_information of a recent
+        items response, without creating any GrammarPoint instances
+        :param items: The decoded grammar points
+        :return: The batch
+        :raises SchemaError: If an item is missing a field
+        """
+        try:
+            return cls([item['grammar_point'] for item in items],
+                       [item['created_at_date'] for item in items],
+                       [item['updated_at_date'] for item in items])
+        except (KeyError, TypeError) as e:
+            raise SchemaError('An error occurred parsing the recent items '
+                              'information', {'_schema': [str(e)]})
+
+    def append(self, grammar_point: GrammarPoint) -> None:
+        """
+        Adds a grammar point to the end of the batch
+        :param grammar_point: The grammar point
+        """
+        self._grammar_points.append(sys.intern(grammar_point.grammar_point))
+        self._created_at.append(grammar_point.created_at_timestamp)
+        self._updated_at.append(grammar_point.updated_at_timestamp)
+
+    def extend(self, grammar_points: Iterable[GrammarPoint]) -> None:
+        """
+        Adds grammar points to the end of the batch
+        :param grammar_points: The grammar points
+        """
+        for grammar_point in grammar_points:
+            self.append(grammar_point)
+
+    @property
+    def grammar_points(self) -> Sequence[str]:
+        """
+        The grammar point of every item
+        """
+        return tuple(self._grammar_points)
+
+    @property
+    def created_at_epochs(self) -> memoryview:
+        """
+        When every item was added, in seconds since the epoch
+        """
+        return _readonly(self._created_at)
+
+    @property
+    def updated_at_epochs(self) -> memoryview:
+        """
+        When every item was last updated, in seconds since the epoch
+        """
+        return _readonly(self._updated_at)
+
+    def updated_since(self, epoch: float) -> 'GrammarPointBatch':
+        """
+        Selects the items updated after a point in time
+        :param epoch: The point in time in seconds since the epoch
+        :return: A batch of the matching items
+        """
+        indices = [i for i, updated_at in enumerate(self._updated_at)
+                   if updated_at > epoch]
+        return self._take(indices)
+
+    def latest_update(self) -> float:
+        """
+        Finds when the most recently updated item was updated
+        :return: The update time in seconds since the epoch
+        :raises ValueError: If the batch is empty
+        """
+        return max(self._updated_at)
+
+    def _take(self, indices: Iterable[int]) -> 'GrammarPointBatch':
+        """
+        Creates a batch of the items at the given indices
+        :param indices: The indices to take
+        :return: The new batch
+        """
+        indices = list(indices)
+        return GrammarPointBatch([self._grammar_points[i] for i in indices],
+                                 [self._created_at[i] for i in indices],
+                                 [self._updated_at[i] for i in indices])
+
+    @overload
+    def __getitem__(self, index: int) -> GrammarPoint:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> 'GrammarPointBatch':
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) \
+            -> Union[GrammarPoint, 'GrammarPointBatch']:
+        if isinstance(index, slice):
+            return self._take(range(*index.indices(len(self))))
+
+        # The dates accept timestamps, which are converted when read
+        return GrammarPoint(self._grammar_points[index],
+                            self._created_at[index],  # type: ignore
+                            self._updated_at[index])  # type: ignore
+
+    def __iter__(self) -> Iterator[GrammarPoint]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        return len(self._grammar_points)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GrammarPointBatch):
+            return NotImplemented
+
+        return (self._grammar_points == other._grammar_points
+                and self._created_at == other._created_at
+                and self._updated_at == other._updated_at)
+
+    def __repr__(self) -> str:
+        return f'GrammarPointBatch(<{len(self)} grammar points>)'
@@ -0,0 +1,234 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: A cache key of (api_key, endpoint, limit)
+CacheKey = Tuple[str, str, Optional[int]]
+
+
+@dataclass
+class CacheStats(object):
+    """
+    Counters describing how a cache has been used
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+
+class Cache(ABC):
+    """
+    A cache of parsed API responses used by the clients
+    """
+
+    @abstractmethod
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """
+        Gets a fresh entry from the cache
+        :param key: The cache key
+        :return: The cached value, or None if it is missing or expired
+        """
+
+    @abstractmethod
+    def set(self, key: CacheKey, value: Any) -> None:
+        """
+        Stores an entry in the cache
+        :param key: The cache key
+        :param value: The value to cache
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache
+        """
+
+
+class ResponseCache(Cache):
+    """
+    An in-memory cache of parsed API responses.
+    Entries expire after a per-endpoint TTL and the least recently used entry
+    is evicted once the cache is full. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60,
+                 ttls: Dict[str, float] = None,
+                 timer: Callable[[], float] = time.monotonic):
+        """
+        :param maxsize: The maximum number of entries to keep
+        :param ttl: The default number of seconds an entry stays fresh
+        :param ttls: The number of seconds entries stay fresh keyed by
+        endpoint name, e.g. {'study_queue': 30, 'recent_items': 300}.
+        Endpoints which are not listed use the default ttl.
+        :param timer: The clock used to expire entries
+        """
+        if maxsize < 1:
+            raise ValueError('Cache maxsize must be at least 1')
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._ttls = dict(ttls or {})
+        self._timer = timer
+
+        self._entries: 'OrderedDict[CacheKey, Tuple[float, Any]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def ttl_for(self, endpoint: str) -> float:
+        """
+        Gets the TTL to use for an endpoint
+        :param endpoint: The endpoint name
+        :return: The number of seconds entries stay fresh
+        """
+        return self._ttls.get(endpoint, self._ttl)
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """
+        Gets a fresh entry from the cache
+        :param key: The cache key
+        :return: The cached value, or None if it is missing or expired
+        """
+        now = self._timer()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            expires_at, value = entry
+
+            if expires_at <= now:
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        """
+        Stores an entry in the cache, evicting the least recently used entry
+        if the cache is full
+        :param key: The cache key
+        :param value: The value to cache
+        """
+        expires_at = self._timer() + self.ttl_for(key[1])
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._stats.evictions += 1
+                logger.debug('Evicted cache entry for %s', evicted[1])
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache
+        """
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        A snapshot of the cache's counters
+        """
+        with self._lock:
+            return CacheStats(self._stats.hits, self._stats.misses,
+                              self._stats.evictions,
+                              self._stats.expirations, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class Validators(object):
+    """
+    What is known about the last successful response for a URL
+    """
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+    result: Any
+
+    def request_headers(self) -> Dict[str, str]:
+        """
+        Builds the conditional request headers for revalidating the response
+        :return: The request headers
+        """
+        headers = dict()
+
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
+
+class ValidatorCache(object):
+    """
+    Remembers the validators and parsed result of the last response for each
+    URL so that repeat requests can be made conditional, and unchanged bodies
+    do not have to be parsed again. The least recently used URL is forgotten
+    once the cache is full. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: The maximum number of URLs to remember
+        """
+        if maxsize < 1:
+            raise ValueError('Cache maxsize must be at least 1')
+
+        self._maxsize = maxsize
+        self._entries: 'OrderedDict[str, Validators]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Validators]:
+        """
+        Gets the validators for a URL
+        :param url: The requested URL
+        :return: The validators, or None if the URL is unknown
+        """
+        with self._lock:
+            validators = self._entries.get(url)
+
+            if validators is not None:
+                self._entries.move_to_end(url)
+
+            return validators
+
+    def set(self, url: str, validators: Validators) -> None:
+        """
+        Stores the validators for a URL
+        :param url: The requested URL
+        :param validators: The validators of the latest response
+        """
+        with self._lock:
+            self._entries[url] = validators
+            self._entries.move_to_end(url)
+
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,1278 @@
+from concurrent.futures import (ThreadPoolExecutor, Future, wait,
+                                FIRST_COMPLETED)
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping,
+                    Set, Tuple, Optional, Union)
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import requests
+from requests import HTTPError
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from pybunpro.cache import Cache, CacheKey, ValidatorCache, Validators
+from pybunpro.decoders import (_USER_INFORMATION_DECODER, _STUDY_QUEUE_DECODER,
+                               _GRAMMAR_POINT_DECODER)
+from pybunpro.errors import SchemaError, BunproAPIError, BunproTimeoutError
+from pybunpro.hedging import HedgePolicy
+from pybunpro.jsonlib import JSONDecoder, get_decoder
+from pybunpro.metrics import (CACHE_HIT, COALESCED, ERROR, FETCHED,
+                              NOT_MODIFIED, UNCHANGED, MetricsSink,
+                              RequestMetrics)
+from pybunpro.models import (UserInformation, StudyQueue, GrammarPoint,
+                             BulkResult, UserSnapshot)
+from pybunpro.ratelimit import RateLimiter, RetryPolicy
+from pybunpro.schemas import (UserInformationSchema, StudyQueueSchema,
+                              GrammarPointSchema)
+from pybunpro.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+#: The most bytes read from a response body at once
+_BODY_CHUNK_SIZE = 4096
+
+
+def _body_chunks(resp: requests.Response) -> Iterator[bytes]:
+    """
+    Reads a streamed response body in pieces as they arrive, so that the
+    caller can check its deadline between them
+    :param resp: The streamed response
+    :return: The pieces of the decoded body
+    :raises requests.ConnectionError: If the connection fails or times out
+    """
+    raw = resp.raw
+
+    if not hasattr(raw, 'read1'):
+        # urllib3 before 2.2 can only wait for each chunk to fill
+        yield from resp.iter_content(_BODY_CHUNK_SIZE)
+        return
+
+    while True:
+        try:
+            chunk = raw.read1(_BODY_CHUNK_SIZE, decode_content=True)
+        except (ProtocolError, ReadTimeoutError) as e:
+            # As raised by iter_content
+            raise requests.ConnectionError(e) from e
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+@dataclass
+class _Response(object):
+    """
+    The parts of a successful HTTP response used by the clients
+    """
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+
+
+class _SharedUserInformation(object):
+    """
+    Loads the user information of the responses fetched for a snapshot,
+    reusing the loaded object when a response's user information is
+    identical to the last one loaded
+    """
+
+    def __init__(self, load: Callable[[dict], UserInformation]):
+        """
+        :param load: Loads the user information
+        """
+        self._load = load
+        self._lock = threading.Lock()
+        self._raw: Optional[dict] = None
+        self._loaded: Optional[UserInformation] = None
+
+    def __call__(self, raw: dict) -> UserInformation:
+        with self._lock:
+            if self._loaded is None or raw != self._raw:
+                self._loaded = self._load(raw)
+                self._raw = raw
+            else:
+                logger.debug('Reusing the parsed user information')
+
+            return self._loaded
+
+
+#: The retry policy used by the clients unless another one is given
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+#: The URL of the Bunpro API
+DEFAULT_BASE_URL = 'https://bunpro.jp/api/user'
+
+_API_KEY_REQUIRED = ('A Bunpro API key is required. '
+                     'Please see https://www.bunpro.jp/api for more info.')
+
+
+class _BaseClient(object):
+    """
+    Functionality shared between the Bunpro REST API clients
+    """
+
+    def __init__(self, api_key: str = None, cache: Cache = None,
+                 validator_cache: ValidatorCache = None,
+                 rate_limiter: RateLimiter = None,
+                 retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+                 fast_decode: bool = False,
+                 json_decoder: Union[str, JSONDecoder] = 'auto',
+                 base_url: str = DEFAULT_BASE_URL,
+                 metrics: MetricsSink = None,
+                 hedge_policy: HedgePolicy = None,
+                 connect_timeout: Optional[float] = 10,
+                 read_timeout: Optional[float] = 30,
+                 deadline: float = None):
+        """
+        :param api_key: The Bunpro API key to use
+        :param cache: An optional cache for parsed responses
+        :param validator_cache: An optional cache of response validators
+        used to revalidate repeat requests
+        :param rate_limiter: An optional rate limiter to pace requests with
+        :param retry_policy: The policy for retrying rejected requests, or
+        None to never retry
+        :param fast_decode: Whether to decode responses without the schemas
+        :param json_decoder: The JSON decoder to parse response bodies with
+        :param base_url: The URL of the API
+        :param metrics: An optional sink for the metrics of every call
+        :param hedge_policy: An optional policy for sending duplicates of
+        slow requests
+        :param connect_timeout: The number of seconds to wait for a
+        connection, or None to wait forever
+        :param read_timeout: The number of seconds to wait for data from the
+        server, or None to wait forever
+        :param deadline: The default number of seconds a call may take in
+        total, including retries and backoff, or None for no limit
+        """
+        self._base_url = base_url.rstrip('/')
+        self._metrics = metrics
+        self._hedge_policy = hedge_policy
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._deadline = deadline
+        self._api_key = api_key
+        self._cache = cache
+        self._validator_cache = validator_cache
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._fast_decode = fast_decode
+        self._json_decoder = get_decoder(json_decoder)
+
+        # Schemas keep no state between loads so they can be shared between
+        # calls and threads
+        self._user_information_schema = UserInformationSchema()
+        self._study_queue_schema = StudyQueueSchema()
+        self._grammar_point_schema = GrammarPointSchema(many=True)
+
+        self._user_base_url: Optional[str] = None
+
+        if api_key:
+            self._user_base_url = f'{self._base_url}/{api_key}'
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """
+        The default API key of the client's calls, if any
+        """
+        return self._api_key
+
+    def _get_base_url(self, api_key: str = None) -> str:
+        """
+        Determines the base URL to use
+        :param api_key: The user's API key
+        :return: The base API to use
+        :raises ValueError: If there is no default API key and the user does
+        not provide one.
+        """
+        if api_key:
+            return f'{self._base_url}/{api_key}'
+        elif self._user_base_url:
+            return self._user_base_url
+        else:
+            raise ValueError(_API_KEY_REQUIRED)
+
+    def _cache_key(self, endpoint: str, api_key: str = None,
+                   limit: int = None) -> CacheKey:
+        """
+        Builds the cache key for a request
+        :param endpoint: The endpoint name
+        :param api_key: The API key to use
+        :param limit: The limit passed to the endpoint, if any
+        :return: The cache key
+        :raises ValueError: If there is no default API key and the user does
+        not provide one.
+        """
+        api_key = api_key or self._api_key
+
+        if not api_key:
+            raise ValueError(_API_KEY_REQUIRED)
+
+        return api_key, endpoint, limit
+
+    def _start_metrics(self, key: CacheKey) -> Optional[RequestMetrics]:
+        """
+        Starts measuring a call
+        :param key: The cache key of the call
+        :return: The metrics to fill in, or None if there is no metrics sink
+        """
+        if self._metrics is None:
+            return None
+
+        return RequestMetrics(key[1], key[2], time.time())
+
+    def _record_metrics(self, metrics: Optional[RequestMetrics],
+                        started: float, error: Exception = None) -> None:
+        """
+        Finishes measuring a call and passes the metrics to the sink
+        :param metrics: The metrics, if measured
+        :param started: When the call started, from time.perf_counter
+        :param error: The exception the call raised, if any
+        """
+        sink = self._metrics
+
+        if metrics is None or sink is None:
+            return
+
+        metrics.total = time.perf_counter() - started
+
+        if error is not None:
+            metrics.outcome = ERROR
+            metrics.error = error
+        elif metrics.outcome is None:
+            # Only the call which made the request fills in the outcome
+            metrics.outcome = COALESCED
+
+        try:
+            sink.record(metrics)
+        except Exception:
+            logger.exception('Error recording metrics')
+
+    @staticmethod
+    def _measure_response(metrics: Optional[RequestMetrics],
+                          status_code: int, content: bytes, started: float,
+                          received: float) -> None:
+        """
+        Records the measurements of a response
+        :param metrics: The metrics, if measured
+        :param status_code: The status code
+        :param content: The body
+        :param started: When the request was sent, from time.perf_counter
+        :param received: When the response headers arrived, from
+        time.perf_counter
+        """
+        if metrics is None:
+            return
+
+        metrics.attempts += 1
+        metrics.status_code = status_code
+        metrics.response_bytes = len(content)
+        metrics.ttfb = received - started
+        metrics.body_read = time.perf_counter() - received
+
+    @staticmethod
+    def _attempt_metrics(metrics: Optional[RequestMetrics]) \
+            -> Optional[RequestMetrics]:
+        """
+        Creates the metrics of one of a hedged request's attempts, which are
+        merged into the call's metrics once the request is settled
+        :param metrics: The metrics of the call, if measured
+        :return: The metrics of the attempt, if measured
+        """
+        if metrics is None:
+            return None
+
+        return RequestMetrics(metrics.endpoint, metrics.limit,
+                              metrics.timestamp)
+
+    @staticmethod
+    def _merge_attempt(metrics: Optional[RequestMetrics],
+                       attempt: Optional[RequestMetrics], sent: int) -> None:
+        """
+        Merges the metrics of the attempt whose outcome was used into the
+        call's metrics
+        :param metrics: The metrics of the call, if measured
+        :param attempt: The metrics of the attempt
+        :param sent: The number of attempts sent, including hedges
+        """
+        if metrics is None or attempt is None:
+            return
+
+        metrics.attempts += sent
+        metrics.hedges += sent - 1
+        metrics.queue_wait += attempt.queue_wait
+        metrics.status_code = attempt.status_code
+        metrics.response_bytes = attempt.response_bytes
+        metrics.connect = attempt.connect
+        metrics.ttfb = attempt.ttfb
+        metrics.body_read = attempt.body_read
+
+    def _can_hedge(self, api_key: str) -> bool:
+        """
+        Takes a hedge from the rate limit budget
+        :param api_key: The API key the request is for
+        :return: Whether a hedge may be sent right away
+        """
+        if self._rate_limiter is None or \
+                self._rate_limiter.try_acquire(api_key):
+            return True
+
+        logger.debug('Not hedging, the rate limit is reached')
+        return False
+
+    def _deadline_at(self, deadline: Optional[float]) -> Optional[float]:
+        """
+        Determines when a call must finish
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+        :return: The time by which the call must finish, by time.monotonic,
+        or None if there is no deadline
+        """
+        if deadline is None:
+            deadline = self._deadline
+
+        if deadline is None:
+            return None
+
+        return time.monotonic() + deadline
+
+    @staticmethod
+    def _remaining(deadline_at: Optional[float]) -> Optional[float]:
+        """
+        Calculates the time left until a call's deadline
+        :param deadline_at: The deadline by time.monotonic, if any
+        :return: The number of seconds left, or None if there is no deadline
+        :raises BunproTimeoutError: If the deadline has passed
+        """
+        if deadline_at is None:
+            return None
+
+        remaining = deadline_at - time.monotonic()
+
+        if remaining <= 0:
+            raise BunproTimeoutError('The deadline passed')
+
+        return remaining
+
+    def _timeouts(self, deadline_at: Optional[float]) \
+            -> Tuple[Optional[float], Optional[float]]:
+        """
+        Determines the timeouts of a request, capped by the call's deadline
+        :param deadline_at: The deadline by time.monotonic, if any
+        :return: The connect and read timeouts in seconds
+        :raises BunproTimeoutError: If the deadline has passed
+        """
+        remaining = self._remaining(deadline_at)
+
+        if remaining is None:
+            return self._connect_timeout, self._read_timeout
+
+        return (min(self._connect_timeout or remaining, remaining),
+                min(self._read_timeout or remaining, remaining))
+
+    def _cache_get(self, key: CacheKey) -> Optional[tuple]:
+        """
+        Looks up a parsed response in the cache
+        :param key: The cache key
+        :return: The cached response, or None if there is no fresh entry
+        """
+        if self._cache is None:
+            return None
+
+        cached = self._cache.get(key)
+
+        if cached is not None:
+            logger.debug('Cache hit for %s', key[1])
+
+        return cached
+
+    def _cache_set(self, key: CacheKey, result: tuple) -> None:
+        """
+        Stores a parsed response in the cache
+        :param key: The cache key
+        :param result: The parsed response
+        """
+        if self._cache is not None:
+            self._cache.set(key, result)
+
+    def _retry_delay(self, error: BunproAPIError, attempt: int,
+                     deadline_at: float = None) -> Optional[float]:
+        """
+        Decides whether to retry a rejected request
+        :param error: The error the request failed with
+        :param attempt: The number of retries made so far
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The number of seconds to wait before retrying, or None to
+        give up
+        :raises BunproTimeoutError: If the retry would start after the
+        deadline
+        """
+        if self._retry_policy is None:
+            return None
+
+        delay = self._retry_policy.delay(attempt, error.status_code,
+                                         error.retry_after)
+
+        if delay is not None and deadline_at is not None and \
+                time.monotonic() + delay >= deadline_at:
+            raise BunproTimeoutError('The deadline would pass before the '
+                                     'request could be retried') from error
+
+        if delay is not None:
+            logger.warning('Request rejected with status %s, retrying in '
+                           '%.3fs', error.status_code, delay)
+
+        return delay
+
+    def _validators_for(self, url: str) -> Optional[Validators]:
+        """
+        Looks up the validators of the last response for a URL
+        :param url: The URL to request
+        :return: The validators, or None if there are none
+        """
+        if self._validator_cache is None:
+            return None
+
+        return self._validator_cache.get(url)
+
+    def _parse_body(self, content: bytes, parse: Callable[[dict], tuple],
+                    metrics: Optional[RequestMetrics]) -> tuple:
+        """
+        Decodes and parses a response body
+        :param content: The body
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :return: The parsed response
+        :raises SchemaError: If the response cannot be parsed
+        """
+        if metrics is None:
+            return parse(self._json_decoder(content))
+
+        started = time.perf_counter()
+        decoded = self._json_decoder(content)
+        decoded_at = time.perf_counter()
+        result = parse(decoded)
+
+        metrics.decode = decoded_at - started
+        metrics.parse = time.perf_counter() - decoded_at
+        metrics.outcome = FETCHED
+        return result
+
+    def _decode(self, url: str, response: _Response,
+                validators: Optional[Validators],
+                parse: Callable[[dict], tuple],
+                metrics: RequestMetrics = None) -> tuple:
+        """
+        Decodes and parses a response. When revalidating, the previously
+        parsed result is reused if the server reports it as not modified or
+        the body is unchanged.
+        :param url: The requested URL
+        :param response: The response
+        :param validators: The validators the request was made with
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :return: The parsed response
+        :raises SchemaError: If the response cannot be parsed
+        """
+        if self._validator_cache is None:
+            return self._parse_body(response.content, parse, metrics)
+
+        if response.status_code == 304 and validators is not None:
+            logger.debug('Not modified: %s', url)
+
+            if metrics is not None:
+                metrics.outcome = NOT_MODIFIED
+
+            return validators.result
+
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+
+        if validators is not None and validators.digest == digest:
+            logger.debug('Unchanged body: %s', url)
+            result = validators.result
+
+            if metrics is not None:
+                metrics.outcome = UNCHANGED
+        else:
+            result = self._parse_body(response.content, parse, metrics)
+
+        self._validator_cache.set(url, Validators(
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            digest, result))
+
+        return result
+
+    def _study_queue_url(self, api_key: str = None) -> str:
+        """
+        Builds the study queue URL
+        :param api_key: The API key to use
+        :return: The study queue URL
+        """
+        return f'{self._get_base_url(api_key)}/study_queue'
+
+    def _recent_items_url(self, limit: int = None,
+                          api_key: str = None) -> str:
+        """
+        Builds the recent items URL
+        :param limit: The maximum number of items to return
+        :param api_key: The API key to use
+        :return: The recent items URL
+        :raises ValueError: If the limit is out of range
+        """
+        if limit and (limit < 1 or limit > 50):
+            raise ValueError('Limit must be 1 to 50 (inclusive)')
+
+        url = f'{self._get_base_url(api_key)}/recent_items'
+
+        if limit:
+            url += f'/{limit}'
+
+        return url
+
+    def _load_user_information(self, raw: dict) -> UserInformation:
+        """
+        Loads the user information of a response
+        :param raw: The decoded user information
+        :return: The user information
+        :raises SchemaError: If the user information cannot be parsed
+        """
+        if self._fast_decode:
+            return _USER_INFORMATION_DECODER.load(raw)
+
+        user_info, user_error = self._user_information_schema.load(raw)
+
+        if user_error:
+            logger.error('Error parsing user info: %s', raw)
+            raise SchemaError('An error occurred parsing the user information',
+                              user_error)
+
+        return user_info
+
+    def _parse_study_queue(
+            self, resp_json: dict,
+            load_user_information: Callable[[dict], UserInformation] = None) \
+            -> Tuple[UserInformation, StudyQueue]:
+        """
+        Parses a study queue response
+        :param resp_json: The decoded response
+        :param load_user_information: Loads the user information, if not
+        with the client's own loader
+        :return: The user info and study queue
+        :raises SchemaError: If the response cannot be parsed
+        """
+        if load_user_information is None:
+            load_user_information = self._load_user_information
+
+        user_info = load_user_information(resp_json['user_information'])
+
+        if self._fast_decode:
+            return user_info, _STUDY_QUEUE_DECODER.load(
+                resp_json['requested_information'])
+
+        queue_info, queue_error = self._study_queue_schema.load(
+            resp_json['requested_information'])
+
+        if queue_error:
+            logger.error('Error parsing queue info: %s',
+                         resp_json['requested_information'])
+            raise SchemaError('An error occured parsing the queue information',
+                              queue_error)
+
+        return user_info, queue_info
+
+    def _parse_recent_items(
+            self, resp_json: dict,
+            load_user_information: Callable[[dict], UserInformation] = None) \
+            -> Tuple[UserInformation, List[GrammarPoint]]:
+        """
+        Parses a recent items response
+        :param resp_json: The decoded response
+        :param load_user_information: Loads the user information, if not
+        with the client's own loader
+        :return: The user information and recent grammar points
+        :raises SchemaError: If the response cannot be parsed
+        """
+        if load_user_information is None:
+            load_user_information = self._load_user_information
+
+        user_info = load_user_information(resp_json['user_information'])
+
+        if self._fast_decode:
+            return user_info, _GRAMMAR_POINT_DECODER.load_many(
+                resp_json['requested_information'])
+
+        recent_info, recent_error = self._grammar_point_schema.load(
+            resp_json['requested_information'])
+
+        if recent_error:
+            logger.error('Error parsing recent items info: %s',
+                         resp_json['requested_information'])
+            raise SchemaError('An error occured parsing the recent '
+                              'items information', recent_error)
+
+        return user_info, recent_info
+
+    def _snapshot_parsers(self) \
+            -> Tuple[Callable[[dict], tuple], Callable[[dict], tuple]]:
+        """
+        Creates the parsers of the study queue and recent items responses
+        fetched for a snapshot. Each response carries the same user
+        information, which is only parsed once if both are parsed.
+        :return: The study queue and recent items parsers
+        """
+        load_user_information = _SharedUserInformation(
+            self._load_user_information)
+        return (partial(self._parse_study_queue,
+                        load_user_information=load_user_information),
+                partial(self._parse_recent_items,
+                        load_user_information=load_user_information))
+
+    @staticmethod
+    def _snapshot(study_queue: Tuple[UserInformation, StudyQueue],
+                  recent_items: Tuple[UserInformation, List[GrammarPoint]]) \
+            -> UserSnapshot:
+        """
+        Combines the results fetched for a snapshot
+        :param study_queue: The user information and study queue
+        :param recent_items: The user information and recent grammar points
+        :return: The snapshot
+        """
+        user_info, queue_info = study_queue
+        return UserSnapshot(user_info, queue_info, recent_items[1])
+
+    @staticmethod
+    def _check_concurrency(concurrency: int) -> None:
+        """
+        Validates a bulk request's concurrency
+        :param concurrency: The maximum number of requests in flight
+        :raises ValueError: If the concurrency is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError('Concurrency must be at least 1')
+
+    @staticmethod
+    def _bulk_result(api_key: str, result: tuple = None,
+                     error: Exception = None) -> BulkResult:
+        """
+        Wraps the outcome of a single request in a bulk request
+        :param api_key: The API key the request was for
+        :param result: The user information and requested information
+        :param error: The error raised by the request
+        :return: The bulk result
+        """
+        if error is not None:
+            logger.debug('Bulk request for key failed: %s', error)
+            return BulkResult(api_key, None, None, error)
+
+        assert result is not None, 'A bulk result needs a result or an error'
+        user_info, requested_info = result
+        return BulkResult(api_key, user_info, requested_info)
+
+
+class BunproClient(_BaseClient):
+    """
+    Bunpro REST API Client
+    """
+
+    def __init__(self, api_key: str = None, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True, cache: Cache = None,
+                 validator_cache: ValidatorCache = None,
+                 coalesce: bool = False, rate_limiter: RateLimiter = None,
+                 retry_policy: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+                 fast_decode: bool = False,
+                 json_decoder: Union[str, JSONDecoder] = 'auto',
+                 base_url: str = DEFAULT_BASE_URL,
+                 metrics: MetricsSink = None,
+                 hedge_policy: HedgePolicy = None,
+                 connect_timeout: Optional[float] = 10,
+                 read_timeout: Optional[float] = 30,
+                 deadline: float = None):
+        """
+        :param api_key: The Bunpro API key to use
+        :param pool_connections: The number of host connection pools to keep
+        :param pool_maxsize: The maximum number of connections to keep per
+        host
+        :param pool_block: Whether to block when a host's pool has no free
+        connection instead of opening a throwaway one
+        :param keep_alive: Whether to keep connections alive between requests
+        :param cache: An optional cache for parsed responses, either a
+        ResponseCache in memory or a SQLiteCache shared between processes.
+        Cached objects are shared between callers and should not be
+        modified.
+        :param validator_cache: An optional cache of ETag/Last-Modified
+        validators. Repeat requests are made conditional and unchanged
+        responses reuse the previously parsed objects.
+        :param coalesce: Whether concurrent identical calls from different
+        threads should share a single request
+        :param rate_limiter: An optional rate limiter. Calls block until the
+        limiter allows them to be sent.
+        :param retry_policy: The policy for retrying requests rejected with
+        429 Too Many Requests or 503 Service Unavailable, or None to never
+        retry
+        :param fast_decode: Whether to build the models directly from the
+        responses, only checking that the required fields are present with
+        the right types, instead of loading them with the schemas
+        :param json_decoder: The JSON decoder used to parse response bodies:
+        'orjson', 'ujson', 'json', a function which parses bytes, or 'auto'
+        to use the fastest one installed
+        :param base_url: The URL of the API, e.g. to use a local stand-in
+        such as pybunpro.stubserver
+        :param metrics: An optional sink for the timings, sizes, status codes
+        and cache and retry outcomes of every call. Connect times are not
+        measured separately and are included in the time to first byte.
+        :param hedge_policy: An optional policy for sending a duplicate of a
+        request which takes longer than usual and using whichever response
+        arrives first. Duplicates are only sent if the rate limiter allows
+        them right away. Abandoned requests run to completion in the
+        background, so the pool should have room for them.
+        :param connect_timeout: The number of seconds to wait for a
+        connection, or None to wait forever
+        :param read_timeout: The number of seconds to wait for each read from
+        the server, or None to wait forever
+        :param deadline: The default number of seconds a call may take in
+        total, including rate limiting, retries and backoff, or None for no
+        limit. Requests cannot be interrupted, so the deadline is enforced
+        by capping the timeouts of each request and by not waiting or
+        retrying past it.
+        """
+        super().__init__(api_key, cache, validator_cache, rate_limiter,
+                         retry_policy, fast_decode, json_decoder, base_url,
+                         metrics, hedge_policy, connect_timeout, read_timeout,
+                         deadline)
+
+        self._single_flight = SingleFlight() if coalesce else None
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        if not keep_alive:
+            self._session.headers['Connection'] = 'close'
+
+        # Runs the second request of each snapshot
+        self._snapshot_executor = ThreadPoolExecutor(
+            max_workers=pool_maxsize, thread_name_prefix='pybunpro-snapshot')
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+
+        if hedge_policy is not None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=pool_maxsize * (1 + hedge_policy.max_hedges),
+                thread_name_prefix='pybunpro-hedge')
+
+        logger.debug('Initialized client with base url: %s',
+                     self._user_base_url)
+
+    def __enter__(self) -> 'BunproClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the client's pooled connections
+        """
+        self._session.close()
+        self._snapshot_executor.shutdown(wait=False)
+
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
+        logger.debug('Closed client session')
+
+    def _get(self, url: str, headers: Dict[str, str] = None,
+             metrics: RequestMetrics = None,
+             deadline_at: float = None) -> _Response:
+        """
+        Sends a GET request over the pooled session
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The response
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the server takes too long to respond
+        """
+        timeout = self._timeouts(deadline_at)
+        started = time.perf_counter()
+
+        try:
+            # Stream so that the headers and the body can be timed separately
+            resp = self._session.get(url, headers=headers, stream=True,
+                                     timeout=timeout)
+            received = time.perf_counter()
+            chunks = []
+
+            # Each read of a slowly sent body gets a fresh read timeout, so
+            # the deadline is checked between them
+            for chunk in _body_chunks(resp):
+                chunks.append(chunk)
+
+                try:
+                    self._remaining(deadline_at)
+                except BunproTimeoutError:
+                    # The rest of the body is unread, so the connection
+                    # cannot be reused
+                    resp.close()
+                    raise
+
+            content = b''.join(chunks)
+        except requests.Timeout as e:
+            logger.error('Request to %s timed out: %s', url, e)
+            raise BunproTimeoutError(f'Request timed out: {e}') from e
+        except requests.ConnectionError as e:
+            # Timeouts while reading a streamed body are raised as connection
+            # errors wrapping urllib3's ReadTimeoutError
+            if not isinstance(e.args[0] if e.args else None,
+                              ReadTimeoutError):
+                raise
+
+            logger.error('Request to %s timed out: %s', url, e)
+            raise BunproTimeoutError(f'Request timed out: {e}') from e
+
+        self._measure_response(metrics, resp.status_code, content,
+                               started, received)
+        logger.debug('GET request to %s', url)
+
+        try:
+            resp.raise_for_status()
+        except HTTPError as e:
+            logger.error('API Error: %s', e)
+
+            try:
+                body = json.loads(content)
+            except ValueError:
+                body = dict()
+
+            raise BunproAPIError(e, status_code=resp.status_code, body=body,
+                                 headers=resp.headers)
+
+        return _Response(resp.status_code, resp.headers, content)
+
+    def _timed_get(self, policy: HedgePolicy, url: str,
+                   headers: Optional[Dict[str, str]],
+                   metrics: Optional[RequestMetrics],
+                   deadline_at: Optional[float],
+                   sent_at: Future = None) -> _Response:
+        """
+        Sends a GET request and reports its latency to the hedge policy
+        :param policy: The hedge policy
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the attempt, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :param sent_at: Set to the time by time.monotonic that the request
+        is sent at, once a worker picks it up
+        :return: The response
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the server takes too long to respond
+        """
+        if sent_at is not None:
+            sent_at.set_result(time.monotonic())
+
+        started = time.perf_counter()
+        response = self._get(url, headers, metrics, deadline_at)
+        policy.observe(time.perf_counter() - started)
+        return response
+
+    def _hedged_get(self, policy: HedgePolicy, api_key: str, url: str,
+                    headers: Optional[Dict[str, str]],
+                    metrics: Optional[RequestMetrics],
+                    deadline_at: Optional[float]) -> _Response:
+        """
+        Sends a GET request, sending duplicates if it takes longer than the
+        hedge policy's delay, and returns the first successful response
+        :param policy: The hedge policy
+        :param api_key: The API key the request is for
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The response
+        :raises BunproAPIError: If every attempt failed with an error
+        response from the API
+        :raises BunproTimeoutError: If the deadline passes first
+        """
+        executor = self._hedge_executor
+        assert executor is not None, 'Hedging without an executor'
+        attempt = self._attempt_metrics(metrics)
+        sent_at: Future = Future()
+        future = executor.submit(self._timed_get, policy, url, headers,
+                                 attempt, deadline_at, sent_at)
+        sent: Dict[Future, Optional[RequestMetrics]] = {future: attempt}
+        pending: Set[Future] = {future}
+        failed: List[Future] = []
+        hedging = True
+
+        try:
+            while pending:
+                remaining = self._remaining(deadline_at)
+                timeout = remaining
+                waiting = set(pending)
+
+                if hedging and sent_at.done():
+                    delay = policy.delay() - (time.monotonic()
+                                              - sent_at.result())
+                    timeout = max(delay if remaining is None
+                                  else min(delay, remaining), 0)
+                elif hedging:
+                    # Time spent queued behind busy workers is not the
+                    # server's latency, so the delay runs from when the
+                    # latest attempt is sent
+                    waiting.add(sent_at)
+
+                done, _ = wait(waiting, timeout=timeout,
+                               return_when=FIRST_COMPLETED)
+                done.discard(sent_at)
+                pending -= done
+
+                for future in done:
+                    if future.exception() is None:
+                        self._merge_attempt(metrics, sent[future], len(sent))
+                        return future.result()
+
+                    failed.append(future)
+
+                if done or sent_at in waiting and sent_at.done():
+                    continue
+
+                self._remaining(deadline_at)
+
+                if not hedging:
+                    continue
+
+                hedging = self._can_hedge(api_key)
+
+                if hedging:
+                    logger.debug('No response %.3fs after sending, hedging',
+                                 time.monotonic() - sent_at.result())
+                    attempt = self._attempt_metrics(metrics)
+                    sent_at = Future()
+                    future = executor.submit(self._timed_get, policy, url,
+                                             headers, attempt, deadline_at,
+                                             sent_at)
+                    sent[future] = attempt
+                    pending.add(future)
+                    hedging = len(sent) <= policy.max_hedges
+        finally:
+            # Requests already sent cannot be interrupted and are left to
+            # finish in the background
+            for future in pending:
+                future.cancel()
+
+        # Every attempt failed, so the first failure is reported
+        self._merge_attempt(metrics, sent[failed[0]], len(sent))
+        error = failed[0].exception()
+        assert error is not None
+        raise error
+
+    def _send(self, api_key: str, url: str,
+              headers: Optional[Dict[str, str]],
+              metrics: Optional[RequestMetrics],
+              deadline_at: Optional[float]) -> _Response:
+        """
+        Sends a GET request, hedging it if there is a hedge policy
+        :param api_key: The API key the request is for
+        :param url: The URL to request
+        :param headers: Additional request headers
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The response
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the server takes too long to respond
+        """
+        policy = self._hedge_policy
+
+        if policy is None:
+            return self._get(url, headers, metrics, deadline_at)
+
+        return self._hedged_get(policy, api_key, url, headers, metrics,
+                                deadline_at)
+
+    def _fetch(self, api_key: str, url: str, parse: Callable[[dict], tuple],
+               metrics: RequestMetrics = None,
+               deadline_at: float = None) -> tuple:
+        """
+        Requests and parses a URL, revalidating the last response if possible
+        and retrying if the request is rejected
+        :param api_key: The API key the request is for
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The parsed response
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the call takes too long
+        :raises SchemaError: If the response cannot be parsed
+        """
+        validators = self._validators_for(url)
+        headers = validators.request_headers() if validators else None
+        attempt = 0
+
+        while True:
+            if self._rate_limiter is not None:
+                waited = time.perf_counter()
+                acquired = self._rate_limiter.acquire(
+                    api_key, self._remaining(deadline_at))
+
+                if metrics is not None:
+                    metrics.queue_wait += time.perf_counter() - waited
+
+                if not acquired:
+                    raise BunproTimeoutError('The deadline would pass before '
+                                             'the rate limiter allowed the '
+                                             'request')
+
+            try:
+                response = self._send(api_key, url, headers, metrics,
+                                      deadline_at)
+                break
+            except BunproAPIError as e:
+                delay = self._retry_delay(e, attempt, deadline_at)
+
+                if delay is None:
+                    raise
+
+                time.sleep(delay)
+                attempt += 1
+
+                if metrics is not None:
+                    metrics.retry_wait += delay
+
+        return self._decode(url, response, validators, parse, metrics)
+
+    def _load(self, key: CacheKey, url: str, parse: Callable[[dict], tuple],
+              metrics: RequestMetrics = None,
+              deadline_at: float = None) -> tuple:
+        """
+        Fetches a URL and caches the parsed response
+        :param key: The cache key
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The parsed response
+        """
+        result = self._fetch(key[0], url, parse, metrics, deadline_at)
+        self._cache_set(key, result)
+        return result
+
+    def _call(self, key: CacheKey, url: str, parse: Callable[[dict], tuple],
+              deadline: float = None) -> Any:
+        """
+        Gets a parsed response from the cache, an identical in-flight call,
+        or the API
+        :param key: The cache key
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+        :return: The parsed response
+        """
+        metrics = self._start_metrics(key)
+        started = time.perf_counter()
+        deadline_at = self._deadline_at(deadline)
+
+        try:
+            result = self._cache_get(key)
+
+            if result is not None:
+                if metrics is not None:
+                    metrics.outcome = CACHE_HIT
+            elif self._single_flight is None:
+                result = self._load(key, url, parse, metrics, deadline_at)
+            else:
+                result = self._coalesce(key, url, parse, metrics,
+                                        deadline_at)
+        except Exception as e:
+            self._record_metrics(metrics, started, e)
+            raise
+
+        self._record_metrics(metrics, started)
+        return result
+
+    def _coalesce(self, key: CacheKey, url: str,
+                  parse: Callable[[dict], tuple],
+                  metrics: Optional[RequestMetrics],
+                  deadline_at: Optional[float]) -> tuple:
+        """
+        Loads a URL, or waits for an identical call already in flight until
+        the deadline passes
+        :param key: The cache key
+        :param url: The URL to request
+        :param parse: Parses the decoded response
+        :param metrics: The metrics of the call, if measured
+        :param deadline_at: The call's deadline by time.monotonic, if any
+        :return: The parsed response
+        :raises BunproTimeoutError: If the deadline passes first
+        """
+        assert self._single_flight is not None
+
+        try:
+            return self._single_flight.do(
+                key, lambda: self._load(key, url, parse, metrics,
+                                        deadline_at),
+                self._remaining(deadline_at))
+        except BunproTimeoutError:
+            raise
+        except FutureTimeoutError as e:
+            raise BunproTimeoutError('The deadline passed while waiting for '
+                                     'an identical call') from e
+
+    def study_queue(self, api_key: str = None, deadline: float = None) \
+            -> Tuple[UserInformation, StudyQueue]:
+        """
+        Gets the user's study queue
+        :param api_key: The API key to use
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+
+        :return: The user info and study queue
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the call takes too long
+        :raises SchemaError: If the response cannot be parsed
+        """
+        url = self._study_queue_url(api_key)
+        key = self._cache_key('study_queue', api_key)
+        return self._call(key, url, self._parse_study_queue, deadline)
+
+    def recent_items(self, limit: int = None, api_key: str = None,
+                     deadline: float = None) \
+            -> Tuple[UserInformation, List[GrammarPoint]]:
+        """
+        Gets the recently added grammer
+
+        :param limit: The maximum number of items to return. 1 to 50 inclusive.
+        :param api_key: The API key to use
+        :param deadline: The number of seconds the call may take, or None to
+        use the client's default
+        :return: The user information and recent grammar points
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If the call takes too long
+        :raises SchemaError: If the response cannot be parsed
+        """
+        url = self._recent_items_url(limit, api_key)
+        key = self._cache_key('recent_items', api_key, limit)
+        return self._call(key, url, self._parse_recent_items, deadline)
+
+    def snapshot(self, api_key: str = None, limit: int = None,
+                 deadline: float = None) -> UserSnapshot:
+        """
+        Gets the user's study queue and recent grammar with concurrent
+        requests, parsing the user information they share only once
+
+        :param api_key: The API key to use
+        :param limit: The maximum number of recent items to return. 1 to 50
+        inclusive.
+        :param deadline: The number of seconds each request may take, or None
+        to use the client's default
+        :return: The user information, study queue and recent grammar points
+        :raises BunproAPIError: If there is an error response from the API
+        :raises BunproTimeoutError: If a request takes too long
+        :raises SchemaError: If a response cannot be parsed
+        """
+        study_queue_url = self._study_queue_url(api_key)
+        recent_items_url = self._recent_items_url(limit, api_key)
+        parse_study_queue, parse_recent_items = self._snapshot_parsers()
+
+        recent_items = self._snapshot_executor.submit(
+            self._call, self._cache_key('recent_items', api_key, limit),
+            recent_items_url, parse_recent_items, deadline)
+
+        try:
+            study_queue = self._call(self._cache_key('study_queue', api_key),
+                                     study_queue_url, parse_study_queue,
+                                     deadline)
+        except Exception:
+            recent_items.cancel()
+            raise
+
+        return self._snapshot(study_queue, recent_items.result())
+
+    def study_queues(self, api_keys: Iterable[str], concurrency: int = 10) \
+            -> Iterator[BulkResult]:
+        """
+        Gets the study queues of many users concurrently.
+        The pool size should be at least the concurrency so that every
+        request can keep its connection alive.
+
+        :param api_keys: The API keys to fetch. Consumed lazily.
+        :param concurrency: The maximum number of requests in flight
+        :return: An iterator of results in order of completion
+        """
+        return self._bulk(lambda key: self.study_queue(api_key=key),
+                          api_keys, concurrency)
+
+    def recent_items_many(self, api_keys: Iterable[str], limit: int = None,
+                          concurrency: int = 10) -> Iterator[BulkResult]:
+        """
+        Gets the recently added grammar of many users concurrently.
+        The pool size should be at least the concurrency so that every
+        request can keep its connection alive.
+
+        :param api_keys: The API keys to fetch. Consumed lazily.
+        :param limit: The maximum number of items to return per user
+        :param concurrency: The maximum number of requests in flight
+        :return: An iterator of results in order of completion
+        """
+        return self._bulk(
+            lambda key: self.recent_items(limit=limit, api_key=key),
+            api_keys, concurrency)
+
+    def _bulk(self, fetch: Callable[[str], tuple], api_keys: Iterable[str],
+              concurrency: int) -> Iterator[BulkResult]:
+        """
+        Runs a request for each API key on a bounded thread pool, yielding
+        results as they complete. At most concurrency keys are pulled from
+        api_keys ahead of the results, so memory use does not grow with the
+        number of keys.
+        :param fetch: Performs the request for a single API key
+        :param api_keys: The API keys to fetch
+        :param concurrency: The maximum number of requests in flight
+        :return: An iterator of results in order of completion
+        """
+        self._check_concurrency(concurrency)
+        keys = iter(api_keys)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending: Dict[Future, str] = {
+                executor.submit(fetch, key): key
+                for key in islice(keys, concurrency)}
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for key in islice(keys, len(done)):
+                        pending[executor.submit(fetch, key)] = key
+
+                    for future in done:
+                        api_key = pending.pop(future)
+                        error = future.exception()
+
+                        if error is None:
+                            yield self._bulk_result(api_key,
+                                                    future.result())
+                        elif isinstance(error, Exception):
+                            yield self._bulk_result(api_key, error=error)
+                        else:
+                            # e.g. KeyboardInterrupt, which should not be
+                            # reported as one key's failure
+                            raise error
+            finally:
+                for future in pending:
+                    future.cancel()
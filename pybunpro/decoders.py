@@ -0,0 +1,146 @@
+from typing import Any, Callable, NoReturn, Optional, Sequence, Tuple
+import logging
+
+from pybunpro.errors import SchemaError
+from pybunpro.models import UserInformation, StudyQueue, GrammarPoint
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+_MISSING = object()
+_STRING = frozenset([str])
+_INTEGER = frozenset([int])
+_TIMESTAMP = frozenset([int, float])
+
+
+#: A field name, the exact types its value may have, and an optional
+#: converter applied to the value
+_FieldSpec = Tuple[str, frozenset, Optional[Callable[[Any], Any]]]
+
+
+class _FastDecoder(object):
+    """
+    Builds a model directly from a decoded JSON dict. Only checks that each
+    required key is present with the expected type, which is much cheaper
+    than loading with a schema. Intended for trusted responses.
+    """
+
+    def __init__(self, model: type, fields: Sequence[_FieldSpec],
+                 description: str):
+        """
+        :param model: The dataclass to build. Its fields must be in the same
+        order as fields.
+        :param fields: The fields of the model
+        :param description: What the model describes, used in errors
+        """
+        self._model = model
+        self._fields = tuple(fields)
+        self._description = description
+
+    def _build(self, data: Any) -> Any:
+        """
+        Builds a model if the data is valid
+        :param data: The decoded JSON
+        :return: The model instance, or _MISSING if the data is invalid
+        """
+        if type(data) is not dict:
+            return _MISSING
+
+        values = []
+
+        for name, types, convert in self._fields:
+            value = data.get(name, _MISSING)
+
+            if type(value) not in types:
+                return _MISSING
+
+            values.append(value if convert is None else convert(value))
+
+        return self._model(*values)
+
+    def load(self, data: dict) -> Any:
+        """
+        Decodes a single model
+        :param data: The decoded JSON
+        :return: The model instance
+        :raises SchemaError: If a field is missing or has the wrong type
+        """
+        model = self._build(data)
+
+        if model is _MISSING:
+            self._fail(data, self._errors(data))
+
+        return model
+
+    def load_many(self, data: list) -> list:
+        """
+        Decodes a list of models
+        :param data: The decoded JSON
+        :return: The model instances
+        :raises SchemaError: If an item cannot be decoded
+        """
+        if type(data) is not list:
+            self._fail(data, {'_schema': ['Invalid input type.']})
+
+        models = [self._build(item) for item in data]
+
+        if any(model is _MISSING for model in models):
+            self._fail(data, {i: self._errors(item)
+                              for i, item in enumerate(data)
+                              if models[i] is _MISSING})
+
+        return models
+
+    def _errors(self, data: Any) -> dict:
+        """
+        Describes everything wrong with a single item
+        :param data: The decoded JSON
+        :return: The error messages keyed by field name
+        """
+        if type(data) is not dict:
+            return {'_schema': ['Invalid input type.']}
+
+        errors = dict()
+
+        for name, types, _ in self._fields:
+            value = data.get(name, _MISSING)
+
+            if value is _MISSING:
+                errors[name] = ['Missing data for required field.']
+            elif type(value) not in types:
+                errors[name] = ['Not a valid ' + '/'.join(
+                    sorted(t.__name__ for t in types)) + '.']
+
+        return errors
+
+    def _fail(self, data: Any, errors: dict) -> NoReturn:
+        """
+        Raises the error for data which cannot be decoded
+        :param data: The decoded JSON
+        :param errors: The error messages
+        :raises SchemaError: Always
+        """
+        logger.error('Error parsing %s: %s', self._description, data)
+        raise SchemaError(
+            f'An error occurred parsing the {self._description}', errors)
+
+
+_USER_INFORMATION_DECODER = _FastDecoder(UserInformation, [
+    ('username', _STRING, None),
+    ('grammar_point_count', _INTEGER, None),
+    ('ghost_review_count', _INTEGER, None),
+    ('creation_date', _TIMESTAMP, None),
+], 'user information')
+
+_STUDY_QUEUE_DECODER = _FastDecoder(StudyQueue, [
+    ('reviews_available', _INTEGER, None),
+    ('next_review_date', _TIMESTAMP, None),
+    ('reviews_available_next_hour', _INTEGER, None),
+    ('reviews_available_next_day', _INTEGER, None),
+], 'queue information')
+
+_GRAMMAR_POINT_DECODER = _FastDecoder(GrammarPoint, [
+    ('grammar_point', _STRING, None),
+    ('created_at_date', _TIMESTAMP, None),
+    ('updated_at_date', _TIMESTAMP, None),
+], 'recent items information')
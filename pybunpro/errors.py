@@ -0,0 +1,87 @@
+from typing import Any, List, Mapping, Optional
+
+
+class SchemaError(Exception):
+    """
+    Raised when there is an error with a schema
+    """
+    def __init__(self, message: str, error: dict):
+        """
+        :param message: The error message to use
+        :param error: A dictionary with errors
+        """
+        self.message = message
+        self.error = error
+
+
+class BunproAPIError(Exception):
+    """
+    Raised when there is an error returned from the Bunpro API
+    """
+    def __init__(self, error: Exception, status_code: int = None,
+                 body: dict = None, headers: Mapping[str, str] = None):
+        """
+        :param error: The original HTTP error
+        :param status_code: The status code of the error response. Taken from
+        the error's response if not provided.
+        :param body: The decoded error response body. Taken from the error's
+        response if not provided.
+        :param headers: The error response headers. Taken from the error's
+        response if not provided.
+        """
+        self._error = error
+        # The HTTP error's response, e.g. of a requests.HTTPError
+        self._response: Any = getattr(error, 'response', None)
+        self._status_code = status_code
+        self._body = body
+        self._headers = headers
+
+    @property
+    def status_code(self) -> int:
+        """
+        The status code of the error response
+        """
+        if self._status_code is not None:
+            return self._status_code
+
+        return self._response.status_code
+
+    @property
+    def errors(self) -> List[str]:
+        """
+        The error messages returned form the Bunpro API
+        """
+        body = self._body
+
+        if body is None:
+            body = self._response.json()
+
+        return [e.get('message') for e in body.get('errors', [])]
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """
+        The number of seconds the API asked to wait before retrying, if any
+        """
+        from pybunpro.ratelimit import parse_retry_after
+
+        headers = self._headers
+
+        if headers is None:
+            headers = self._response.headers
+
+        return parse_retry_after(headers.get('Retry-After'))
+
+
+class BunproTimeoutError(TimeoutError):
+    """
+    Raised when a request times out or a call's deadline passes, so that
+    callers can tell an overloaded or unreachable API apart from an error
+    response
+    """
+    def __init__(self, message: str):
+        """
+        :param message: The error message to use
+        """
+        super().__init__(message)
+        self.message = message
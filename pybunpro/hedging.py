@@ -0,0 +1,74 @@
+from collections import deque
+from typing import Deque
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class HedgePolicy(object):
+    """
+    Decides when to send a duplicate of a request which is taking longer than
+    usual. Whichever request answers first is used and the others are
+    abandoned, which cuts the tail latency caused by a few stalled requests
+    at the cost of a few extra requests.
+    The delay is either fixed or a percentile of the latencies observed
+    recently, e.g. hedging after the 95th percentile sends at most about 5%
+    more requests.
+    """
+
+    def __init__(self, delay: float = 1.0, percentile: float = None,
+                 max_hedges: int = 1, window: int = 1000,
+                 min_samples: int = 20):
+        """
+        :param delay: The number of seconds to wait for a response before
+        hedging, or until enough latencies are observed with a percentile
+        :param percentile: The percentile of the observed latencies to wait
+        for before hedging, between 0 and 100, or None to always wait for
+        the fixed delay
+        :param max_hedges: The maximum number of duplicates sent per request
+        :param window: The number of recent latencies to keep
+        :param min_samples: The number of latencies observed before the
+        percentile is used
+        """
+        if delay <= 0:
+            raise ValueError('Delay must be positive')
+        elif percentile is not None and not 0 < percentile <= 100:
+            raise ValueError('The percentile must be between 0 and 100')
+        elif max_hedges < 1:
+            raise ValueError('max_hedges must be at least 1')
+
+        self.max_hedges = max_hedges
+        self._delay = delay
+        self._percentile = percentile
+        self._min_samples = min_samples
+
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """
+        Gets the number of seconds to wait for a response before hedging
+        :return: The delay
+        """
+        if self._percentile is None:
+            return self._delay
+
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return self._delay
+
+            latencies = sorted(self._latencies)
+
+        rank = math.ceil(self._percentile / 100 * len(latencies))
+        return latencies[max(rank - 1, 0)]
+
+    def observe(self, latency: float) -> None:
+        """
+        Records the latency of a successful request
+        :param latency: The number of seconds the request took
+        """
+        with self._lock:
+            self._latencies.append(latency)
@@ -0,0 +1,63 @@
+from typing import Any, Callable, Dict, Union
+import importlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: Parses JSON directly from the raw bytes of a response body
+JSONDecoder = Callable[[bytes], Any]
+
+#: The modules providing a loads function which accepts bytes, in order of
+#: preference
+_DECODER_MODULES = ('orjson', 'ujson', 'json')
+
+_decoders: Dict[str, JSONDecoder] = {'json': json.loads}
+
+
+def available_decoders() -> Dict[str, JSONDecoder]:
+    """
+    Finds the JSON decoders which are installed
+    :return: The decoders keyed by name, in order of preference
+    """
+    available = dict()
+
+    for name in _DECODER_MODULES:
+        try:
+            available[name] = get_decoder(name)
+        except ValueError:
+            pass
+
+    return available
+
+
+def get_decoder(decoder: Union[str, JSONDecoder] = 'auto') -> JSONDecoder:
+    """
+    Looks up a JSON decoder
+    :param decoder: The name of the decoder's module ('orjson', 'ujson' or
+    'json'), 'auto' to use the fastest one installed, or a function which
+    parses bytes
+    :return: The decoder
+    :raises ValueError: If the named decoder is unknown or not installed
+    """
+    if callable(decoder):
+        return decoder
+
+    if decoder == 'auto':
+        name, loads = next(iter(available_decoders().items()))
+        logger.debug('Using %s to decode JSON', name)
+        return loads
+
+    if decoder not in _DECODER_MODULES:
+        raise ValueError(f'Unknown JSON decoder: {decoder}')
+
+    if decoder not in _decoders:
+        try:
+            module = importlib.import_module(decoder)
+        except ImportError:
+            raise ValueError(f'JSON decoder {decoder} is not installed')
+
+        _decoders[decoder] = module.loads  # type: ignore
+
+    return _decoders[decoder]
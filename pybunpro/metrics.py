@@ -0,0 +1,147 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: The result was served from the response cache
+CACHE_HIT = 'cache_hit'
+#: The result was shared with an identical call already in flight
+COALESCED = 'coalesced'
+#: The response was fetched and parsed
+FETCHED = 'fetched'
+#: The server reported the previous response as not modified
+NOT_MODIFIED = 'not_modified'
+#: The body was identical to the previous response, so it was not parsed
+UNCHANGED = 'unchanged'
+#: The call raised an exception
+ERROR = 'error'
+
+#: The timings which can be summarised by MetricsRecorder.percentile
+PHASES = ('queue_wait', 'retry_wait', 'connect', 'ttfb', 'body_read',
+          'decode', 'parse', 'total')
+
+
+@dataclass
+class RequestMetrics(object):
+    """
+    The measurements of a single client call. Timings are in seconds and
+    are None for the phases the call did not go through.
+    """
+    #: The endpoint called, study_queue or recent_items
+    endpoint: str
+    #: The limit passed to the endpoint, if any
+    limit: Optional[int]
+    #: When the call started, in seconds since the epoch
+    timestamp: float
+    #: How the call was served: one of CACHE_HIT, COALESCED, FETCHED,
+    #: NOT_MODIFIED, UNCHANGED or ERROR
+    outcome: Optional[str] = None
+    #: The status code of the last response
+    status_code: Optional[int] = None
+    #: The number of requests sent, including retries and hedges
+    attempts: int = 0
+    #: The number of duplicate requests sent by hedging
+    hedges: int = 0
+    #: The size of the last response body in bytes
+    response_bytes: int = 0
+    #: The time spent waiting for the rate limiter and, with the async
+    #: client, for a pooled connection
+    queue_wait: float = 0.0
+    #: The time spent backing off before retries
+    retry_wait: float = 0.0
+    #: The time spent opening a new connection for the last request. Only
+    #: measured by the async client, and None when a pooled connection was
+    #: reused.
+    connect: Optional[float] = None
+    #: The time from sending the last request until its response headers
+    #: arrived, including connecting
+    ttfb: Optional[float] = None
+    #: The time spent reading the last response body
+    body_read: Optional[float] = None
+    #: The time spent decoding the JSON body
+    decode: Optional[float] = None
+    #: The time spent building the models from the decoded body
+    parse: Optional[float] = None
+    #: The duration of the whole call
+    total: float = 0.0
+    #: The exception the call raised, if any
+    error: Optional[Exception] = None
+
+
+class MetricsSink(ABC):
+    """
+    Receives the metrics of every call made by a client, e.g. to forward
+    them to a metrics system. record is called from the thread or task
+    which made the call, after it finished, so it should be quick and
+    thread safe. Exceptions it raises are logged and ignored.
+    """
+
+    @abstractmethod
+    def record(self, metrics: RequestMetrics) -> None:
+        """
+        Receives the metrics of a call
+        :param metrics: The metrics
+        """
+
+
+class MetricsRecorder(MetricsSink):
+    """
+    Keeps the metrics of the most recent calls in memory
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        """
+        :param maxlen: The maximum number of calls to keep
+        """
+        self._records: Deque[RequestMetrics] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, metrics: RequestMetrics) -> None:
+        with self._lock:
+            self._records.append(metrics)
+
+    @property
+    def records(self) -> List[RequestMetrics]:
+        """
+        The kept metrics, oldest first
+        """
+        with self._lock:
+            return list(self._records)
+
+    def percentile(self, phase: str, q: float) -> Optional[float]:
+        """
+        Calculates a percentile of a phase's timings over the kept calls
+        which went through it, by the nearest rank
+        :param phase: The phase, one of PHASES
+        :param q: The percentile, between 0 and 100
+        :return: The timing, or None if no kept call went through the phase
+        :raises ValueError: If the phase or percentile is invalid
+        """
+        if phase not in PHASES:
+            raise ValueError(f'Unknown phase: {phase}')
+        elif not 0 <= q <= 100:
+            raise ValueError('The percentile must be between 0 and 100')
+
+        timings = sorted(t for t in (getattr(m, phase) for m in self.records)
+                         if t is not None)
+
+        if not timings:
+            return None
+
+        return timings[max(math.ceil(q / 100 * len(timings)) - 1, 0)]
+
+    def clear(self) -> None:
+        """
+        Discards the kept metrics
+        """
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
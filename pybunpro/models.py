@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
+
+
+@lru_cache(maxsize=4096)
+def _from_timestamp(value: float) -> datetime:
+    """
+    Converts a timestamp to a UTC datetime. Results are memoized since the
+    same dates come up repeatedly and datetimes are immutable.
+    :param value: The timestamp
+    :return: The datetime
+    """
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+class _LazyTimestamp(object):
+    """
+    A model attribute which can be set to either a datetime or a timestamp.
+    Timestamps are kept as is and only converted to a datetime when the
+    attribute is read.
+    """
+
+    def __init__(self, slot: Any):
+        """
+        :param slot: The slot the value is stored in
+        """
+        self._slot = slot
+
+    def __get__(self, obj: Any, owner: type = None) -> Any:
+        if obj is None:
+            return self
+
+        value = self._slot.__get__(obj, owner)
+
+        if isinstance(value, datetime):
+            return value
+
+        return _from_timestamp(value)
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        self._slot.__set__(obj, value)
+
+
+class _EpochTimestamp(object):
+    """
+    A read-only model attribute giving a timestamp attribute's value in
+    seconds since the epoch, without creating a datetime
+    """
+
+    def __init__(self, slot: Any):
+        """
+        :param slot: The slot the value is stored in
+        """
+        self._slot = slot
+
+    def __get__(self, obj: Any, owner: type = None) -> Any:
+        if obj is None:
+            return self
+
+        value = self._slot.__get__(obj, owner)
+
+        if isinstance(value, datetime):
+            return value.timestamp()
+
+        return value
+
+
+def _timestamp_fields(*names: str) -> Callable[[type], type]:
+    """
+    Makes the given fields of a slotted dataclass lazy timestamps.
+    Each field is stored in a slot of the same name prefixed with an
+    underscore, and an <name>_timestamp attribute (with the _date suffix
+    dropped) gives its value in seconds since the epoch.
+    :param names: The field names
+    :return: The class decorator
+    """
+    def decorate(cls: type) -> type:
+        for name in names:
+            slot = getattr(cls, f'_{name}')
+            setattr(cls, name, _LazyTimestamp(slot))
+            setattr(cls, name.replace('_date', '') + '_timestamp',
+                    _EpochTimestamp(slot))
+
+        return cls
+
+    return decorate
+
+
+@_timestamp_fields('creation_date')
+@dataclass
+class UserInformation(object):
+    """
+    A Bunpro user's account information.
+    The creation date may be given as a datetime or a timestamp and is always
+    read as a UTC datetime. creation_timestamp gives it as a timestamp.
+    """
+    __slots__ = ('username', 'grammar_point_count', 'ghost_review_count',
+                 '_creation_date')
+
+    username: str
+    grammar_point_count: int
+    ghost_review_count: int
+    creation_date: datetime
+
+    if TYPE_CHECKING:  # pragma: no cover
+        # Added by _timestamp_fields
+        @property
+        def creation_timestamp(self) -> float: ...
+
+
+@_timestamp_fields('next_review_date')
+@dataclass
+class StudyQueue(object):
+    """
+    A Bunpro user's study queue.
+    The next review date may be given as a datetime or a timestamp and is
+    always read as a UTC datetime. next_review_timestamp gives it as a
+    timestamp.
+    """
+    __slots__ = ('reviews_available', '_next_review_date',
+                 'reviews_available_next_hour', 'reviews_available_next_day')
+
+    reviews_available: int
+    next_review_date: datetime
+    reviews_available_next_hour: int
+    reviews_available_next_day: int
+
+    if TYPE_CHECKING:  # pragma: no cover
+        # Added by _timestamp_fields
+        @property
+        def next_review_timestamp(self) -> float: ...
+
+
+@_timestamp_fields('created_at_date', 'updated_at_date')
+@dataclass
+class GrammarPoint(object):
+    """
+    A single grammar point in Bunpro.
+    The dates may be given as datetimes or timestamps and are always read as
+    UTC datetimes. created_at_timestamp and updated_at_timestamp give them as
+    timestamps.
+    """
+    __slots__ = ('grammar_point', '_created_at_date', '_updated_at_date')
+
+    grammar_point: str
+    created_at_date: datetime
+    updated_at_date: datetime
+
+    if TYPE_CHECKING:  # pragma: no cover
+        # Added by _timestamp_fields
+        @property
+        def created_at_timestamp(self) -> float: ...
+
+        @property
+        def updated_at_timestamp(self) -> float: ...
+
+
+@dataclass
+class BulkResult(object):
+    """
+    The result of fetching a single API key as part of a bulk request.
+    If the request failed, error is set and the other fields are None.
+    """
+    api_key: str
+    user_information: Optional[UserInformation]
+    requested_information: Any
+    error: Optional[Exception] = None
+
+
+@dataclass
+class UserSnapshot(object):
+    """
+    A user's study queue and recent grammar, fetched together
+    """
+    user_information: UserInformation
+    study_queue: StudyQueue
+    recent_items: List[GrammarPoint]
@@ -0,0 +1,232 @@
+from typing import Any, Dict, IO, Iterable, Iterator, List, Sequence
+import csv
+import json
+import logging
+
+from pybunpro.errors import SchemaError, BunproAPIError
+from pybunpro.models import (UserInformation, StudyQueue, GrammarPoint,
+                             BulkResult)
+from pybunpro.schemas import (UserInformationSchema, StudyQueueSchema,
+                              GrammarPointSchema)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: The output formats which can be written
+FORMATS = ('json', 'ndjson', 'csv')
+
+_user_information_schema = UserInformationSchema()
+_study_queue_schema = StudyQueueSchema()
+_grammar_point_schema = GrammarPointSchema(many=True)
+
+#: The CSV columns for each kind of requested information
+_CSV_COLUMNS = {
+    'study_queue': ['username', 'grammar_point_count', 'ghost_review_count',
+                    'creation_date', 'reviews_available', 'next_review_date',
+                    'reviews_available_next_hour',
+                    'reviews_available_next_day'],
+    'recent_items': ['username', 'grammar_point', 'created_at_date',
+                     'updated_at_date'],
+}
+
+
+def study_queue_record(user_information: UserInformation,
+                       study_queue: StudyQueue) -> Dict[str, Any]:
+    """
+    Converts a study queue response to a record which can be serialized,
+    using the schemas to dump the models
+    :param user_information: The user's information
+    :param study_queue: The user's study queue
+    :return: The record
+    """
+    return dict(
+        user_information=_user_information_schema.dump(user_information).data,
+        study_queue=_study_queue_schema.dump(study_queue).data)
+
+
+def recent_items_record(user_information: UserInformation,
+                        grammar_points: Sequence[GrammarPoint]) \
+        -> Dict[str, Any]:
+    """
+    Converts a recent items response to a record which can be serialized,
+    using the schemas to dump the models
+    :param user_information: The user's information
+    :param grammar_points: The user's recent grammar points
+    :return: The record
+    """
+    return dict(
+        user_information=_user_information_schema.dump(user_information).data,
+        recent_items=_grammar_point_schema.dump(grammar_points).data)
+
+
+def error_record(error: Exception) -> Dict[str, Any]:
+    """
+    Describes an error in a form which can be serialized
+    :param error: The error
+    :return: The error's type, message and, for API errors, status code and
+    error messages
+    """
+    record: Dict[str, Any] = dict(type=type(error).__name__,
+                                  message=str(error))
+
+    if isinstance(error, BunproAPIError):
+        record['status_code'] = error.status_code
+
+        try:
+            record['errors'] = error.errors
+        except ValueError:
+            logger.debug('Error response body is not JSON')
+    elif isinstance(error, SchemaError):
+        record['message'] = error.message
+        record['errors'] = error.error
+
+    return record
+
+
+def bulk_result_record(result: BulkResult, requested: str) \
+        -> Dict[str, Any]:
+    """
+    Converts a bulk result to a record which can be serialized
+    :param result: The result for one API key
+    :param requested: The name of the requested information, either
+    'study_queue' or 'recent_items'
+    :return: The record
+    """
+    if result.error is not None:
+        return dict(api_key=result.api_key, error=error_record(result.error))
+
+    user_information = result.user_information
+    assert user_information is not None, 'A bulk result without an error'
+
+    if requested == 'study_queue':
+        record = study_queue_record(user_information,
+                                    result.requested_information)
+    else:
+        record = recent_items_record(user_information,
+                                     result.requested_information)
+
+    return dict(api_key=result.api_key, **record)
+
+
+def csv_columns(requested: str, batch: bool = False) -> List[str]:
+    """
+    Gets the CSV columns for a kind of requested information
+    :param requested: The name of the requested information
+    :param batch: Whether the records are bulk results, which add the API
+    key and error columns
+    :return: The column names
+    """
+    columns = _CSV_COLUMNS[requested]
+
+    if batch:
+        return ['api_key'] + columns + ['error']
+
+    return list(columns)
+
+
+def csv_rows(records: Iterable[Dict[str, Any]], requested: str) \
+        -> Iterator[Dict[str, Any]]:
+    """
+    Flattens records into CSV rows: one row per study queue, or one row per
+    grammar point for recent items. A user without recent items gets one row
+    with empty grammar point columns so that they still appear in the output.
+    :param records: The records
+    :param requested: The name of the requested information
+    :return: The rows
+    """
+    for record in records:
+        row = dict()
+
+        if 'api_key' in record:
+            row['api_key'] = record['api_key']
+
+        error = record.get('error')
+
+        if error is not None:
+            errors = error.get('errors')
+            row['error'] = ('; '.join(errors) if isinstance(errors, list)
+                            else error['message'])
+            yield row
+            continue
+
+        user_information = record['user_information']
+
+        if requested == 'study_queue':
+            yield dict(row, **user_information, **record['study_queue'])
+            continue
+
+        row['username'] = user_information['username']
+
+        if not record['recent_items']:
+            yield row
+
+        for grammar_point in record['recent_items']:
+            yield dict(row, **grammar_point)
+
+
+def write_json(records: Iterable[Dict[str, Any]], stream: IO[str],
+               many: bool = True) -> int:
+    """
+    Writes records as JSON. Many records are written as an array one
+    element at a time, so that the output is never built in memory.
+    :param records: The records to write
+    :param stream: The text stream to write to
+    :param many: Whether to write an array of every record rather than the
+    only record
+    :return: The number of records written
+    """
+    if not many:
+        record, = records
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return 1
+
+    count = 0
+    stream.write('[')
+
+    for record in records:
+        stream.write(('\n' if count == 0 else ',\n')
+                     + json.dumps(record, ensure_ascii=False))
+        stream.flush()
+        count += 1
+
+    stream.write('\n]\n')
+    return count
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], stream: IO[str]) -> int:
+    """
+    Writes records as newline delimited JSON, flushing after each record so
+    that readers see them as soon as they are available
+    :param records: The records to write
+    :param stream: The text stream to write to
+    :return: The number of records written
+    """
+    count = 0
+
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        stream.flush()
+        count += 1
+
+    return count
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], stream: IO[str],
+              columns: Sequence[str]) -> int:
+    """
+    Writes rows as CSV with a header, flushing after each row
+    :param rows: The rows to write
+    :param stream: The text stream to write to
+    :param columns: The column names
+    :return: The number of rows written
+    """
+    writer = csv.DictWriter(stream, columns)
+    writer.writeheader()
+    count = 0
+
+    for row in rows:
+        writer.writerow(row)
+        stream.flush()
+        count += 1
+
+    return count
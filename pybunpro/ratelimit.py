@@ -0,0 +1,330 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Collection, Optional
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class TokenBucket(object):
+    """
+    A token bucket which refills at a fixed rate up to its capacity.
+    Tokens are reserved rather than taken, so a caller which finds the bucket
+    empty is told how long to wait for its token and callers are served in
+    the order they arrive.
+    """
+
+    def __init__(self, rate: float, capacity: float = None,
+                 timer: Callable[[], float] = time.monotonic):
+        """
+        :param rate: The number of tokens added per second
+        :param capacity: The maximum number of tokens the bucket holds, i.e.
+        the largest allowed burst. Defaults to one second worth of tokens.
+        :param timer: The clock used to refill the bucket
+        """
+        if rate <= 0:
+            raise ValueError('Rate must be positive')
+
+        self._rate = rate
+        self._capacity = max(capacity or rate, 1)
+        self._timer = timer
+
+        self._tokens = self._capacity
+        self._updated_at = timer()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """
+        Adds the tokens accumulated since the last update
+        :param now: The current time
+        """
+        elapsed = now - self._updated_at
+        self._tokens = min(self._capacity,
+                           self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Reserves a token
+        :return: The number of seconds to wait before using the token
+        """
+        with self._lock:
+            self._refill(self._timer())
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+
+            return -self._tokens / self._rate
+
+    def try_take(self) -> bool:
+        """
+        Takes a token if one is available right away, without reserving one
+        otherwise
+        :return: Whether a token was taken
+        """
+        with self._lock:
+            self._refill(self._timer())
+
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+    def put_back(self) -> None:
+        """
+        Returns a token which was taken but not used
+        """
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + 1)
+
+
+class RateLimiter(object):
+    """
+    Paces requests with a global token bucket and a token bucket per API key.
+    Either budget can be left unset to disable it.
+    """
+
+    def __init__(self, rate: float = None, burst: float = None,
+                 per_key_rate: float = None, per_key_burst: float = None,
+                 max_keys: int = 10000,
+                 timer: Callable[[], float] = time.monotonic):
+        """
+        :param rate: The number of requests per second allowed in total
+        :param burst: The number of requests which may be sent at once in
+        total
+        :param per_key_rate: The number of requests per second allowed for
+        each API key
+        :param per_key_burst: The number of requests which may be sent at
+        once for each API key
+        :param max_keys: The maximum number of per key buckets to keep. The
+        least recently used buckets are dropped first.
+        :param timer: The clock used to refill the buckets
+        """
+        self._global = TokenBucket(rate, burst, timer) if rate else None
+        self._per_key_rate = per_key_rate
+        self._per_key_burst = per_key_burst
+        self._max_keys = max_keys
+        self._timer = timer
+
+        self._buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket_for(self, api_key: str) -> Optional[TokenBucket]:
+        """
+        Gets the token bucket of an API key, creating it if needed
+        :param api_key: The API key
+        :return: The bucket, or None if there is no per key budget
+        """
+        if not self._per_key_rate:
+            return None
+
+        with self._lock:
+            bucket = self._buckets.get(api_key)
+
+            if bucket is None:
+                bucket = TokenBucket(self._per_key_rate, self._per_key_burst,
+                                     self._timer)
+                self._buckets[api_key] = bucket
+
+            self._buckets.move_to_end(api_key)
+
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+
+            return bucket
+
+    def reserve(self, api_key: str) -> float:
+        """
+        Reserves a request for an API key from both budgets
+        :param api_key: The API key the request is for
+        :return: The number of seconds to wait before sending the request
+        """
+        delay = 0.0
+
+        if self._global is not None:
+            delay = self._global.reserve()
+
+        bucket = self._bucket_for(api_key)
+
+        if bucket is not None:
+            delay = max(delay, bucket.reserve())
+
+        return delay
+
+    def try_acquire(self, api_key: str) -> bool:
+        """
+        Takes a request for an API key from both budgets if both allow it
+        right away. Used for optional requests, such as hedges, which are
+        better skipped than delayed.
+        :param api_key: The API key the request is for
+        :return: Whether the request may be sent
+        """
+        if self._global is not None and not self._global.try_take():
+            return False
+
+        bucket = self._bucket_for(api_key)
+
+        if bucket is not None and not bucket.try_take():
+            if self._global is not None:
+                self._global.put_back()
+
+            return False
+
+        return True
+
+    def _reserve_within(self, api_key: str,
+                        timeout: Optional[float]) -> Optional[float]:
+        """
+        Reserves a request for an API key unless it would have to wait
+        longer than a timeout
+        :param api_key: The API key the request is for
+        :param timeout: The longest acceptable wait in seconds, or None to
+        wait as long as needed
+        :return: The number of seconds to wait, or None if nothing was
+        reserved because the wait would be too long
+        """
+        delay = self.reserve(api_key)
+
+        if timeout is None or delay <= timeout:
+            return delay
+
+        # Cancel the reservation so that later requests are not delayed
+        if self._global is not None:
+            self._global.put_back()
+
+        bucket = self._bucket_for(api_key)
+
+        if bucket is not None:
+            bucket.put_back()
+
+        logger.debug('Rate limited for %.3fs, longer than %.3fs', delay,
+                     timeout)
+        return None
+
+    def acquire(self, api_key: str, timeout: float = None) -> bool:
+        """
+        Blocks until a request for an API key may be sent
+        :param api_key: The API key the request is for
+        :param timeout: The longest acceptable wait in seconds. If the
+        request would have to wait longer, returns right away.
+        :return: Whether the request may be sent
+        """
+        delay = self._reserve_within(api_key, timeout)
+
+        if delay is None:
+            return False
+        elif delay > 0:
+            logger.debug('Rate limited, waiting %.3fs', delay)
+            time.sleep(delay)
+
+        return True
+
+    async def acquire_async(self, api_key: str,
+                            timeout: float = None) -> bool:
+        """
+        Waits until a request for an API key may be sent
+        :param api_key: The API key the request is for
+        :param timeout: The longest acceptable wait in seconds. If the
+        request would have to wait longer, returns right away.
+        :return: Whether the request may be sent
+        """
+        delay = self._reserve_within(api_key, timeout)
+
+        if delay is None:
+            return False
+        elif delay > 0:
+            logger.debug('Rate limited, waiting %.3fs', delay)
+            await asyncio.sleep(delay)
+
+        return True
+
+
+class RetryPolicy(object):
+    """
+    Decides whether and when to retry a request which was rejected with a
+    retryable status such as 429 Too Many Requests.
+    A Retry-After header is honoured, unless it asks for a longer wait than
+    max_retry_after, in which case the request is not retried; otherwise the
+    delay grows exponentially. Random jitter is added so that many clients
+    rejected at the same moment do not retry in lockstep.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 30,
+                 statuses: Collection[int] = (429, 503),
+                 random: Callable[[], float] = random.random,
+                 max_retry_after: Optional[float] = None):
+        """
+        :param max_retries: The maximum number of retries per call
+        :param backoff: The base delay in seconds
+        :param max_backoff: The maximum delay in seconds when the server does
+        not send a Retry-After header
+        :param statuses: The response statuses which are retried
+        :param random: Returns a random float in [0, 1) used for jitter
+        :param max_retry_after: The longest Retry-After in seconds which is
+        waited for. Requests asked to wait longer are not retried. Defaults
+        to max_backoff.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_backoff if max_retry_after is None \
+            else max_retry_after
+        self.statuses = frozenset(statuses)
+        self._random = random
+
+    def delay(self, attempt: int, status_code: int,
+              retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Calculates how long to wait before retrying
+        :param attempt: The number of retries made so far
+        :param status_code: The status code of the rejected response
+        :param retry_after: The delay requested by the server, in seconds
+        :return: The number of seconds to wait, or None to give up
+        """
+        if status_code not in self.statuses or attempt >= self.max_retries:
+            return None
+
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                logger.debug('Not retrying, asked to wait %.1fs',
+                             retry_after)
+                return None
+
+            return retry_after + self._random() * self.backoff
+
+        return self._random() * min(self.max_backoff,
+                                    self.backoff * 2 ** attempt)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header
+    :param value: The header value, either in seconds or an HTTP date
+    :return: The number of seconds to wait, or None if it cannot be parsed
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import Any
+
+from marshmallow import Schema, fields, post_load
+
+from pybunpro.decoders import _TIMESTAMP
+from pybunpro.models import (UserInformation, StudyQueue, GrammarPoint,
+                             _from_timestamp)
+
+
+class Timestamp(fields.Field):
+    """
+    A converter field which converts to and from int timestamp/datetime
+    All datetimes are in UTC timezone
+    """
+
+    default_error_messages = {
+        'invalid': 'Not a valid timestamp.'
+    }
+
+    def __init__(self, lazy: bool = False, **kwargs):
+        """
+        :param lazy: Whether to load timestamps as is, leaving the conversion
+        to a datetime to a lazy model attribute
+        """
+        super().__init__(**kwargs)
+        self.lazy = lazy
+
+    def _serialize(self, value: datetime, attr: str, obj: object) -> float:
+        """
+        Converts a datetime value to a timestamp
+        :param value: The value to serialize
+        :param attr: The key on the object of the value
+        :param obj: The object the value comes from
+        :return: The value as a timestamp
+        """
+        return datetime.timestamp(value)
+
+    def _deserialize(self, value: int, attr: str, data: dict) -> Any:
+        """
+        Converts an integer timestamp to a datetime
+        :param value: The value to deserialize
+        :param attr: The key on the dict of the value
+        :param data: The data dict
+        :return: The value as a datetime, or the timestamp itself if lazy
+        """
+        if self.lazy:
+            if type(value) not in _TIMESTAMP:
+                self.fail('invalid')
+
+            return value
+
+        return _from_timestamp(value)
+
+
+class UserInformationSchema(Schema):
+    """
+    Schema representing Bunpro account information
+    """
+    username = fields.Str(required=True)
+    grammar_point_count = fields.Int(required=True)
+    ghost_review_count = fields.Int(required=True)
+    creation_date = Timestamp(required=True, lazy=True)
+
+    @post_load
+    def make_user_information(self, data: dict) -> UserInformation:
+        """
+        Converts the data dictionary to a UserInformation instance
+        :param data: The loaded information
+        :return: The UserInformation instance
+        """
+        return UserInformation(**data)
+
+
+class StudyQueueSchema(Schema):
+    """
+    Schema representing a user's study queue
+    """
+    reviews_available = fields.Int(required=True)
+    next_review_date = Timestamp(required=True, lazy=True)
+    reviews_available_next_hour = fields.Int(required=True)
+    reviews_available_next_day = fields.Int(required=True)
+
+    @post_load
+    def make_study_queue(self, data: dict) -> StudyQueue:
+        """
+        Converts the data dictionary to a StudyQueue instance
+        :param data: The loaded information
+        :return: The StudyQueue instance
+        """
+        return StudyQueue(**data)
+
+
+class GrammarPointSchema(Schema):
+    """
+    Schema representing a grammar point
+    """
+    grammar_point = fields.String(required=True)
+    created_at_date = Timestamp(required=True, lazy=True)
+    updated_at_date = Timestamp(required=True, lazy=True)
+
+    @post_load
+    def make_grammar_point(self, data: dict) -> GrammarPoint:
+        """
+        Converts the data dictionary to a GrammarPoint instance
+        :param data: The loaded information
+        :return: The GrammarPoint instance
+        """
+        return GrammarPoint(**data)
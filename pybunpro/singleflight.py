@@ -0,0 +1,113 @@
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls with the same key across threads.
+    The first caller runs the call and every caller which arrives while it is
+    in flight waits for it and gets the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = dict()
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: Optional[float] = None) -> Any:
+        """
+        Runs fn unless a call with the same key is already in flight
+        :param key: Identifies identical calls
+        :param fn: The call to make
+        :param timeout: The maximum number of seconds to wait for a call
+        already in flight, or None to wait until it finishes. The call
+        itself carries on for the other callers.
+        :return: The result of the call
+        :raises concurrent.futures.TimeoutError: If the call already in
+        flight does not finish within the timeout
+        """
+        with self._lock:
+            in_flight = self._calls.get(key)
+            future: Future = Future()
+
+            if in_flight is None:
+                self._calls[key] = future
+
+        if in_flight is not None:
+            logger.debug('Joining in-flight call')
+            return in_flight.result(timeout)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable) -> None:
+        """
+        Stops new callers from joining a finished call
+        :param key: The key of the call
+        """
+        with self._lock:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight(object):
+    """
+    Coalesces concurrent calls with the same key within an event loop.
+    The first caller starts the call and every caller which arrives while it
+    is in flight awaits it and gets the same result or exception. A caller
+    being cancelled does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = dict()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) \
+            -> Any:
+        """
+        Runs fn unless a call with the same key is already in flight
+        :param key: Identifies identical calls
+        :param fn: Creates the awaitable call to make
+        :return: The result of the call
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            logger.debug('Joining in-flight call')
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        """
+        Stops new callers from joining a finished call
+        :param key: The key of the call
+        :param task: The finished call
+        """
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,225 @@
+from functools import lru_cache
+from typing import (TYPE_CHECKING, Iterable, Iterator, NamedTuple, Optional,
+                    Tuple)
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+
+from pybunpro.models import UserInformation, StudyQueue
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: Identifies a snapshot log file and the version of its record layout
+MAGIC = b'PBSNAP01'
+
+#: The layout of a record: the snapshot time, the user id, the next review
+#: time, then reviews_available, reviews_available_next_hour,
+#: reviews_available_next_day, ghost_review_count and grammar_point_count,
+#: padded to 48 bytes so that the floats stay aligned
+RECORD = struct.Struct('<dQdIIIII4x')
+
+#: The layout of the file header: the magic and the record size
+HEADER = struct.Struct('<8sI4x')
+
+#: The names of the record fields
+FIELDS = ('epoch', 'user', 'next_review', 'reviews_available', 'next_hour',
+          'next_day', 'ghost_review_count', 'grammar_point_count')
+
+
+class Snapshot(NamedTuple):
+    """
+    A single record of a snapshot log
+    """
+    epoch: float
+    user: int
+    next_review: float
+    reviews_available: int
+    next_hour: int
+    next_day: int
+    ghost_review_count: int
+    grammar_point_count: int
+
+
+@lru_cache(maxsize=65536)
+def user_id(username: str) -> int:
+    """
+    Derives the 64 bit id a user's snapshots are stored under. Memoized since
+    the same users are snapshotted repeatedly.
+    :param username: The user's name
+    :return: The id
+    """
+    digest = hashlib.blake2b(username.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def snapshot_dtype() -> 'numpy.dtype':
+    """
+    Gets the NumPy structured dtype matching the record layout
+    :return: The dtype
+    :raises ImportError: If NumPy is not installed
+    """
+    import numpy
+
+    formats = ['<f8', '<u8', '<f8', '<u4', '<u4', '<u4', '<u4', '<u4']
+    offsets = [0, 8, 16, 24, 28, 32, 36, 40]
+    return numpy.dtype(dict(names=FIELDS, formats=formats, offsets=offsets,
+                            itemsize=RECORD.size))
+
+
+def pack(user_information: UserInformation, study_queue: StudyQueue,
+         epoch: float) -> bytes:
+    """
+    Encodes a snapshot as a record
+    :param user_information: The user's information
+    :param study_queue: The user's study queue
+    :param epoch: When the snapshot was taken, in seconds since the epoch
+    :return: The record
+    """
+    return RECORD.pack(epoch, user_id(user_information.username),
+                       study_queue.next_review_timestamp,
+                       study_queue.reviews_available,
+                       study_queue.reviews_available_next_hour,
+                       study_queue.reviews_available_next_day,
+                       user_information.ghost_review_count,
+                       user_information.grammar_point_count)
+
+
+class SnapshotLog(object):
+    """
+    An append-only log of study queue snapshots made of fixed-width binary
+    records, for keeping every polled study queue for trend analysis.
+    Records are appended with a single write per batch, so a reader never
+    sees a partially written record, and are read through a memory map:
+    read() returns a NumPy structured array viewing the file, so months of
+    snapshots can be scanned without creating an object per record.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: The log file, created if it does not exist. A leading ~
+        is expanded to the user's home directory.
+        :raises ValueError: If the file is not a snapshot log
+        """
+        self._path = os.path.expanduser(path)
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_APPEND,
+                           0o644)
+
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        header = os.read(self._fd, HEADER.size)
+
+        if not header:
+            os.write(self._fd, HEADER.pack(MAGIC, RECORD.size))
+        elif header != HEADER.pack(MAGIC, RECORD.size):
+            os.close(self._fd)
+            raise ValueError(f'{path} is not a snapshot log')
+
+        size = os.fstat(self._fd).st_size
+        complete = HEADER.size + len(self) * RECORD.size
+
+        if size > complete:
+            logger.warning('Discarding an incomplete record in %s', path)
+            os.ftruncate(self._fd, complete)
+
+    def append(self, user_information: UserInformation,
+               study_queue: StudyQueue, epoch: float = None) -> None:
+        """
+        Appends a snapshot
+        :param user_information: The user's information
+        :param study_queue: The user's study queue
+        :param epoch: When the snapshot was taken, in seconds since the
+        epoch. Defaults to now.
+        """
+        self.append_many([(user_information, study_queue)], epoch)
+
+    def append_many(self,
+                    snapshots: Iterable[Tuple[UserInformation, StudyQueue]],
+                    epoch: float = None) -> int:
+        """
+        Appends many snapshots taken at the same time in a single write
+        :param snapshots: The users' information and study queues
+        :param epoch: When the snapshots were taken, in seconds since the
+        epoch. Defaults to now.
+        :return: The number of snapshots appended
+        """
+        if epoch is None:
+            epoch = time.time()
+
+        data = b''.join(pack(user_information, study_queue, epoch)
+                        for user_information, study_queue in snapshots)
+        os.write(self._fd, data)
+        return len(data) // RECORD.size
+
+    def _map(self) -> Tuple[Optional[mmap.mmap], int]:
+        """
+        Maps the file into memory read only
+        :return: The map, or None if there are no records, and the number of
+        records it holds
+        """
+        if len(self) == 0:
+            return None, 0
+
+        mapped = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+        return mapped, (len(mapped) - HEADER.size) // RECORD.size
+
+    def read(self) -> 'numpy.ndarray':
+        """
+        Gets every snapshot as a read only structured array viewing the
+        memory mapped file, with a field per record field. Records appended
+        afterwards are not included.
+        :return: The snapshots in the order they were appended
+        :raises ImportError: If NumPy is not installed
+        """
+        import numpy
+
+        dtype = snapshot_dtype()
+        mapped, count = self._map()
+
+        if mapped is None:
+            return numpy.empty(0, dtype=dtype)
+
+        return numpy.frombuffer(mapped, dtype=dtype, count=count,
+                                offset=HEADER.size)
+
+    def records(self) -> Iterator[Snapshot]:
+        """
+        Iterates over every snapshot without NumPy
+        :return: The snapshots in the order they were appended
+        """
+        mapped, count = self._map()
+
+        if mapped is None:
+            return
+
+        with mapped:
+            view = memoryview(mapped)[HEADER.size:
+                                      HEADER.size + count * RECORD.size]
+
+            try:
+                for record in RECORD.iter_unpack(view):
+                    yield Snapshot(*record)
+            finally:
+                view.release()
+
+    def close(self) -> None:
+        """
+        Closes the file. Arrays returned by read stay valid.
+        """
+        os.close(self._fd)
+
+    def __enter__(self) -> 'SnapshotLog':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        size = os.fstat(self._fd).st_size - HEADER.size
+        # Ignore a record left incomplete by a crash
+        return max(size, 0) // RECORD.size
@@ -0,0 +1,273 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from pybunpro.cache import Cache, CacheKey, CacheStats
+from pybunpro.models import UserInformation, StudyQueue, GrammarPoint
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: The version of the table layout and value encoding. Entries written with
+#: another version are discarded.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    value BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at);
+CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at);
+'''
+
+
+def _encode_user_information(user_information: UserInformation) -> list:
+    return [user_information.username, user_information.grammar_point_count,
+            user_information.ghost_review_count,
+            user_information.creation_timestamp]
+
+
+def _encode(endpoint: str, value: Tuple[UserInformation, Any]) -> bytes:
+    """
+    Encodes a parsed response as a compact JSON array of its fields, with
+    dates as timestamps
+    :param endpoint: The endpoint the response is from
+    :param value: The parsed response
+    :return: The encoded response
+    :raises ValueError: If the endpoint is not supported
+    """
+    user_information, requested = value
+
+    if endpoint == 'study_queue':
+        encoded: list = [requested.reviews_available,
+                         requested.next_review_timestamp,
+                         requested.reviews_available_next_hour,
+                         requested.reviews_available_next_day]
+    elif endpoint == 'recent_items':
+        encoded = [[g.grammar_point, g.created_at_timestamp,
+                    g.updated_at_timestamp] for g in requested]
+    else:
+        raise ValueError(f'Cannot store responses from {endpoint}')
+
+    return json.dumps([_encode_user_information(user_information), encoded],
+                      ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def _decode(endpoint: str, data: bytes) -> Tuple[UserInformation, Any]:
+    """
+    Decodes a parsed response encoded by _encode. The models are created
+    with lazy timestamps.
+    :param endpoint: The endpoint the response is from
+    :param data: The encoded response
+    :return: The parsed response
+    """
+    user_information, encoded = json.loads(data)
+
+    if endpoint == 'study_queue':
+        requested: Any = StudyQueue(*encoded)
+    else:
+        requested = [GrammarPoint(*g) for g in encoded]
+
+    return UserInformation(*user_information), requested
+
+
+class SQLiteCache(Cache):
+    """
+    A cache of parsed API responses stored in a SQLite database, so that it
+    can be shared by several processes, e.g. successive CLI invocations.
+    The database is used in WAL mode so that readers do not block the writer.
+    Entries expire after a per-endpoint TTL and the oldest entries are
+    evicted once the cache is full. API keys are stored hashed. Safe to share
+    between threads and processes.
+    """
+
+    def __init__(self, path: str, maxsize: int = 10000, ttl: float = 60,
+                 ttls: Dict[str, float] = None, timeout: float = 5,
+                 timer: Callable[[], float] = time.time):
+        """
+        :param path: The database file, created if it does not exist. A
+        leading ~ is expanded to the user's home directory.
+        :param maxsize: The maximum number of entries to keep
+        :param ttl: The default number of seconds an entry stays fresh
+        :param ttls: The number of seconds entries stay fresh keyed by
+        endpoint name, e.g. {'study_queue': 30, 'recent_items': 300}.
+        Endpoints which are not listed use the default ttl.
+        :param timeout: How long to wait for another process to release the
+        database, in seconds
+        :param timer: The wall clock used to expire entries. It must agree
+        between processes sharing the cache.
+        """
+        if maxsize < 1:
+            raise ValueError('Cache maxsize must be at least 1')
+
+        self._path = os.path.expanduser(path)
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._ttls = dict(ttls or {})
+        self._timeout = timeout
+        self._timer = timer
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Gets this thread's connection to the database, opening it and
+        creating the table if needed
+        :return: The connection
+        """
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is not None:
+            return connection
+
+        connection = sqlite3.connect(self._path, timeout=self._timeout)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+
+        with connection:
+            version, = connection.execute('PRAGMA user_version').fetchone()
+
+            if version != _SCHEMA_VERSION:
+                logger.debug('Recreating cache schema version %d', version)
+                connection.execute('DROP TABLE IF EXISTS responses')
+                connection.execute(
+                    f'PRAGMA user_version = {_SCHEMA_VERSION}')
+
+            connection.executescript(_SCHEMA)
+
+        self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _hash(key: CacheKey) -> bytes:
+        """
+        Hashes a cache key so that API keys are not stored in the database
+        :param key: The cache key
+        :return: The hashed key
+        """
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+    def ttl_for(self, endpoint: str) -> float:
+        """
+        Gets the TTL to use for an endpoint
+        :param endpoint: The endpoint name
+        :return: The number of seconds entries stay fresh
+        """
+        return self._ttls.get(endpoint, self._ttl)
+
+    def _count(self, **counts: int) -> None:
+        """
+        Updates this process's counters
+        :param counts: The amount to add to each counter
+        """
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self._stats, name, getattr(self._stats, name) + count)
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """
+        Gets a fresh entry from the cache
+        :param key: The cache key
+        :return: The cached value, or None if it is missing or expired
+        """
+        row = self._connect().execute(
+            'SELECT expires_at, value FROM responses WHERE key = ?',
+            (self._hash(key),)).fetchone()
+
+        if row is None:
+            self._count(misses=1)
+            return None
+
+        expires_at, value = row
+
+        if expires_at <= self._timer():
+            self._count(misses=1, expirations=1)
+            return None
+
+        try:
+            result = _decode(key[1], value)
+        except (ValueError, TypeError) as e:
+            logger.warning('Ignoring unreadable cache entry: %s', e)
+            self._count(misses=1)
+            return None
+
+        self._count(hits=1)
+        return result
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        """
+        Stores an entry in the cache, removing expired entries and evicting
+        the oldest entries if the cache is full
+        :param key: The cache key
+        :param value: The value to cache
+        """
+        try:
+            data = _encode(key[1], value)
+        except ValueError as e:
+            logger.debug('Not caching response: %s', e)
+            return
+
+        now = self._timer()
+        connection = self._connect()
+
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (self._hash(key), now, now + self.ttl_for(key[1]), data))
+            connection.execute('DELETE FROM responses WHERE expires_at <= ?',
+                               (now,))
+            evicted = connection.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM '
+                'responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+                (self._maxsize,)).rowcount
+
+        self._count(evictions=evicted)
+
+        if evicted:
+            logger.debug('Evicted %d cache entries', evicted)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache
+        """
+        connection = self._connect()
+
+        with connection:
+            connection.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        """
+        Closes this thread's connection to the database
+        """
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        A snapshot of this process's counters and the number of entries
+        """
+        with self._lock:
+            return CacheStats(self._stats.hits, self._stats.misses,
+                              self._stats.evictions, self._stats.expirations,
+                              len(self))
+
+    def __len__(self) -> int:
+        count, = self._connect().execute(
+            'SELECT COUNT(*) FROM responses').fetchone()
+        return count
@@ -0,0 +1,412 @@
+"""
+A local stand-in for the Bunpro API, for load testing and benchmarking the
+clients over a real network stack without calling bunpro.jp.
+
+    $ python -m pybunpro.stubserver --port 8080 --latency lognormal:0.05,0.5
+    $ pybunpro --base-url http://127.0.0.1:8080/api/user --api-key x \\
+          study-queue
+"""
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+
+import click
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: Draws the number of seconds to delay a response by
+Latency = Callable[[random.Random], float]
+
+#: The grammar points of the generated users
+GRAMMAR_POINTS = ('でも', 'から', 'ので', 'けど', 'ながら', 'たら', 'ば', 'なら',
+                  'ように', 'ために', 'ばかり', 'だけ', 'しか', 'ほど', 'くらい')
+
+#: The largest number of items recent_items returns
+MAX_LIMIT = 50
+
+_PATH = re.compile(r'^/api/user/(?P<api_key>[^/?]+)/'
+                   r'(?:(?P<study_queue>study_queue)|'
+                   r'recent_items(?:/(?P<limit>\d+))?)/?(?:\?.*)?$')
+
+
+def constant_latency(seconds: float) -> Latency:
+    """
+    Delays every response by the same amount
+    :param seconds: The delay
+    :return: The latency distribution
+    """
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> Latency:
+    """
+    Delays responses by a uniformly distributed amount
+    :param low: The shortest delay in seconds
+    :param high: The longest delay in seconds
+    :return: The latency distribution
+    """
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float) -> Latency:
+    """
+    Delays responses by a log-normally distributed amount, which has the long
+    tail of real network latencies
+    :param median: The median delay in seconds
+    :param sigma: The standard deviation of the delay's logarithm. Larger
+    values give a longer tail.
+    :return: The latency distribution
+    """
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+_LATENCIES: Dict[str, Callable[..., Latency]] = {
+    'constant': constant_latency,
+    'uniform': uniform_latency,
+    'lognormal': lognormal_latency,
+}
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    Parses a latency distribution such as 0.01, constant:0.01,
+    uniform:0.01,0.05 or lognormal:0.02,0.5
+    :param spec: The distribution's name and comma separated parameters in
+    seconds. A bare number is a constant latency.
+    :return: The latency distribution
+    :raises ValueError: If the specification is invalid
+    """
+    name, _, params = spec.partition(':')
+
+    if not params:
+        name, params = 'constant', name
+
+    factory = _LATENCIES.get(name)
+
+    if factory is None:
+        raise ValueError(f'Unknown latency distribution: {name}')
+
+    try:
+        return factory(*(float(param) for param in params.split(',')))
+    except TypeError:
+        raise ValueError(f'Wrong number of parameters for {name} latency')
+
+
+class StubServer(object):
+    """
+    Serves the study_queue and recent_items endpoints for generated users.
+    Every API key is a user whose data is derived from the key, so the same
+    key always gets the same responses. Responses can be delayed, fail or be
+    rate limited at random, and bodies can be streamed slowly.
+    The server runs in a background thread; use it as a context manager or
+    call start and stop.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: Latency = None, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 body_duration: float = 0.0, body_chunks: int = 8,
+                 valid_keys: Collection[str] = None, seed: int = None,
+                 epoch: float = None):
+        """
+        :param host: The interface to listen on
+        :param port: The port to listen on, 0 to pick a free one
+        :param latency: How long to wait before responding, defaults to not
+        waiting
+        :param error_rate: The fraction of requests failing with 500
+        Internal Server Error
+        :param rate_limit_rate: The fraction of requests rejected with 429
+        Too Many Requests
+        :param retry_after: The Retry-After of rate limited responses, in
+        seconds
+        :param body_duration: The number of seconds to spread sending each
+        body over
+        :param body_chunks: The number of pieces slowly sent bodies are
+        split into
+        :param valid_keys: The API keys of existing users. Others get 400 Bad
+        Request, like unknown keys do from the API. Defaults to every key.
+        :param seed: The seed of the faults and latencies, for reproducible
+        runs
+        :param epoch: The time the generated review dates are relative to,
+        in seconds since the epoch. Defaults to when the server was created.
+        """
+        if not 0 <= error_rate + rate_limit_rate <= 1:
+            raise ValueError('The error and rate limit rates must be '
+                             'between 0 and 1 in total')
+
+        self._latency = latency
+        self._error_rate = error_rate
+        self._rate_limit_rate = rate_limit_rate
+        self._retry_after = retry_after
+        self._body_duration = body_duration
+        self._body_chunks = max(body_chunks, 1)
+        self._valid_keys = valid_keys
+        self._epoch = time.time() if epoch is None else epoch
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests: Counter = Counter()
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self  # type: ignore
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The base URL to give the clients
+        """
+        host, port = self._server.server_address[:2]
+        return f'http://{host!s}:{port}/api/user'
+
+    @property
+    def requests(self) -> Dict[int, int]:
+        """
+        The number of requests answered so far by status code
+        """
+        with self._lock:
+            return dict(self._requests)
+
+    def start(self) -> 'StubServer':
+        """
+        Starts serving in a background thread
+        :return: The server
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='pybunpro-stub', daemon=True)
+        self._thread.start()
+        logger.debug('Stub server listening on %s', self.url)
+        return self
+
+    def serve_forever(self) -> None:
+        """
+        Serves in the current thread until interrupted
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the socket
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def user(self, api_key: str) -> Tuple[dict, dict, List[dict]]:
+        """
+        Generates a user's data
+        :param api_key: The user's API key
+        :return: The user information, the study queue and the grammar
+        points, most recently updated first, as the API returns them
+        """
+        seed = hashlib.blake2b(api_key.encode(), digest_size=8).digest()
+        rng = random.Random(seed)
+
+        creation_date = int(self._epoch) - rng.randint(30, 2000) * 86400
+        grammar_point_count = rng.randint(0, 900)
+        user_information = dict(
+            username=f'user-{seed.hex()[:8]}',
+            grammar_point_count=grammar_point_count,
+            ghost_review_count=rng.randint(0, 50),
+            creation_date=creation_date)
+
+        reviews_available = rng.choice((0, 0, rng.randint(1, 200)))
+        next_hour = reviews_available + rng.randint(0, 20)
+        study_queue = dict(
+            reviews_available=reviews_available,
+            next_review_date=int(self._epoch) + (
+                0 if reviews_available else rng.randint(60, 86400)),
+            reviews_available_next_hour=next_hour,
+            reviews_available_next_day=next_hour + rng.randint(0, 100))
+
+        grammar_points = []
+        for _ in range(min(grammar_point_count, MAX_LIMIT)):
+            created_at = rng.randint(creation_date, int(self._epoch))
+            grammar_points.append(dict(
+                grammar_point=rng.choice(GRAMMAR_POINTS),
+                created_at_date=created_at,
+                updated_at_date=rng.randint(created_at, int(self._epoch))))
+
+        grammar_points.sort(key=lambda g: g['updated_at_date'],  # type: ignore
+                            reverse=True)
+        return user_information, study_queue, grammar_points
+
+    def _draw(self) -> Tuple[float, float]:
+        """
+        Draws the random parts of a response
+        :return: The latency and a number to pick the outcome with
+        """
+        with self._lock:
+            latency = 0.0 if self._latency is None else \
+                self._latency(self._rng)
+            return max(latency, 0.0), self._rng.random()
+
+    def respond(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Builds the response to a request, after waiting for its latency
+        :param path: The requested path
+        :return: The status code, the headers and the body
+        """
+        latency, outcome = self._draw()
+
+        if latency:
+            time.sleep(latency)
+
+        headers = {'Content-Type': 'application/json'}
+        match = _PATH.match(path)
+
+        if match is None:
+            status, body = 404, _errors('Not found')
+        elif (self._valid_keys is not None
+              and match['api_key'] not in self._valid_keys):
+            status, body = 400, _errors('User does not exist.')
+        elif outcome < self._rate_limit_rate:
+            status, body = 429, _errors('Too many requests')
+            headers['Retry-After'] = f'{self._retry_after:g}'
+        elif outcome < self._rate_limit_rate + self._error_rate:
+            status, body = 500, _errors('Internal server error')
+        else:
+            user_information, study_queue, grammar_points = \
+                self.user(match['api_key'])
+
+            requested: Any = study_queue
+
+            if not match['study_queue']:
+                limit = int(match['limit'] or MAX_LIMIT)
+                requested = grammar_points[:limit]
+
+            status, body = 200, dict(user_information=user_information,
+                                     requested_information=requested)
+
+        with self._lock:
+            self._requests[status] += 1
+
+        return status, headers, json.dumps(body).encode()
+
+    def write_body(self, stream, body: bytes) -> None:
+        """
+        Writes a body, spread over the body duration
+        :param stream: The stream to write to
+        :param body: The body
+        """
+        if not self._body_duration:
+            stream.write(body)
+            return
+
+        size = -(-len(body) // self._body_chunks)
+        pause = self._body_duration / self._body_chunks
+
+        for start in range(0, len(body), size):
+            time.sleep(pause)
+            stream.write(body[start:start + size])
+            stream.flush()
+
+
+def _errors(message: str) -> dict:
+    """
+    Builds an error body like the API's
+    :param message: The error message
+    :return: The body
+    """
+    return dict(errors=[dict(message=message)])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send the headers and body without waiting for delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        stub: StubServer = self.server.stub  # type: ignore
+        status, headers, body = stub.respond(self.path)
+
+        self.send_response(status)
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.send_header('Content-Length', str(len(body)))
+
+        try:
+            self.end_headers()
+            stub.write_body(self.wfile, body)
+        except ConnectionError:
+            # Clients which time out or hedge hang up mid-response
+            logger.debug('%s disconnected', self.address_string())
+            self.close_connection = True
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug('%s - %s', self.address_string(), format % args)
+
+
+def _latency_option(ctx, param, value: Optional[str]) -> Optional[Latency]:
+    if value is None:
+        return None
+
+    try:
+        return parse_latency(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', type=int, default=8080, show_default=True)
+@click.option('--latency', callback=_latency_option,
+              help='The response latency in seconds, e.g. 0.05, '
+                   'uniform:0.01,0.1 or lognormal:0.05,0.5')
+@click.option('--error-rate', type=click.FloatRange(0, 1), default=0,
+              help='The fraction of requests failing with 500')
+@click.option('--rate-limit-rate', type=click.FloatRange(0, 1), default=0,
+              help='The fraction of requests rejected with 429')
+@click.option('--retry-after', type=float, default=1, show_default=True,
+              help='The Retry-After of rate limited responses in seconds')
+@click.option('--body-duration', type=float, default=0,
+              help='The number of seconds to stream each body over')
+@click.option('--seed', type=int, help='The seed of the random faults')
+def main(host, port, latency, error_rate, rate_limit_rate, retry_after,
+         body_duration, seed):
+    """
+    Runs a local stand-in for the Bunpro API
+    """
+    try:
+        stub = StubServer(host, port, latency=latency, error_rate=error_rate,
+                          rate_limit_rate=rate_limit_rate,
+                          retry_after=retry_after,
+                          body_duration=body_duration, seed=seed)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    click.echo(f'Serving the Bunpro API stub at {stub.url}')
+
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,241 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+from pybunpro.batch import GrammarPointBatch
+from pybunpro.models import UserInformation, GrammarPoint
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pybunpro.client import BunproClient
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: The largest limit accepted by the recent_items endpoint
+MAX_LIMIT = 50
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS grammar_points (
+    user TEXT NOT NULL,
+    grammar_point TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user, grammar_point)
+) WITHOUT ROWID;
+'''
+
+
+def _user_id(api_key: str) -> str:
+    """
+    Derives the identifier a user's grammar points are stored under, so that
+    API keys are not stored
+    :param api_key: The user's API key
+    :return: The identifier
+    """
+    return hashlib.blake2b(api_key.encode(), digest_size=16).hexdigest()
+
+
+@dataclass
+class SyncResult(object):
+    """
+    The outcome of syncing a user's recent items
+    """
+    user_information: UserInformation
+    added: List[GrammarPoint] = field(default_factory=list)
+    updated: List[GrammarPoint] = field(default_factory=list)
+    #: The number of requests made
+    requests: int = 0
+    #: The limit of the last request
+    limit: int = 0
+
+
+class GrammarPointStore(object):
+    """
+    A local store of each user's grammar points, kept up to date by
+    sync_recent_items so that the full history can be queried without
+    calling the API. The store is kept in a SQLite database, in memory
+    unless a path is given. Users are identified by a hash of their API key.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        """
+        :param path: The database file, created if it does not exist. A
+        leading ~ is expanded to the user's home directory.
+        """
+        if path != ':memory:':
+            path = os.path.expanduser(path)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            if path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+
+            self._connection.executescript(_SCHEMA)
+
+    def high_water_mark(self, api_key: str) -> Optional[float]:
+        """
+        Finds the latest creation or update time of a user's stored grammar
+        points. Anything updated after it has not been synced yet.
+        :param api_key: The user's API key
+        :return: The time in seconds since the epoch, or None if nothing is
+        stored for the user
+        """
+        with self._lock:
+            mark, = self._connection.execute(
+                'SELECT MAX(MAX(created_at), MAX(updated_at)) '
+                'FROM grammar_points WHERE user = ?',
+                (_user_id(api_key),)).fetchone()
+
+        return mark
+
+    def grammar_points(self, api_key: str) -> GrammarPointBatch:
+        """
+        Gets every stored grammar point of a user
+        :param api_key: The user's API key
+        :return: The grammar points, most recently updated first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT grammar_point, created_at, updated_at '
+                'FROM grammar_points WHERE user = ? '
+                'ORDER BY updated_at DESC, grammar_point',
+                (_user_id(api_key),)).fetchall()
+
+        return GrammarPointBatch([row[0] for row in rows],
+                                 [row[1] for row in rows],
+                                 [row[2] for row in rows])
+
+    def count(self, api_key: str) -> int:
+        """
+        Counts a user's stored grammar points
+        :param api_key: The user's API key
+        :return: The number of grammar points
+        """
+        with self._lock:
+            count, = self._connection.execute(
+                'SELECT COUNT(*) FROM grammar_points WHERE user = ?',
+                (_user_id(api_key),)).fetchone()
+
+        return count
+
+    def merge(self, api_key: str, grammar_points: Sequence[GrammarPoint]) \
+            -> Tuple[List[GrammarPoint], List[GrammarPoint]]:
+        """
+        Stores grammar points which are new or were updated since they were
+        stored, ignoring the rest
+        :param api_key: The user's API key
+        :param grammar_points: The fetched grammar points
+        :return: The added and the updated grammar points
+        """
+        user = _user_id(api_key)
+        added: List[GrammarPoint] = []
+        updated: List[GrammarPoint] = []
+
+        with self._lock, self._connection:
+            stored: Dict[str, float] = dict()
+
+            for grammar_point in grammar_points:
+                row = self._connection.execute(
+                    'SELECT updated_at FROM grammar_points '
+                    'WHERE user = ? AND grammar_point = ?',
+                    (user, grammar_point.grammar_point)).fetchone()
+
+                if row is not None:
+                    stored[grammar_point.grammar_point] = row[0]
+
+            changed = []
+
+            for grammar_point in grammar_points:
+                updated_at = stored.get(grammar_point.grammar_point)
+
+                if updated_at is None:
+                    added.append(grammar_point)
+                elif grammar_point.updated_at_timestamp > updated_at:
+                    updated.append(grammar_point)
+                else:
+                    continue
+
+                stored[grammar_point.grammar_point] = \
+                    grammar_point.updated_at_timestamp
+                changed.append((user, grammar_point.grammar_point,
+                                grammar_point.created_at_timestamp,
+                                grammar_point.updated_at_timestamp))
+
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO grammar_points VALUES (?, ?, ?, ?)',
+                changed)
+
+        return added, updated
+
+    def close(self) -> None:
+        """
+        Closes the database
+        """
+        self._connection.close()
+
+
+def sync_recent_items(client: 'BunproClient', store: GrammarPointStore,
+                      api_key: str = None, min_limit: int = 5) -> SyncResult:
+    """
+    Brings a user's stored grammar points up to date with as few and as
+    small recent_items requests as possible.
+    A user with nothing stored is fetched with the largest limit. Otherwise
+    the first request uses min_limit, and while every item it returns is
+    newer than the store's high-water mark the limit is raised, by at least
+    the number of grammar points the user has which are not stored yet plus
+    one, so that the next response overlaps the stored items.
+    :param client: The client to fetch with
+    :param store: The store to update
+    :param api_key: The API key of the user, defaults to the client's key
+    :param min_limit: The limit of the first request for a user who has been
+    synced before
+    :return: The new and updated grammar points
+    :raises ValueError: If min_limit is out of range or there is no API key
+    :raises BunproAPIError: If a request fails
+    :raises SchemaError: If a response cannot be parsed
+    """
+    if not 1 <= min_limit <= MAX_LIMIT:
+        raise ValueError(f'min_limit must be between 1 and {MAX_LIMIT}')
+
+    api_key = api_key or client.api_key
+
+    if not api_key:
+        raise ValueError('A Bunpro API key is required to sync')
+
+    mark = store.high_water_mark(api_key)
+    limit = MAX_LIMIT if mark is None else min_limit
+    added: List[GrammarPoint] = []
+    updated: List[GrammarPoint] = []
+    requests = 0
+
+    while True:
+        user_information, grammar_points = client.recent_items(
+            limit=limit, api_key=api_key)
+        requests += 1
+
+        new, changed = store.merge(api_key, grammar_points)
+        added.extend(new)
+        updated.extend(changed)
+
+        all_new = mark is not None and all(
+            g.updated_at_timestamp > mark for g in grammar_points)
+
+        if len(grammar_points) < limit or limit >= MAX_LIMIT or not all_new:
+            break
+
+        missing = (user_information.grammar_point_count
+                   - store.count(api_key))
+        limit = min(MAX_LIMIT, max(limit * 2, limit + missing + 1))
+        logger.debug('Every recent item is new, retrying with limit %d',
+                     limit)
+
+    logger.debug('Synced %d new and %d updated grammar points in %d '
+                 'requests', len(added), len(updated), requests)
+    return SyncResult(user_information, added, updated, requests, limit)
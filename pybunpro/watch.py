@@ -0,0 +1,112 @@
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple
+import logging
+import time
+
+import requests
+
+from pybunpro.errors import BunproAPIError, BunproTimeoutError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pybunpro.client import BunproClient
+    from pybunpro.models import UserInformation, StudyQueue
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+#: How long to wait after the next review is due before polling, so that the
+#: server has counted it
+DUE_MARGIN = 1.0
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Decides whether a failed poll is worth trying again later, rather than
+    a problem such as an invalid API key which polling will not fix
+    :param error: The error raised by the poll
+    :return: Whether the error is transient
+    """
+    if isinstance(error, BunproAPIError):
+        return error.status_code == 429 or error.status_code >= 500
+
+    return isinstance(error, (BunproTimeoutError, requests.ConnectionError))
+
+
+def next_poll_delay(study_queue: 'StudyQueue', now: float,
+                    min_interval: float = 30,
+                    max_interval: float = 900) -> float:
+    """
+    Decides when to poll a study queue again.
+    Polls just after the next review is due. While reviews are available
+    the counts change as the user reviews, so polls are frequent, and reviews
+    coming due within the hour are polled for at their average spacing.
+    :param study_queue: The latest study queue
+    :param now: The current time in seconds since the epoch
+    :param min_interval: The minimum number of seconds between polls
+    :param max_interval: The maximum number of seconds between polls
+    :return: The number of seconds to wait
+    """
+    delay = max_interval
+    due_in = study_queue.next_review_timestamp - now
+
+    if due_in > 0:
+        delay = min(delay, due_in + DUE_MARGIN)
+    elif study_queue.reviews_available:
+        delay = min_interval
+
+    if study_queue.reviews_available_next_hour:
+        delay = min(delay, 3600 / study_queue.reviews_available_next_hour)
+
+    return max(min_interval, delay)
+
+
+def watch_study_queue(client: 'BunproClient', api_key: str = None,
+                      min_interval: float = 30, max_interval: float = 900,
+                      timer: Callable[[], float] = time.time) \
+        -> Iterator[Tuple['UserInformation', 'StudyQueue']]:
+    """
+    Polls a study queue with a single client, scheduling each poll from the
+    previous response, and yields it whenever it changes.
+    Transient failures, such as timeouts, server errors and dropped
+    connections, are logged and polled again after a backoff which doubles
+    from min_interval up to max_interval.
+    :param client: The client to poll with
+    :param api_key: The API key to poll, defaults to the client's key
+    :param min_interval: The minimum number of seconds between polls
+    :param max_interval: The maximum number of seconds between polls
+    :param timer: The wall clock, in seconds since the epoch
+    :return: The user information and study queue, each time they change
+    :raises ValueError: If min_interval is greater than max_interval
+    :raises BunproAPIError: If a poll fails with an error which is not
+    transient
+    :raises SchemaError: If a response cannot be parsed
+    """
+    if min_interval > max_interval:
+        raise ValueError('min_interval must not be greater than max_interval')
+
+    previous: Optional[Tuple['UserInformation', 'StudyQueue']] = None
+    failures = 0
+
+    while True:
+        try:
+            result = client.study_queue(api_key)
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+
+            failures += 1
+            delay = min(max_interval, min_interval * 2 ** (failures - 1))
+            logger.warning('Polling the study queue failed (%s), trying '
+                           'again in %.1fs', e, delay)
+            time.sleep(delay)
+            continue
+
+        failures = 0
+
+        if result != previous:
+            previous = result
+            yield result
+
+        delay = next_poll_delay(result[1], timer(), min_interval,
+                                max_interval)
+        logger.debug('Polling the study queue again in %.1fs', delay)
+        time.sleep(delay)
@@ -24,6 +24,11 @@ setup(
     install_requires=['requests',
                       'marshmallow',
                       'Click'],
+    extras_require={
+        'async': ['aiohttp'],
+        'speedups': ['orjson'],
+        'analytics': ['numpy'],
+    },
     long_description=read('README.md'),
     long_description_content_type='text/markdown',
     classifiers=[
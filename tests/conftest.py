@@ -1,9 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
 import pytest
 
-import pytz
-
 from pybunpro import UserInformation, StudyQueue, GrammarPoint
 
 
@@ -24,7 +22,7 @@ def ghost_review_count():
 
 @pytest.fixture
 def creation_date():
-    return datetime(2017, 12, 25, 21, 3, 51, tzinfo=pytz.utc)
+    return datetime(2017, 12, 25, 21, 3, 51, tzinfo=timezone.utc)
 
 
 @pytest.fixture
@@ -59,7 +57,7 @@ def next_review_date_ts():
 
 @pytest.fixture
 def next_review_date(next_review_date_ts):
-    return datetime.fromtimestamp(next_review_date_ts, tz=pytz.utc)
+    return datetime.fromtimestamp(next_review_date_ts, tz=timezone.utc)
 
 
 @pytest.fixture
@@ -96,7 +94,7 @@ def grammar_point_item():
 
 @pytest.fixture
 def created_at_date():
-    return datetime(2019, 5, 11, tzinfo=pytz.UTC)
+    return datetime(2019, 5, 11, tzinfo=timezone.utc)
 
 
 @pytest.fixture
@@ -106,7 +104,7 @@ def created_at_date_ts(created_at_date):
 
 @pytest.fixture
 def updated_at_date():
-    return datetime(2019, 5, 11, tzinfo=pytz.UTC)
+    return datetime(2019, 5, 11, tzinfo=timezone.utc)
 
 
 @pytest.fixture
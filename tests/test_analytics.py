@@ -0,0 +1,115 @@
+import numpy
+import pytest
+
+from pybunpro import UserInformation, StudyQueue
+from pybunpro.analytics import (HOUR, DAY, study_queue_array,
+                                latest_per_user, next_review_in, histogram,
+                                percentiles, forecast)
+from pybunpro.snapshots import SnapshotLog, user_id
+
+
+class TestAnalytics(object):
+
+    @pytest.fixture
+    def now(self):
+        return 1000000.0
+
+    @pytest.fixture
+    def study_queues(self, now):
+        return [
+            # Reviews due now, more within the hour
+            StudyQueue(10, now - 60, 16, 20),
+            # Next review in half an hour
+            StudyQueue(0, now + HOUR / 2, 4, 10),
+            # Nothing due today
+            StudyQueue(0, now + 2 * DAY, 0, 0),
+        ]
+
+    def test_study_queue_array(self, study_queues, now):
+        array = study_queue_array(study_queues)
+
+        assert list(array['reviews_available']) == [10, 0, 0]
+        assert list(array['next_hour']) == [16, 4, 0]
+        assert list(array['next_day']) == [20, 10, 0]
+        assert array['next_review'][1] == now + HOUR / 2
+
+    def test_next_review_in(self, study_queues, now):
+        assert list(next_review_in(study_queues, now)) == \
+            [0, HOUR / 2, 2 * DAY]
+
+    def test_histogram(self, study_queues):
+        counts, edges = histogram(study_queues, 'next_day', bins=[0, 5, 15,
+                                                                  25])
+
+        assert list(counts) == [1, 1, 1]
+        assert list(edges) == [0, 5, 15, 25]
+
+    def test_histogram_unknown_field(self, study_queues):
+        with pytest.raises(ValueError):
+            histogram(study_queues, 'next_review')
+
+    def test_percentiles(self, study_queues):
+        result = percentiles(study_queues, q=[0, 50, 100])
+
+        assert list(result['reviews_available']) == [0, 0, 10]
+        assert list(result['next_hour']) == [0, 4, 16]
+        assert list(result['next_day']) == [0, 10, 20]
+
+    def test_forecast(self, study_queues, now):
+        result = forecast(study_queues, now, step=HOUR / 4)
+
+        assert list(result.times[:5]) == [0, 900, 1800, 2700, 3600]
+        assert result.times[-1] == DAY
+        # The first user rises from 10 to 16 over the hour, the second
+        # from 0 to 4 over its second half hour
+        assert list(result.total[:5]) == pytest.approx(
+            [10, 11.5, 13, 16.5, 20])
+        assert result.total[-1] == 30
+        assert numpy.all(numpy.diff(result.total) >= 0)
+
+    def test_forecast_percentiles(self, study_queues, now):
+        result = forecast(study_queues, now, q=[50, 100])
+
+        assert result.percentiles[50][0] == 0
+        assert result.percentiles[100][0] == 10
+        assert result.percentiles[100][-1] == 20
+
+    def test_forecast_matches_per_user_sum(self, now):
+        rng = numpy.random.default_rng(0)
+        available = rng.integers(0, 50, 1000)
+        next_hour = available + rng.integers(0, 10, 1000)
+        queues = [StudyQueue(int(a), now + int(r), int(h), int(h) + 5)
+                  for a, h, r in zip(available, next_hour,
+                                     rng.integers(-HOUR, 2 * HOUR, 1000))]
+
+        result = forecast(queues, now, step=HOUR / 8, q=[0, 100])
+        expected = [sum(curve) for curve in zip(
+            *(forecast([q], now, step=HOUR / 8).total for q in queues))]
+
+        assert list(result.total) == pytest.approx(expected)
+
+    def test_forecast_empty(self, now):
+        result = forecast([], now)
+
+        assert numpy.all(result.total == 0)
+        assert result.percentiles == dict()
+
+    def test_snapshots(self, tmp_path, now):
+        with SnapshotLog(str(tmp_path / 'log')) as log:
+            for epoch, available in enumerate([1, 2, 3]):
+                log.append(UserInformation('a', 0, 0, 0),
+                           StudyQueue(available, now, available,
+                                      available), epoch=epoch)
+                log.append(UserInformation('b', 0, 0, 0),
+                           StudyQueue(10, now, 10, 10), epoch=epoch)
+
+            latest = latest_per_user(log.read())
+
+        assert sorted(latest['reviews_available']) == [3, 10]
+        assert set(latest['user']) == {user_id('a'), user_id('b')}
+        assert list(percentiles(latest, q=[100])['next_day']) == [10]
+        assert forecast(latest, now).total[0] == 13
+
+    def test_missing_fields(self):
+        with pytest.raises(ValueError):
+            forecast(numpy.zeros(3, dtype=[('next_review', 'f8')]))
@@ -0,0 +1,245 @@
+import asyncio
+
+import pytest
+
+from aioresponses import aioresponses
+
+from pybunpro import (SchemaError, BunproAPIError, ResponseCache,
+                      ValidatorCache, RetryPolicy, UserSnapshot)
+from pybunpro.aio import AsyncBunproClient
+
+
+class TestAsyncBunproClient(object):
+
+    @pytest.fixture
+    def aio_mock(self):
+        with aioresponses() as m:
+            yield m
+
+    @pytest.fixture
+    def mock_bad_requested_info_response(self, user_information_dict):
+        return dict(user_information=user_information_dict,
+                    requested_information=dict())
+
+    def run(self, coro):
+        return asyncio.run(coro)
+
+    def test_constructor(self, api_key):
+        client = AsyncBunproClient(api_key)
+        assert client._user_base_url == f'https://bunpro.jp/api/user/{api_key}'
+        assert client._session is None
+
+    def test_study_queue(self, aio_mock, api_key, mock_study_queue_response,
+                         user_information, study_queue):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=mock_study_queue_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key) as client:
+                return await client.study_queue()
+
+        r_user_info, r_requested_info = self.run(call())
+
+        assert r_user_info == user_information
+        assert r_requested_info == study_queue
+
+    def test_study_queue_parse_error(self, aio_mock, api_key,
+                                     mock_bad_requested_info_response):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=mock_bad_requested_info_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key) as client:
+                return await client.study_queue()
+
+        with pytest.raises(SchemaError):
+            self.run(call())
+
+    def test_study_queue_http_error(self, aio_mock, api_key, error_response):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=error_response, status=400)
+
+        async def call():
+            async with AsyncBunproClient(api_key) as client:
+                return await client.study_queue()
+
+        with pytest.raises(BunproAPIError) as e:
+            self.run(call())
+
+        assert e.value.status_code == 400
+        assert e.value.errors == ['User does not exist.']
+
+    def test_recent_items(self, aio_mock, api_key, mock_recent_items_response,
+                          user_information, grammar_point):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items/1',
+                     payload=mock_recent_items_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key) as client:
+                return await client.recent_items(limit=1)
+
+        r_user_info, r_requested_info = self.run(call())
+
+        assert r_user_info == user_information
+        assert r_requested_info == [grammar_point]
+
+    def test_recent_items_large_limit(self, api_key):
+        client = AsyncBunproClient(api_key)
+
+        with pytest.raises(ValueError):
+            self.run(client.recent_items(limit=100))
+
+    def test_concurrent_requests(self, aio_mock, api_key,
+                                 mock_study_queue_response, study_queue):
+        keys = [f'{api_key}{i}' for i in range(20)]
+
+        for key in keys:
+            aio_mock.get(f'https://bunpro.jp/api/user/{key}/study_queue',
+                         payload=mock_study_queue_response)
+
+        async def call():
+            async with AsyncBunproClient() as client:
+                return await asyncio.gather(
+                    *(client.study_queue(api_key=key) for key in keys))
+
+        results = self.run(call())
+
+        assert [queue for _, queue in results] == [study_queue] * len(keys)
+
+    def test_snapshot(self, aio_mock, api_key, mock_study_queue_response,
+                      mock_recent_items_response, user_information,
+                      study_queue, grammar_point):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=mock_study_queue_response)
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items/15',
+                     payload=mock_recent_items_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key) as client:
+                return await client.snapshot(limit=15)
+
+        snapshot = self.run(call())
+
+        assert snapshot == UserSnapshot(user_information, study_queue,
+                                        [grammar_point])
+
+    def test_snapshot_http_error(self, aio_mock, api_key,
+                                 mock_recent_items_response, error_response):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=error_response, status=400)
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                     payload=mock_recent_items_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key) as client:
+                return await client.snapshot()
+
+        with pytest.raises(BunproAPIError):
+            self.run(call())
+
+    def test_close_without_session(self):
+        client = AsyncBunproClient()
+        self.run(client.close())
+        assert client._session is None
+
+    def test_study_queues(self, aio_mock, api_key, mock_study_queue_response,
+                          error_response, study_queue):
+        keys = [f'{api_key}{i}' for i in range(10)]
+
+        for key in keys[1:]:
+            aio_mock.get(f'https://bunpro.jp/api/user/{key}/study_queue',
+                         payload=mock_study_queue_response)
+
+        aio_mock.get(f'https://bunpro.jp/api/user/{keys[0]}/study_queue',
+                     payload=error_response, status=400)
+
+        async def call():
+            async with AsyncBunproClient() as client:
+                return [r async for r in client.study_queues(
+                    keys, concurrency=3)]
+
+        results = {r.api_key: r for r in self.run(call())}
+
+        assert set(results) == set(keys)
+        assert isinstance(results[keys[0]].error, BunproAPIError)
+        assert results[keys[1]].requested_information == study_queue
+
+    def test_recent_items_many(self, aio_mock, api_key,
+                               mock_recent_items_response, grammar_point):
+        keys = [f'{api_key}{i}' for i in range(3)]
+
+        for key in keys:
+            aio_mock.get(f'https://bunpro.jp/api/user/{key}/recent_items',
+                         payload=mock_recent_items_response)
+
+        async def call():
+            async with AsyncBunproClient() as client:
+                return [r async for r in client.recent_items_many(keys)]
+
+        results = self.run(call())
+
+        assert sorted(r.api_key for r in results) == keys
+        assert all(r.requested_information == [grammar_point]
+                   for r in results)
+
+    def test_study_queue_cached(self, aio_mock, api_key,
+                                mock_study_queue_response):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=mock_study_queue_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key,
+                                         cache=ResponseCache()) as client:
+                return await client.study_queue(), await client.study_queue()
+
+        first, second = self.run(call())
+
+        assert second is first
+
+    def test_study_queue_not_modified(self, aio_mock, api_key,
+                                      mock_study_queue_response):
+        url = f'https://bunpro.jp/api/user/{api_key}/study_queue'
+        aio_mock.get(url, payload=mock_study_queue_response,
+                     headers={'ETag': '"v1"'})
+        aio_mock.get(url, status=304)
+
+        async def call():
+            async with AsyncBunproClient(
+                    api_key, validator_cache=ValidatorCache()) as client:
+                return await client.study_queue(), await client.study_queue()
+
+        first, second = self.run(call())
+
+        assert second is first
+
+    def test_study_queue_coalesced(self, aio_mock, api_key,
+                                   mock_study_queue_response):
+        aio_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                     payload=mock_study_queue_response)
+
+        async def call():
+            async with AsyncBunproClient(api_key, coalesce=True) as client:
+                return await asyncio.gather(
+                    *(client.study_queue() for _ in range(5)))
+
+        results = self.run(call())
+
+        assert all(r is results[0] for r in results)
+
+    def test_study_queue_retries_after_429(self, aio_mock, api_key,
+                                           mock_study_queue_response,
+                                           error_response, study_queue):
+        url = f'https://bunpro.jp/api/user/{api_key}/study_queue'
+        aio_mock.get(url, payload=error_response, status=429,
+                     headers={'Retry-After': '0'})
+        aio_mock.get(url, payload=mock_study_queue_response)
+
+        async def call():
+            async with AsyncBunproClient(
+                    api_key,
+                    retry_policy=RetryPolicy(random=lambda: 0)) as client:
+                return await client.study_queue()
+
+        _, r_study_queue = self.run(call())
+
+        assert r_study_queue == study_queue
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from benchmarks.__main__ import load_baseline, regressions
+from benchmarks.suite import GROUPS, Result
+
+
+class TestBenchmarks(object):
+
+    def test_load_baseline(self, tmp_path):
+        path = tmp_path / 'baseline.json'
+        path.write_text(json.dumps({'a': 0.5, 'b': 2.0}))
+
+        assert load_baseline(str(path)) == dict(a=0.5, b=2.0)
+
+    def test_load_missing_baseline(self, tmp_path):
+        assert load_baseline(str(tmp_path / 'baseline.json')) == dict()
+
+    @pytest.mark.parametrize('seconds,expected', [
+        # Faster than the baseline
+        (0.5, []),
+        # Slower, but within the threshold
+        (1.2, []),
+        (1.25, []),
+        # Slower than the threshold allows
+        (1.3, ['a']),
+    ])
+    def test_regressions(self, seconds, expected):
+        assert regressions([Result('a', seconds)], dict(a=1.0),
+                           threshold=0.25) == expected
+
+    def test_regressions_without_baseline(self):
+        results = [Result('a', 5.0), Result('new', 5.0)]
+
+        assert regressions(results, dict(a=1.0), threshold=0.25) == ['a']
+
+    @pytest.mark.parametrize('group', sorted(GROUPS))
+    def test_unselected_benchmarks_do_not_run(self, group):
+        assert list(GROUPS[group](1.0, lambda name: False)) == []
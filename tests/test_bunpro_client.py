@@ -1,10 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import re
+import threading
+import time
+
 import pytest
+import requests
 
-from pybunpro import BunproClient, SchemaError, BunproAPIError
+from pybunpro import (BunproClient, SchemaError, BunproAPIError, BulkResult,
+                      ResponseCache, ValidatorCache, RateLimiter, RetryPolicy,
+                      UserSnapshot)
+from pybunpro.schemas import UserInformationSchema
 
 
 class TestBunproClient(object):
 
+    @pytest.fixture
+    def closed_sessions(self, monkeypatch):
+        closed = []
+        monkeypatch.setattr(requests.Session, 'close',
+                            lambda session: closed.append(session))
+        return closed
+
     @pytest.fixture
     def mock_bad_user_info_response(self, study_queue_information_dict):
         return dict(user_information=dict(),
@@ -18,10 +35,52 @@ class TestBunproClient(object):
     def test_constructor(self, api_key):
         client = BunproClient(api_key)
         assert client._user_base_url == f'https://bunpro.jp/api/user/{api_key}'
+        assert client.api_key == api_key
+
+    def test_constructor_base_url(self, api_key):
+        client = BunproClient(api_key, base_url='http://localhost:8080/api/')
+        assert client._user_base_url == f'http://localhost:8080/api/{api_key}'
 
     def test_constructor_none_api_key(self):
         client = BunproClient()
         assert client._user_base_url is None
+        assert client.api_key is None
+
+    def test_constructor_pool_config(self):
+        client = BunproClient(pool_connections=2, pool_maxsize=20)
+        adapter = client._session.get_adapter('https://bunpro.jp')
+
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 20
+
+    def test_constructor_keep_alive_disabled(self):
+        client = BunproClient(keep_alive=False)
+        assert client._session.headers['Connection'] == 'close'
+
+    def test_context_manager_closes_session(self, closed_sessions):
+        with BunproClient() as client:
+            assert closed_sessions == []
+
+        assert closed_sessions == [client._session]
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr('pybunpro.client.time.sleep', sleeps.append)
+        return sleeps
+
+    def test_requests_reuse_session(self, requests_mock, api_key,
+                                    mock_study_queue_response):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        client = BunproClient(api_key)
+        session = client._session
+
+        client.study_queue()
+        client.study_queue()
+
+        assert client._session is session
+        assert requests_mock.call_count == 2
 
     def test_study_queue(self, requests_mock, api_key,
                          mock_study_queue_response, user_information,
@@ -142,3 +201,359 @@ class TestBunproClient(object):
         client = BunproClient(api_key)
         base_url = client._get_base_url(override_key)
         assert base_url == f'https://bunpro.jp/api/user/{override_key}'
+
+    def test_study_queues(self, requests_mock, api_key,
+                          mock_study_queue_response, error_response,
+                          user_information, study_queue):
+        keys = [f'{api_key}{i}' for i in range(25)]
+
+        for key in keys:
+            requests_mock.get(f'https://bunpro.jp/api/user/{key}/study_queue',
+                              json=mock_study_queue_response)
+
+        requests_mock.get(f'https://bunpro.jp/api/user/{keys[3]}/study_queue',
+                          json=error_response, status_code=400)
+        client = BunproClient()
+
+        results = {r.api_key: r
+                   for r in client.study_queues(keys, concurrency=4)}
+
+        assert set(results) == set(keys)
+        assert isinstance(results[keys[3]].error, BunproAPIError)
+        assert results[keys[0]] == BulkResult(keys[0], user_information,
+                                              study_queue)
+
+    def test_study_queues_consumes_keys_lazily(self, requests_mock, api_key,
+                                               mock_study_queue_response):
+        requests_mock.get(re.compile(r'/study_queue$'),
+                          json=mock_study_queue_response)
+        pulled = []
+
+        def keys():
+            for i in range(1000):
+                pulled.append(i)
+                yield f'{api_key}{i}'
+
+        client = BunproClient()
+        results = client.study_queues(keys(), concurrency=2)
+        next(results)
+        results.close()
+
+        assert len(pulled) <= 4
+
+    def test_study_queues_invalid_concurrency(self):
+        client = BunproClient()
+
+        with pytest.raises(ValueError):
+            list(client.study_queues(['key'], concurrency=0))
+
+    def test_recent_items_many(self, requests_mock, api_key,
+                               mock_recent_items_response, user_information,
+                               grammar_point):
+        keys = [f'{api_key}{i}' for i in range(5)]
+
+        for key in keys:
+            requests_mock.get(
+                f'https://bunpro.jp/api/user/{key}/recent_items/1',
+                json=mock_recent_items_response)
+
+        client = BunproClient()
+        results = list(client.recent_items_many(keys, limit=1))
+
+        assert sorted(r.api_key for r in results) == keys
+        assert all(r.error is None for r in results)
+        assert results[0].user_information == user_information
+        assert results[0].requested_information == [grammar_point]
+
+    def test_study_queue_cached(self, requests_mock, api_key,
+                                mock_study_queue_response, study_queue):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        cache = ResponseCache()
+        client = BunproClient(api_key, cache=cache)
+
+        first = client.study_queue()
+        second = client.study_queue(api_key=api_key)
+
+        assert second is first
+        assert requests_mock.call_count == 1
+        assert cache.stats.hits == 1
+
+    def test_recent_items_cached_per_limit(self, requests_mock, api_key,
+                                           mock_recent_items_response):
+        requests_mock.get(re.compile(r'/recent_items/\d+$'),
+                          json=mock_recent_items_response)
+        client = BunproClient(api_key, cache=ResponseCache())
+
+        client.recent_items(limit=1)
+        client.recent_items(limit=1)
+        client.recent_items(limit=2)
+
+        assert requests_mock.call_count == 2
+
+    def test_errors_not_cached(self, requests_mock, api_key, error_response):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=error_response, status_code=400)
+        cache = ResponseCache()
+        client = BunproClient(api_key, cache=cache)
+
+        for _ in range(2):
+            with pytest.raises(BunproAPIError):
+                client.study_queue()
+
+        assert requests_mock.call_count == 2
+        assert len(cache) == 0
+
+    def test_study_queue_not_modified(self, requests_mock, api_key,
+                                      mock_study_queue_response):
+        url = f'https://bunpro.jp/api/user/{api_key}/study_queue'
+        requests_mock.get(url, [
+            dict(json=mock_study_queue_response,
+                 headers={'ETag': '"v1"',
+                          'Last-Modified': 'Sat, 11 May 2019 00:00:00 GMT'}),
+            dict(status_code=304)])
+        client = BunproClient(api_key, validator_cache=ValidatorCache())
+
+        first = client.study_queue()
+        second = client.study_queue()
+
+        assert second is first
+        assert 'If-None-Match' not in requests_mock.request_history[0].headers
+        assert requests_mock.request_history[1].headers['If-None-Match'] == \
+            '"v1"'
+        assert requests_mock.request_history[1].headers[
+            'If-Modified-Since'] == 'Sat, 11 May 2019 00:00:00 GMT'
+
+    def test_recent_items_unchanged_body(self, requests_mock, api_key,
+                                         mock_recent_items_response):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_recent_items_response)
+        client = BunproClient(api_key, validator_cache=ValidatorCache())
+
+        first = client.recent_items()
+        second = client.recent_items()
+
+        assert second is first
+        assert requests_mock.call_count == 2
+
+    def test_recent_items_changed_body(self, requests_mock, api_key,
+                                       mock_recent_items_response,
+                                       grammar_point_dict):
+        changed = dict(mock_recent_items_response,
+                       requested_information=[grammar_point_dict] * 2)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          [dict(json=mock_recent_items_response),
+                           dict(json=changed)])
+        client = BunproClient(api_key, validator_cache=ValidatorCache())
+
+        _, first = client.recent_items()
+        _, second = client.recent_items()
+
+        assert len(first) == 1
+        assert len(second) == 2
+
+    def test_study_queue_coalesced(self, requests_mock, api_key,
+                                   mock_study_queue_response):
+        release = threading.Event()
+
+        def respond(request, context):
+            release.wait(5)
+            return mock_study_queue_response
+
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=respond)
+        client = BunproClient(api_key, coalesce=True)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(client.study_queue) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert requests_mock.call_count == 1
+        assert all(r is results[0] for r in results)
+
+    def test_study_queue_retries_after_429(self, requests_mock, api_key,
+                                           mock_study_queue_response,
+                                           error_response, study_queue,
+                                           sleeps):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          [dict(json=error_response, status_code=429,
+                                headers={'Retry-After': '2'}),
+                           dict(json=mock_study_queue_response)])
+        client = BunproClient(api_key,
+                              retry_policy=RetryPolicy(random=lambda: 0))
+
+        _, r_study_queue = client.study_queue()
+
+        assert r_study_queue == study_queue
+        assert sleeps == [2]
+
+    def test_study_queue_retries_exhausted(self, requests_mock, api_key,
+                                           error_response, sleeps):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=error_response, status_code=429)
+        client = BunproClient(api_key,
+                              retry_policy=RetryPolicy(max_retries=2))
+
+        with pytest.raises(BunproAPIError) as e:
+            client.study_queue()
+
+        assert e.value.status_code == 429
+        assert requests_mock.call_count == 3
+        assert len(sleeps) == 2
+
+    def test_study_queue_no_retry_policy(self, requests_mock, api_key,
+                                         error_response):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=error_response, status_code=429)
+        client = BunproClient(api_key, retry_policy=None)
+
+        with pytest.raises(BunproAPIError):
+            client.study_queue()
+
+        assert requests_mock.call_count == 1
+
+    def test_study_queue_rate_limited(self, requests_mock, api_key,
+                                      mock_study_queue_response):
+        requests_mock.get(re.compile(r'/study_queue$'),
+                          json=mock_study_queue_response)
+        reserved = []
+
+        class Limiter(RateLimiter):
+            def reserve(self, key):
+                reserved.append(key)
+                return 0.0
+
+        client = BunproClient(api_key, rate_limiter=Limiter())
+        client.study_queue()
+        client.study_queue(api_key='other')
+
+        assert reserved == [api_key, 'other']
+
+    def test_study_queue_fast_decode(self, requests_mock, api_key,
+                                     mock_study_queue_response,
+                                     user_information, study_queue):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        client = BunproClient(api_key, fast_decode=True)
+
+        assert client.study_queue() == (user_information, study_queue)
+
+    def test_recent_items_fast_decode(self, requests_mock, api_key,
+                                      mock_recent_items_response,
+                                      user_information, grammar_point):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_recent_items_response)
+        client = BunproClient(api_key, fast_decode=True)
+
+        assert client.recent_items() == (user_information, [grammar_point])
+
+    def test_recent_items_fast_decode_parse_error(
+            self, requests_mock, api_key, mock_bad_requested_info_response):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_bad_requested_info_response)
+        client = BunproClient(api_key, fast_decode=True)
+
+        with pytest.raises(SchemaError):
+            client.recent_items()
+
+    def test_json_decoder(self, requests_mock, api_key,
+                          mock_study_queue_response, study_queue):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        bodies = []
+
+        def loads(body):
+            bodies.append(body)
+            return json.loads(body)
+
+        client = BunproClient(api_key, json_decoder=loads)
+        _, r_study_queue = client.study_queue()
+
+        assert r_study_queue == study_queue
+        assert bodies == [json.dumps(mock_study_queue_response).encode()]
+
+    def test_unknown_json_decoder(self):
+        with pytest.raises(ValueError):
+            BunproClient(json_decoder='yaml')
+
+    @pytest.fixture
+    def user_information_loads(self, monkeypatch):
+        loads = []
+        load = UserInformationSchema.load
+
+        def counting_load(schema, data, *args, **kwargs):
+            loads.append(data)
+            return load(schema, data, *args, **kwargs)
+
+        monkeypatch.setattr(UserInformationSchema, 'load', counting_load)
+        return loads
+
+    def test_snapshot(self, requests_mock, api_key, mock_study_queue_response,
+                      mock_recent_items_response, user_information,
+                      study_queue, grammar_point, user_information_loads):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        requests_mock.get(
+            f'https://bunpro.jp/api/user/{api_key}/recent_items/15',
+            json=mock_recent_items_response)
+
+        with BunproClient(api_key) as client:
+            snapshot = client.snapshot(limit=15)
+
+        assert snapshot == UserSnapshot(user_information, study_queue,
+                                        [grammar_point])
+        assert requests_mock.call_count == 2
+        assert len(user_information_loads) == 1
+
+    def test_snapshot_shares_cache(self, requests_mock, api_key,
+                                   mock_study_queue_response,
+                                   mock_recent_items_response,
+                                   user_information, grammar_point):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_recent_items_response)
+
+        with BunproClient(api_key, cache=ResponseCache()) as client:
+            client.snapshot()
+            r_user_info, r_requested_info = client.recent_items()
+
+        assert r_user_info == user_information
+        assert r_requested_info == [grammar_point]
+        assert requests_mock.call_count == 2
+
+    def test_snapshot_fast_decode(self, requests_mock, api_key,
+                                  mock_study_queue_response,
+                                  mock_recent_items_response,
+                                  user_information, study_queue,
+                                  grammar_point):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_recent_items_response)
+
+        with BunproClient(api_key, fast_decode=True) as client:
+            snapshot = client.snapshot()
+
+        assert snapshot == UserSnapshot(user_information, study_queue,
+                                        [grammar_point])
+
+    @pytest.mark.parametrize('failing', ['study_queue', 'recent_items'])
+    def test_snapshot_http_error(self, requests_mock, api_key,
+                                 mock_study_queue_response,
+                                 mock_recent_items_response, error_response,
+                                 failing):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_recent_items_response)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/{failing}',
+                          json=error_response, status_code=400)
+
+        with BunproClient(api_key) as client:
+            with pytest.raises(BunproAPIError) as e:
+                client.snapshot()
+
+        assert e.value.errors == ['User does not exist.']
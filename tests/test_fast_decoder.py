@@ -0,0 +1,71 @@
+import pytest
+
+from pybunpro import (SchemaError, UserInformationSchema, StudyQueueSchema,
+                      GrammarPointSchema)
+from pybunpro.decoders import (_USER_INFORMATION_DECODER, _STUDY_QUEUE_DECODER,
+                               _GRAMMAR_POINT_DECODER)
+
+
+class TestFastDecoder(object):
+
+    def test_load_user_information(self, user_information,
+                                   user_information_dict):
+        assert _USER_INFORMATION_DECODER.load(user_information_dict) == \
+            user_information
+
+    def test_load_study_queue(self, study_queue, study_queue_dict):
+        assert _STUDY_QUEUE_DECODER.load(study_queue_dict) == study_queue
+
+    def test_load_grammar_point(self, grammar_point, grammar_point_dict):
+        assert _GRAMMAR_POINT_DECODER.load(grammar_point_dict) == \
+            grammar_point
+
+    def test_matches_schemas(self, user_information_dict, study_queue_dict,
+                             grammar_point_dict):
+        user_info, _ = UserInformationSchema().load(user_information_dict)
+        queue, _ = StudyQueueSchema().load(study_queue_dict)
+        points, _ = GrammarPointSchema(many=True).load([grammar_point_dict])
+
+        assert _USER_INFORMATION_DECODER.load(user_information_dict) == \
+            user_info
+        assert _STUDY_QUEUE_DECODER.load(study_queue_dict) == queue
+        assert _GRAMMAR_POINT_DECODER.load_many([grammar_point_dict]) == \
+            points
+
+    def test_missing_field(self, user_information_dict):
+        del user_information_dict['username']
+
+        with pytest.raises(SchemaError) as e:
+            _USER_INFORMATION_DECODER.load(user_information_dict)
+
+        assert e.value.error == dict(
+            username=['Missing data for required field.'])
+
+    def test_wrong_type(self, study_queue_dict):
+        study_queue_dict['reviews_available'] = '7'
+        study_queue_dict['next_review_date'] = True
+
+        with pytest.raises(SchemaError) as e:
+            _STUDY_QUEUE_DECODER.load(study_queue_dict)
+
+        assert e.value.error == dict(
+            reviews_available=['Not a valid int.'],
+            next_review_date=['Not a valid float/int.'])
+
+    def test_not_a_dict(self):
+        with pytest.raises(SchemaError) as e:
+            _STUDY_QUEUE_DECODER.load([])
+
+        assert e.value.error == dict(_schema=['Invalid input type.'])
+
+    def test_load_many_errors_indexed(self, grammar_point_dict):
+        with pytest.raises(SchemaError) as e:
+            _GRAMMAR_POINT_DECODER.load_many([grammar_point_dict, dict()])
+
+        assert list(e.value.error) == [1]
+        assert set(e.value.error[1]) == {'grammar_point', 'created_at_date',
+                                         'updated_at_date'}
+
+    def test_load_many_not_a_list(self):
+        with pytest.raises(SchemaError):
+            _GRAMMAR_POINT_DECODER.load_many(dict())
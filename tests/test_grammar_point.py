@@ -11,3 +11,28 @@ class TestGrammarPoint(object):
         assert grammar_point.grammar_point == grammar_point_item
         assert grammar_point.created_at_date == created_at_date
         assert grammar_point.updated_at_date == updated_at_date
+
+    def test_slots(self, grammar_point):
+        assert not hasattr(grammar_point, '__dict__')
+
+    def test_lazy_timestamps(self, grammar_point_item, created_at_date,
+                             created_at_date_ts, updated_at_date,
+                             updated_at_date_ts):
+        grammar_point = GrammarPoint(grammar_point_item, created_at_date_ts,
+                                     updated_at_date_ts)
+
+        assert grammar_point._created_at_date == created_at_date_ts
+        assert grammar_point.created_at_date == created_at_date
+        assert grammar_point.updated_at_date == updated_at_date
+        assert grammar_point.created_at_date is grammar_point.created_at_date
+
+    def test_timestamps(self, grammar_point, created_at_date_ts,
+                        updated_at_date_ts):
+        assert grammar_point.created_at_timestamp == created_at_date_ts
+        assert grammar_point.updated_at_timestamp == updated_at_date_ts
+
+    def test_equal_to_eager(self, grammar_point, grammar_point_item,
+                            created_at_date_ts, updated_at_date_ts):
+        assert grammar_point == GrammarPoint(grammar_point_item,
+                                             created_at_date_ts,
+                                             updated_at_date_ts)
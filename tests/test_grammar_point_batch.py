@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from pybunpro import GrammarPoint, SchemaError
+from pybunpro.batch import GrammarPointBatch
+
+
+class TestGrammarPointBatch(object):
+
+    @pytest.fixture
+    def grammar_points(self):
+        return [GrammarPoint(name,
+                             datetime.fromtimestamp(ts, tz=timezone.utc),
+                             datetime.fromtimestamp(ts + 60,
+                                                    tz=timezone.utc))
+                for name, ts in [('でも', 1557532800), ('から', 1557619200),
+                                 ('ので', 1557705600)]]
+
+    @pytest.fixture
+    def batch(self, grammar_points):
+        return GrammarPointBatch.from_grammar_points(grammar_points)
+
+    def test_sequence_access(self, batch, grammar_points):
+        assert len(batch) == 3
+        assert batch[0] == grammar_points[0]
+        assert batch[-1] == grammar_points[-1]
+        assert list(batch) == grammar_points
+
+    def test_slice(self, batch, grammar_points):
+        sliced = batch[1:]
+
+        assert isinstance(sliced, GrammarPointBatch)
+        assert list(sliced) == grammar_points[1:]
+
+    def test_index_error(self, batch):
+        with pytest.raises(IndexError):
+            batch[3]
+
+    def test_columns(self, batch):
+        assert batch.grammar_points == ('でも', 'から', 'ので')
+        assert list(batch.created_at_epochs) == [1557532800, 1557619200,
+                                                 1557705600]
+        assert list(batch.updated_at_epochs) == [1557532860, 1557619260,
+                                                 1557705660]
+
+    def test_columns_read_only(self, batch):
+        with pytest.raises(TypeError):
+            batch.created_at_epochs[0] = 0
+
+    def test_from_json(self, batch):
+        items = [dict(grammar_point=g, created_at_date=c, updated_at_date=u)
+                 for g, c, u in zip(batch.grammar_points,
+                                    batch.created_at_epochs,
+                                    batch.updated_at_epochs)]
+
+        assert GrammarPointBatch.from_json(items) == batch
+
+    def test_from_json_invalid(self):
+        with pytest.raises(SchemaError):
+            GrammarPointBatch.from_json([dict(grammar_point='でも')])
+
+    def test_updated_since(self, batch, grammar_points):
+        assert list(batch.updated_since(1557619260)) == grammar_points[2:]
+
+    def test_latest_update(self, batch):
+        assert batch.latest_update() == 1557705660
+
+    def test_mismatched_columns(self):
+        with pytest.raises(ValueError):
+            GrammarPointBatch(['でも'], [1557532800], [])
+
+    def test_strings_interned(self, grammar_points):
+        first = GrammarPointBatch.from_grammar_points(grammar_points)
+        second = GrammarPointBatch.from_json(
+            [dict(grammar_point=''.join(['で', 'も']),
+                  created_at_date=0, updated_at_date=0)])
+
+        assert first.grammar_points[0] is second.grammar_points[0]
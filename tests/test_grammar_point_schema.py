@@ -16,3 +16,17 @@ class TestGrammarPointSchema(object):
 
         assert errors == dict()
         assert result == grammar_point
+
+    def test_load_keeps_timestamps(self, grammar_point_dict,
+                                   created_at_date_ts):
+        schema = GrammarPointSchema()
+        result, errors = schema.load(grammar_point_dict)
+
+        assert result._created_at_date == created_at_date_ts
+
+    def test_load_invalid_timestamp(self, grammar_point_dict):
+        grammar_point_dict['created_at_date'] = 'yesterday'
+        schema = GrammarPointSchema()
+        _, errors = schema.load(grammar_point_dict)
+
+        assert errors == dict(created_at_date=['Not a valid timestamp.'])
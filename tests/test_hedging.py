@@ -0,0 +1,167 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from pybunpro import (BunproClient, BunproAPIError, HedgePolicy,
+                      MetricsRecorder, RateLimiter)
+from pybunpro.aio import AsyncBunproClient
+from pybunpro.stubserver import StubServer
+
+
+def stall_first(seconds):
+    """
+    A stub latency which stalls only the first request
+    """
+    counter = itertools.count()
+    return lambda rng: seconds if next(counter) == 0 else 0.0
+
+
+class TestHedgePolicy(object):
+
+    def test_fixed_delay(self):
+        policy = HedgePolicy(delay=0.2)
+
+        for _ in range(100):
+            policy.observe(5)
+
+        assert policy.delay() == 0.2
+
+    def test_percentile_delay(self):
+        policy = HedgePolicy(delay=0.2, percentile=90, min_samples=10)
+
+        for latency in range(1, 10):
+            policy.observe(latency)
+
+        assert policy.delay() == 0.2
+
+        policy.observe(10)
+        assert policy.delay() == 9
+
+    def test_window(self):
+        policy = HedgePolicy(percentile=100, window=2, min_samples=1)
+
+        for latency in (10, 1, 2):
+            policy.observe(latency)
+
+        assert policy.delay() == 2
+
+    @pytest.mark.parametrize('kwargs', [dict(delay=0),
+                                        dict(percentile=0),
+                                        dict(percentile=101),
+                                        dict(max_hedges=0)])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            HedgePolicy(**kwargs)
+
+
+class TestHedgedRequests(object):
+
+    @pytest.fixture
+    def recorder(self):
+        return MetricsRecorder()
+
+    def test_hedge_wins(self, recorder):
+        with StubServer(latency=stall_first(1)) as stub, \
+                BunproClient('key', base_url=stub.url, metrics=recorder,
+                             hedge_policy=HedgePolicy(delay=0.05)) as client:
+            started = time.monotonic()
+            client.study_queue()
+            elapsed = time.monotonic() - started
+
+        assert elapsed < 0.5
+        metrics, = recorder.records
+        assert (metrics.attempts, metrics.hedges) == (2, 1)
+        assert metrics.status_code == 200
+
+    def test_fast_response_not_hedged(self, recorder):
+        with StubServer() as stub, \
+                BunproClient('key', base_url=stub.url, metrics=recorder,
+                             hedge_policy=HedgePolicy(delay=1)) as client:
+            client.study_queue()
+
+        metrics, = recorder.records
+        assert (metrics.attempts, metrics.hedges) == (1, 0)
+        assert stub.requests == {200: 1}
+
+    def test_queued_attempts_not_hedged(self, recorder):
+        keys = [f'key{i}' for i in range(8)]
+
+        # Attempts wait for the only worker for longer than the delay, but
+        # every response is faster than it
+        with StubServer(latency=lambda rng: 0.1) as stub, \
+                BunproClient(base_url=stub.url, metrics=recorder,
+                             pool_maxsize=1,
+                             hedge_policy=HedgePolicy(delay=0.3)) as client:
+            results = list(client.study_queues(keys, concurrency=8))
+
+        assert all(result.error is None for result in results)
+        assert stub.requests == {200: len(keys)}
+        assert {metrics.hedges for metrics in recorder.records} == {0}
+
+    def test_max_hedges(self, recorder):
+        with StubServer(latency=lambda rng: 0.3) as stub, \
+                BunproClient('key', base_url=stub.url, metrics=recorder,
+                             hedge_policy=HedgePolicy(delay=0.02,
+                                                      max_hedges=2)) \
+                as client:
+            client.study_queue()
+
+        metrics, = recorder.records
+        assert (metrics.attempts, metrics.hedges) == (3, 2)
+
+    def test_hedges_count_against_rate_limit(self, recorder):
+        limiter = RateLimiter(rate=0.01, burst=1)
+
+        with StubServer(latency=stall_first(0.3)) as stub, \
+                BunproClient('key', base_url=stub.url, metrics=recorder,
+                             rate_limiter=limiter,
+                             hedge_policy=HedgePolicy(delay=0.02)) as client:
+            client.study_queue()
+
+        metrics, = recorder.records
+        assert (metrics.attempts, metrics.hedges) == (1, 0)
+
+    def test_every_attempt_fails(self, recorder):
+        with StubServer(latency=lambda rng: 0.1, error_rate=1) as stub, \
+                BunproClient('key', base_url=stub.url, metrics=recorder,
+                             retry_policy=None,
+                             hedge_policy=HedgePolicy(delay=0.02)) as client:
+            with pytest.raises(BunproAPIError) as e:
+                client.study_queue()
+
+        assert e.value.status_code == 500
+        metrics, = recorder.records
+        assert (metrics.attempts, metrics.hedges) == (2, 1)
+        assert metrics.outcome == 'error'
+
+    def test_async_hedge_wins(self, recorder):
+        policy = HedgePolicy(delay=0.05)
+
+        async def call(url):
+            async with AsyncBunproClient('key', base_url=url,
+                                         metrics=recorder,
+                                         hedge_policy=policy) as client:
+                started = time.monotonic()
+                await client.study_queue()
+                return time.monotonic() - started
+
+        with StubServer(latency=stall_first(1)) as stub:
+            assert asyncio.run(call(stub.url)) < 0.5
+
+        metrics, = recorder.records
+        assert (metrics.attempts, metrics.hedges) == (2, 1)
+        # Both the winner and the cancelled request were observed
+        assert len(policy._latencies) == 2
+
+    def test_async_every_attempt_fails(self):
+        async def call(url):
+            async with AsyncBunproClient(
+                    'key', base_url=url, retry_policy=None,
+                    hedge_policy=HedgePolicy(delay=0.02)) as client:
+                await client.study_queue()
+
+        with StubServer(latency=lambda rng: 0.1, error_rate=1) as stub:
+            with pytest.raises(BunproAPIError):
+                asyncio.run(call(stub.url))
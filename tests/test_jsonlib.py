@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from pybunpro.jsonlib import get_decoder, available_decoders
+
+
+class TestJSONLib(object):
+
+    def test_stdlib(self):
+        assert get_decoder('json') is json.loads
+
+    def test_auto_prefers_fastest(self):
+        assert get_decoder('auto') is \
+            next(iter(available_decoders().values()))
+
+    def test_stdlib_always_available(self):
+        assert 'json' in available_decoders()
+
+    def test_callable(self):
+        def loads(data):
+            return data
+
+        assert get_decoder(loads) is loads
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            get_decoder('yaml')
+
+    def test_not_installed(self, monkeypatch):
+        monkeypatch.setattr('pybunpro.jsonlib._decoders', dict())
+        monkeypatch.setattr('pybunpro.jsonlib.importlib.import_module',
+                            self.raise_import_error)
+
+        with pytest.raises(ValueError):
+            get_decoder('orjson')
+
+    @pytest.mark.parametrize('name', list(available_decoders()))
+    def test_decodes_bytes(self, name):
+        data = '{"grammar_point": "でも"}'.encode()
+        assert get_decoder(name)(data) == dict(grammar_point='でも')
+
+    @staticmethod
+    def raise_import_error(name):
+        raise ImportError(name)
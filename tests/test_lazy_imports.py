@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ('requests', 'marshmallow', 'aiohttp')
+
+
+def imported_modules(code):
+    script = f'{code}\nimport sys\nprint(" ".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', script], check=True,
+                            capture_output=True, text=True)
+    return set(result.stdout.splitlines()[-1].split())
+
+
+class TestLazyImports(object):
+
+    @pytest.mark.parametrize('code', [
+        'import pybunpro',
+        'import pybunpro.__main__',
+        'from pybunpro import GrammarPoint, ResponseCache',
+        'from pybunpro.batch import GrammarPointBatch',
+    ])
+    def test_no_heavy_imports(self, code):
+        assert imported_modules(code).isdisjoint(HEAVY_MODULES)
+
+    def test_help_has_no_heavy_imports(self):
+        modules = imported_modules(
+            'from pybunpro.__main__ import cli\n'
+            'try:\n'
+            '    cli(["--help"])\n'
+            'except SystemExit:\n'
+            '    pass')
+        assert modules.isdisjoint(HEAVY_MODULES)
+
+    def test_client_imported_on_access(self):
+        modules = imported_modules('import pybunpro\npybunpro.BunproClient')
+        assert {'requests', 'marshmallow'} <= modules
+
+    def test_unknown_attribute(self):
+        import pybunpro
+
+        with pytest.raises(AttributeError):
+            pybunpro.NotAThing
+
+    def test_dir(self):
+        import pybunpro
+
+        assert {'BunproClient', 'GrammarPoint'} <= set(dir(pybunpro))
@@ -0,0 +1,209 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import threading
+
+import pytest
+
+from pybunpro import (BunproClient, BunproAPIError, MetricsRecorder,
+                      MetricsSink, RequestMetrics, ResponseCache,
+                      ValidatorCache)
+from pybunpro.aio import AsyncBunproClient
+from pybunpro.stubserver import StubServer
+
+
+def make_metrics(**kwargs):
+    return RequestMetrics('study_queue', None, 0.0, **kwargs)
+
+
+class TestMetricsRecorder(object):
+
+    def test_records(self):
+        recorder = MetricsRecorder(maxlen=2)
+        first, second, third = (make_metrics(total=t) for t in (1, 2, 3))
+
+        for metrics in (first, second, third):
+            recorder.record(metrics)
+
+        assert recorder.records == [second, third]
+        assert len(recorder) == 2
+
+        recorder.clear()
+        assert recorder.records == []
+
+    def test_percentile(self):
+        recorder = MetricsRecorder()
+
+        for t in range(1, 101):
+            recorder.record(make_metrics(total=t, ttfb=t / 100))
+
+        recorder.record(make_metrics(total=101))
+
+        assert recorder.percentile('total', 50) == 51
+        assert recorder.percentile('total', 100) == 101
+        assert recorder.percentile('total', 0) == 1
+        assert recorder.percentile('ttfb', 99) == 0.99
+        assert recorder.percentile('connect', 99) is None
+
+    @pytest.mark.parametrize('phase, q', [('size', 50), ('total', 101)])
+    def test_percentile_invalid(self, phase, q):
+        with pytest.raises(ValueError):
+            MetricsRecorder().percentile(phase, q)
+
+
+class TestClientMetrics(object):
+
+    @pytest.fixture
+    def recorder(self):
+        return MetricsRecorder()
+
+    @pytest.fixture
+    def url(self, api_key):
+        return f'https://bunpro.jp/api/user/{api_key}/study_queue'
+
+    def test_fetched(self, requests_mock, api_key, url, recorder,
+                     mock_study_queue_response):
+        body = json.dumps(mock_study_queue_response).encode()
+        requests_mock.get(url, content=body)
+        BunproClient(api_key, metrics=recorder).study_queue()
+
+        metrics, = recorder.records
+        assert metrics.endpoint == 'study_queue'
+        assert metrics.limit is None
+        assert metrics.outcome == 'fetched'
+        assert metrics.status_code == 200
+        assert metrics.attempts == 1
+        assert metrics.response_bytes == len(body)
+        assert metrics.connect is None
+        assert metrics.error is None
+
+        for phase in ('ttfb', 'body_read', 'decode', 'parse'):
+            assert 0 <= getattr(metrics, phase) <= metrics.total
+
+    def test_recent_items(self, requests_mock, api_key, recorder,
+                          mock_recent_items_response):
+        requests_mock.get(
+            f'https://bunpro.jp/api/user/{api_key}/recent_items/5',
+            json=mock_recent_items_response)
+        BunproClient(api_key, metrics=recorder).recent_items(limit=5)
+
+        metrics, = recorder.records
+        assert (metrics.endpoint, metrics.limit) == ('recent_items', 5)
+
+    def test_cache_hit(self, requests_mock, api_key, url, recorder,
+                       mock_study_queue_response):
+        requests_mock.get(url, json=mock_study_queue_response)
+        client = BunproClient(api_key, cache=ResponseCache(),
+                              metrics=recorder)
+
+        client.study_queue()
+        client.study_queue()
+
+        assert [m.outcome for m in recorder.records] == ['fetched',
+                                                         'cache_hit']
+        assert recorder.records[1].attempts == 0
+
+    def test_not_modified(self, requests_mock, api_key, url, recorder,
+                          mock_study_queue_response):
+        requests_mock.get(url, [
+            dict(json=mock_study_queue_response, headers={'ETag': '"v1"'}),
+            dict(status_code=304),
+            dict(json=mock_study_queue_response)])
+        client = BunproClient(api_key, validator_cache=ValidatorCache(),
+                              metrics=recorder)
+
+        for _ in range(3):
+            client.study_queue()
+
+        assert [m.outcome for m in recorder.records] == \
+            ['fetched', 'not_modified', 'unchanged']
+        assert recorder.records[1].status_code == 304
+        assert recorder.records[1].parse is None
+
+    def test_retries(self, requests_mock, api_key, url, recorder,
+                     monkeypatch, mock_study_queue_response, error_response):
+        monkeypatch.setattr('pybunpro.client.time.sleep', lambda s: None)
+        requests_mock.get(url, [
+            dict(json=error_response, status_code=429,
+                 headers={'Retry-After': '2'}),
+            dict(json=mock_study_queue_response)])
+        BunproClient(api_key, metrics=recorder).study_queue()
+
+        metrics, = recorder.records
+        assert metrics.attempts == 2
+        assert metrics.retry_wait >= 2
+        assert metrics.status_code == 200
+
+    def test_error(self, requests_mock, api_key, url, recorder,
+                   error_response):
+        requests_mock.get(url, json=error_response, status_code=400)
+
+        with pytest.raises(BunproAPIError) as e:
+            BunproClient(api_key, metrics=recorder).study_queue()
+
+        metrics, = recorder.records
+        assert metrics.outcome == 'error'
+        assert metrics.error is e.value
+        assert metrics.status_code == 400
+        assert metrics.response_bytes > 0
+
+    def test_coalesced(self, requests_mock, api_key, url, recorder,
+                       mock_study_queue_response):
+        release = threading.Event()
+
+        def respond(request, context):
+            release.wait(5)
+            return mock_study_queue_response
+
+        requests_mock.get(url, json=respond)
+        client = BunproClient(api_key, coalesce=True, metrics=recorder)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(client.study_queue) for _ in range(2)]
+
+            while len(client._single_flight._calls) == 0:
+                pass
+
+            # Give the second call time to join the first
+            threading.Event().wait(0.1)
+            release.set()
+
+            for future in futures:
+                future.result()
+
+        assert requests_mock.call_count == 1
+        assert sorted(m.outcome for m in recorder.records) == \
+            ['coalesced', 'fetched']
+
+    def test_sink_errors_are_ignored(self, requests_mock, api_key, url,
+                                     mock_study_queue_response):
+        class FailingSink(MetricsSink):
+            def record(self, metrics):
+                raise RuntimeError()
+
+        requests_mock.get(url, json=mock_study_queue_response)
+        assert BunproClient(api_key, metrics=FailingSink()).study_queue()
+
+    def test_sink_must_implement_record(self):
+        class IncompleteSink(MetricsSink):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteSink()
+
+    def test_async_client(self, recorder):
+        async def call(client):
+            async with client:
+                await client.study_queue()
+                await client.study_queue()
+
+        with StubServer() as stub:
+            asyncio.run(call(AsyncBunproClient('key', base_url=stub.url,
+                                               metrics=recorder)))
+
+        first, second = recorder.records
+        assert first.outcome == second.outcome == 'fetched'
+        assert first.connect is not None
+        assert 0 <= first.connect <= first.ttfb
+        # The second request reuses the pooled connection
+        assert second.connect is None
@@ -0,0 +1,125 @@
+import io
+import json
+
+import requests
+
+from pybunpro import BulkResult, BunproAPIError, SchemaError
+from pybunpro.output import (error_record, bulk_result_record, csv_columns,
+                             csv_rows, write_json, write_ndjson, write_csv)
+
+
+class TestOutput(object):
+
+    def test_study_queue_record(self, api_key, user_information, study_queue,
+                                user_information_dict,
+                                study_queue_information_dict):
+        result = BulkResult(api_key, user_information, study_queue)
+
+        assert bulk_result_record(result, 'study_queue') == dict(
+            api_key=api_key, user_information=user_information_dict,
+            study_queue=study_queue_information_dict)
+
+    def test_recent_items_record(self, api_key, user_information,
+                                 grammar_point, grammar_point_dict):
+        result = BulkResult(api_key, user_information, [grammar_point])
+
+        assert bulk_result_record(result, 'recent_items')['recent_items'] \
+            == [grammar_point_dict]
+
+    def test_error_record(self, api_key):
+        error = BunproAPIError(requests.HTTPError('400'), status_code=400,
+                               body=dict(errors=[dict(message='Bad')]),
+                               headers=dict())
+        result = BulkResult(api_key, None, None, error)
+
+        assert bulk_result_record(result, 'study_queue') == dict(
+            api_key=api_key, error=dict(type='BunproAPIError', message='400',
+                                        status_code=400, errors=['Bad']))
+
+    def test_schema_error_record(self):
+        error = SchemaError('Bad schema', dict(username=['Missing']))
+
+        assert error_record(error) == dict(type='SchemaError',
+                                           message='Bad schema',
+                                           errors=dict(username=['Missing']))
+
+    def test_other_error_record(self):
+        assert error_record(requests.ConnectionError('refused')) == dict(
+            type='ConnectionError', message='refused')
+
+    def test_write_ndjson(self):
+        stream = io.StringIO()
+
+        assert write_ndjson([dict(a=1), dict(b='でも')], stream) == 2
+        assert [json.loads(line) for line in
+                stream.getvalue().splitlines()] == [dict(a=1), dict(b='でも')]
+
+    def test_csv_rows_study_queue(self, api_key, user_information,
+                                  study_queue, user_information_dict,
+                                  study_queue_information_dict):
+        record = bulk_result_record(
+            BulkResult(api_key, user_information, study_queue),
+            'study_queue')
+
+        assert list(csv_rows([record], 'study_queue')) == [
+            dict(api_key=api_key, **user_information_dict,
+                 **study_queue_information_dict)]
+
+    def test_csv_rows_recent_items(self, user_information, grammar_point,
+                                   grammar_point_dict, username):
+        record = bulk_result_record(
+            BulkResult('a', user_information, [grammar_point, grammar_point]),
+            'recent_items')
+
+        assert list(csv_rows([record], 'recent_items')) == \
+            [dict(api_key='a', username=username, **grammar_point_dict)] * 2
+
+    def test_csv_rows_no_recent_items(self, user_information, username):
+        record = bulk_result_record(
+            BulkResult('a', user_information, []), 'recent_items')
+        stream = io.StringIO()
+
+        assert list(csv_rows([record], 'recent_items')) == \
+            [dict(api_key='a', username=username)]
+        assert write_csv(csv_rows([record], 'recent_items'), stream,
+                         csv_columns('recent_items', batch=True)) == 1
+        assert stream.getvalue().splitlines()[1] == f'a,{username},,,,'
+
+    def test_csv_rows_error(self):
+        record = dict(api_key='a', error=dict(type='ConnectionError',
+                                              message='refused'))
+
+        assert list(csv_rows([record], 'study_queue')) == \
+            [dict(api_key='a', error='refused')]
+
+    def test_csv_columns(self):
+        assert csv_columns('recent_items') == [
+            'username', 'grammar_point', 'created_at_date', 'updated_at_date']
+        assert csv_columns('recent_items', batch=True) == [
+            'api_key', 'username', 'grammar_point', 'created_at_date',
+            'updated_at_date', 'error']
+
+    def test_write_csv(self):
+        stream = io.StringIO()
+
+        assert write_csv(iter([dict(a=1, b='x'), dict(a=2)]), stream,
+                         ['a', 'b']) == 2
+        assert stream.getvalue().splitlines() == ['a,b', '1,x', '2,']
+
+    def test_write_json(self):
+        stream = io.StringIO()
+
+        assert write_json(iter([dict(a=1), dict(a=2)]), stream) == 2
+        assert json.loads(stream.getvalue()) == [dict(a=1), dict(a=2)]
+
+    def test_write_json_empty(self):
+        stream = io.StringIO()
+
+        assert write_json(iter([]), stream) == 0
+        assert json.loads(stream.getvalue()) == []
+
+    def test_write_json_single(self):
+        stream = io.StringIO()
+
+        assert write_json([dict(a=1)], stream, many=False) == 1
+        assert json.loads(stream.getvalue()) == dict(a=1)
@@ -1,4 +1,8 @@
+import json
+import re
+
 import pytest
+import requests
 
 from click.testing import CliRunner
 
@@ -34,6 +38,63 @@ class TestPyBunpro(object):
         assert result.exit_code == 1
         assert 'User does not exist' in result.output
 
+    def test_study_queue_watch(self, requests_mock, api_key, runner,
+                               monkeypatch, mock_study_queue_response,
+                               user_information, study_queue):
+        def sleep(seconds):
+            if len(sleeps) == 2:
+                raise KeyboardInterrupt
+            sleeps.append(seconds)
+
+        sleeps = []
+        monkeypatch.setattr('pybunpro.watch.time.sleep', sleep)
+        changed = dict(mock_study_queue_response)
+        changed['requested_information'] = dict(
+            changed['requested_information'], reviews_available=0)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          [dict(json=mock_study_queue_response),
+                           dict(json=mock_study_queue_response),
+                           dict(json=changed)])
+
+        result = runner.invoke(cli, ['--api-key', api_key,
+                                     'study-queue', '--watch'])
+        assert result.exit_code == 0
+        assert requests_mock.call_count == 3
+        assert result.output.count(str(user_information)) == 2
+        assert str(study_queue) in result.output
+        assert 'reviews_available=0' in result.output
+
+    def test_study_queue_watch_transient_errors(self, requests_mock, api_key,
+                                                runner, monkeypatch,
+                                                mock_study_queue_response,
+                                                study_queue):
+        def sleep(seconds):
+            if len(sleeps) == 2:
+                raise KeyboardInterrupt
+            sleeps.append(seconds)
+
+        sleeps = []
+        monkeypatch.setattr('pybunpro.watch.time.sleep', sleep)
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          [dict(exc=requests.ConnectionError('refused')),
+                           dict(json=dict(errors=[]), status_code=500),
+                           dict(json=mock_study_queue_response)])
+
+        result = runner.invoke(cli, ['--api-key', api_key,
+                                     'study-queue', '--watch',
+                                     '--min-interval', '1'])
+        assert result.exit_code == 0
+        assert sleeps == [1, 2]
+        assert str(study_queue) in result.output
+
+    def test_study_queue_watch_intervals(self, api_key, runner):
+        result = runner.invoke(cli, ['--api-key', api_key,
+                                     'study-queue', '--watch',
+                                     '--min-interval', '60',
+                                     '--max-interval', '30'])
+        assert result.exit_code == 2
+        assert '--min-interval must not be greater' in result.output
+
     def test_recent_items(self, requests_mock, api_key, runner,
                           mock_recent_items_response,
                           user_information,
@@ -57,6 +118,163 @@ class TestPyBunpro(object):
         assert result.exit_code == 1
         assert 'User does not exist' in result.output
 
+    def test_timeout(self, requests_mock, api_key, runner):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          exc=requests.exceptions.ReadTimeout)
+
+        result = runner.invoke(cli, ['--api-key', api_key, '--timeout', '5',
+                                     'study-queue'])
+        assert result.exit_code == 1
+        assert 'Request timed out' in result.output
+
+    def test_api_key_required(self, runner):
+        result = runner.invoke(cli, ['study-queue'])
+        assert result.exit_code == 2
+        assert 'Exactly one of --api-key and --api-key-file' in result.output
+
+    def test_study_queue_batch(self, requests_mock, runner,
+                               mock_study_queue_response,
+                               study_queue_information_dict,
+                               user_information_dict, error_response):
+        requests_mock.get('https://bunpro.jp/api/user/a/study_queue',
+                          json=mock_study_queue_response)
+        requests_mock.get('https://bunpro.jp/api/user/b/study_queue',
+                          json=error_response, status_code=400)
+
+        result = runner.invoke(cli, ['--api-key-file', '-', '--concurrency',
+                                     '2', 'study-queue'],
+                               input='a\n\nb\n')
+        assert result.exit_code == 0
+
+        records = {record['api_key']: record for record in
+                   map(json.loads, result.output.splitlines())}
+        assert records['a'] == dict(
+            api_key='a', user_information=user_information_dict,
+            study_queue=study_queue_information_dict)
+        assert records['b'] == dict(
+            api_key='b', error=dict(type='BunproAPIError',
+                                    message=records['b']['error']['message'],
+                                    status_code=400,
+                                    errors=['User does not exist.']))
+
+    def test_recent_items_batch(self, requests_mock, runner, tmp_path,
+                                mock_recent_items_response,
+                                grammar_point_dict):
+        requests_mock.get('https://bunpro.jp/api/user/a/recent_items/5',
+                          json=mock_recent_items_response)
+        key_file = tmp_path / 'keys.txt'
+        key_file.write_text('a\n')
+
+        result = runner.invoke(cli, ['--api-key-file', str(key_file),
+                                     'recent-items', '--limit', '5'])
+        assert result.exit_code == 0
+        assert json.loads(result.output)['recent_items'] == \
+            [grammar_point_dict]
+
+    def test_batch_watch(self, runner):
+        result = runner.invoke(cli, ['--api-key-file', '-', 'study-queue',
+                                     '--watch'], input='a\n')
+        assert result.exit_code == 2
+        assert '--watch cannot be used' in result.output
+
+    def test_study_queue_json(self, requests_mock, api_key, runner,
+                              mock_study_queue_response,
+                              user_information_dict,
+                              study_queue_information_dict):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+
+        result = runner.invoke(cli, ['--api-key', api_key,
+                                     'study-queue', '--format', 'json'])
+        assert result.exit_code == 0
+        assert json.loads(result.output) == dict(
+            user_information=user_information_dict,
+            study_queue=study_queue_information_dict)
+
+    def test_study_queue_csv(self, requests_mock, api_key, runner,
+                             mock_study_queue_response, username,
+                             reviews_available):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+
+        result = runner.invoke(cli, ['--api-key', api_key,
+                                     'study-queue', '--format', 'csv'])
+        assert result.exit_code == 0
+
+        header, row = result.output.splitlines()
+        assert header.startswith('username,grammar_point_count,')
+        assert row.startswith(f'{username},')
+        assert f',{reviews_available},' in row
+
+    def test_recent_items_ndjson(self, requests_mock, api_key, runner,
+                                 mock_recent_items_response,
+                                 grammar_point_dict):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/recent_items',
+                          json=mock_recent_items_response)
+
+        result = runner.invoke(cli, ['--api-key', api_key,
+                                     'recent-items', '--format', 'ndjson'])
+        assert result.exit_code == 0
+        assert json.loads(result.output)['recent_items'] == \
+            [grammar_point_dict]
+
+    def test_recent_items_batch_csv(self, requests_mock, runner,
+                                    mock_recent_items_response,
+                                    error_response, username):
+        requests_mock.get('https://bunpro.jp/api/user/a/recent_items',
+                          json=mock_recent_items_response)
+        requests_mock.get('https://bunpro.jp/api/user/b/recent_items',
+                          json=error_response, status_code=400)
+
+        result = runner.invoke(cli, ['--api-key-file', '-',
+                                     'recent-items', '--format', 'csv'],
+                               input='a\nb\n')
+        assert result.exit_code == 0
+
+        lines = result.output.splitlines()
+        assert lines[0] == ('api_key,username,grammar_point,created_at_date,'
+                            'updated_at_date,error')
+        assert sorted(lines[1:])[0].startswith(f'a,{username},')
+        assert sorted(lines[1:])[1] == 'b,,,,,User does not exist.'
+
+    def test_study_queue_batch_json(self, requests_mock, runner,
+                                    mock_study_queue_response):
+        requests_mock.get(re.compile(r'/study_queue$'),
+                          json=mock_study_queue_response)
+
+        result = runner.invoke(cli, ['--api-key-file', '-',
+                                     'study-queue', '--format', 'json'],
+                               input='a\nb\nc\n')
+        assert result.exit_code == 0
+        assert sorted(record['api_key'] for record in
+                      json.loads(result.output)) == ['a', 'b', 'c']
+
+    @pytest.mark.parametrize('args,message', [
+        (['--api-key-file', '-', 'study-queue', '--format', 'repr'],
+         '--format repr cannot be used'),
+        (['--api-key', 'a', 'study-queue', '--watch', '--format', 'json'],
+         '--format json cannot be used'),
+    ])
+    def test_format_usage_errors(self, runner, args, message):
+        result = runner.invoke(cli, args, input='a\n')
+        assert result.exit_code == 2
+        assert message in result.output
+
+    def test_persistent_cache(self, requests_mock, api_key, runner, tmp_path,
+                              mock_study_queue_response, study_queue):
+        requests_mock.get(f'https://bunpro.jp/api/user/{api_key}/study_queue',
+                          json=mock_study_queue_response)
+        args = ['--api-key', api_key, '--cache', str(tmp_path / 'cache'),
+                'study-queue']
+
+        first = runner.invoke(cli, args)
+        second = runner.invoke(cli, args)
+
+        assert first.exit_code == second.exit_code == 0
+        assert first.output == second.output
+        assert str(study_queue) in second.output
+        assert requests_mock.call_count == 1
+
     def test_debug_mode(self, requests_mock, api_key, runner,
                         mock_recent_items_response,
                         user_information,
@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import asyncio
+
+import pytest
+
+from pybunpro.ratelimit import (TokenBucket, RateLimiter, RetryPolicy,
+                                parse_retry_after)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(object):
+
+    def test_burst_then_wait(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=2, capacity=2, timer=clock)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_refill(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=1, capacity=1, timer=clock)
+        bucket.reserve()
+
+        clock.now = 1
+        assert bucket.reserve() == 0
+
+    def test_refill_capped_at_capacity(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=1, capacity=2, timer=clock)
+
+        clock.now = 100
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_try_take(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=1, capacity=1, timer=clock)
+
+        assert bucket.try_take()
+        assert not bucket.try_take()
+
+        clock.now = 1
+        assert bucket.try_take()
+
+    def test_try_take_does_not_reserve(self):
+        bucket = TokenBucket(rate=1, capacity=1, timer=Clock())
+        bucket.reserve()
+
+        assert not bucket.try_take()
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_put_back(self):
+        bucket = TokenBucket(rate=1, capacity=1, timer=Clock())
+        bucket.try_take()
+        bucket.put_back()
+        bucket.put_back()
+
+        assert bucket.try_take()
+        assert not bucket.try_take()
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRateLimiter(object):
+
+    def test_global_budget(self):
+        limiter = RateLimiter(rate=1, burst=1, timer=Clock())
+
+        assert limiter.reserve('a') == 0
+        assert limiter.reserve('b') == pytest.approx(1.0)
+
+    def test_per_key_budget(self):
+        limiter = RateLimiter(per_key_rate=1, per_key_burst=1, timer=Clock())
+
+        assert limiter.reserve('a') == 0
+        assert limiter.reserve('b') == 0
+        assert limiter.reserve('a') == pytest.approx(1.0)
+
+    def test_slowest_budget_wins(self):
+        limiter = RateLimiter(rate=10, burst=10, per_key_rate=1,
+                              per_key_burst=1, timer=Clock())
+        limiter.reserve('a')
+
+        assert limiter.reserve('a') == pytest.approx(1.0)
+
+    def test_max_keys(self):
+        limiter = RateLimiter(per_key_rate=1, max_keys=2, timer=Clock())
+
+        for key in 'abc':
+            limiter.reserve(key)
+
+        assert list(limiter._buckets) == ['b', 'c']
+
+    def test_unlimited(self):
+        limiter = RateLimiter()
+        assert limiter.reserve('a') == 0
+        assert limiter.try_acquire('a')
+
+    def test_try_acquire(self):
+        limiter = RateLimiter(rate=2, burst=2, per_key_rate=1,
+                              per_key_burst=1, timer=Clock())
+
+        assert limiter.try_acquire('a')
+        assert not limiter.try_acquire('a')
+        # The global token taken for the rejected request was put back
+        assert limiter.try_acquire('b')
+        assert not limiter.try_acquire('c')
+
+    def test_acquire_sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr('pybunpro.ratelimit.time.sleep', sleeps.append)
+        limiter = RateLimiter(rate=1, burst=1, timer=Clock())
+
+        limiter.acquire('a')
+        limiter.acquire('a')
+
+        assert sleeps == [pytest.approx(1.0)]
+
+    def test_acquire_timeout(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr('pybunpro.ratelimit.time.sleep', sleeps.append)
+        limiter = RateLimiter(rate=1, burst=1, per_key_rate=1,
+                              per_key_burst=1, timer=Clock())
+
+        assert limiter.acquire('a', timeout=0)
+        assert not limiter.acquire('a', timeout=0.5)
+        assert sleeps == []
+        # The rejected reservation was cancelled
+        assert limiter.acquire('a', timeout=1)
+        assert sleeps == [pytest.approx(1.0)]
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(rate=100, burst=1)
+
+        async def acquire():
+            await limiter.acquire_async('a')
+            await limiter.acquire_async('a')
+
+        asyncio.run(acquire())
+
+
+class TestRetryPolicy(object):
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5, random=lambda: 0.5)
+
+        assert policy.delay(0, 429) == 0.5
+        assert policy.delay(1, 429) == 1.0
+        assert policy.delay(2, 429) == 2.0
+        assert policy.delay(3, 429) is None
+
+    def test_max_backoff(self):
+        policy = RetryPolicy(max_retries=10, backoff=1, max_backoff=5,
+                             random=lambda: 1)
+        assert policy.delay(8, 429) == 5
+
+    def test_retry_after(self):
+        policy = RetryPolicy(backoff=1, random=lambda: 0.5)
+        assert policy.delay(0, 429, retry_after=10) == 10.5
+
+    def test_retry_after_too_long(self):
+        policy = RetryPolicy(max_backoff=30)
+
+        assert policy.delay(0, 429, retry_after=30) is not None
+        assert policy.delay(0, 429, retry_after=86400) is None
+
+    def test_max_retry_after(self):
+        policy = RetryPolicy(max_retry_after=120, random=lambda: 0)
+        assert policy.delay(0, 503, retry_after=100) == 100
+
+    def test_status_not_retried(self):
+        policy = RetryPolicy()
+        assert policy.delay(0, 400) is None
+
+
+class TestParseRetryAfter(object):
+
+    def test_seconds(self):
+        assert parse_retry_after('120') == 120
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+
+        assert 55 < delay <= 60
+
+    def test_date_in_past(self):
+        assert parse_retry_after('Sat, 11 May 2019 00:00:00 GMT') == 0
+
+    @pytest.mark.parametrize('value', [None, '', 'soon'])
+    def test_invalid(self, value):
+        assert parse_retry_after(value) is None
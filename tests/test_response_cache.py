@@ -0,0 +1,89 @@
+import pytest
+
+from pybunpro import Cache, ResponseCache, CacheStats
+
+
+class TestResponseCache(object):
+
+    @pytest.fixture
+    def clock(self):
+        class Clock(object):
+            now = 0.0
+
+            def __call__(self):
+                return self.now
+
+        return Clock()
+
+    def test_cache_must_implement_every_method(self):
+        class IncompleteCache(Cache):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            IncompleteCache()
+
+    def test_get_missing(self):
+        cache = ResponseCache()
+
+        assert cache.get(('key', 'study_queue', None)) is None
+        assert cache.stats == CacheStats(misses=1)
+
+    def test_set_and_get(self):
+        cache = ResponseCache()
+        cache.set(('key', 'study_queue', None), 'value')
+
+        assert cache.get(('key', 'study_queue', None)) == 'value'
+        assert cache.stats == CacheStats(hits=1, size=1)
+
+    def test_key_includes_limit(self):
+        cache = ResponseCache()
+        cache.set(('key', 'recent_items', 5), 'value')
+
+        assert cache.get(('key', 'recent_items', 10)) is None
+
+    def test_expiry(self, clock):
+        cache = ResponseCache(ttl=10, timer=clock)
+        cache.set(('key', 'study_queue', None), 'value')
+
+        clock.now = 9.9
+        assert cache.get(('key', 'study_queue', None)) == 'value'
+
+        clock.now = 10
+        assert cache.get(('key', 'study_queue', None)) is None
+        assert cache.stats == CacheStats(hits=1, misses=1, expirations=1)
+
+    def test_per_endpoint_ttl(self, clock):
+        cache = ResponseCache(ttl=10, ttls=dict(recent_items=100),
+                              timer=clock)
+        cache.set(('key', 'study_queue', None), 'queue')
+        cache.set(('key', 'recent_items', None), 'items')
+
+        clock.now = 50
+
+        assert cache.get(('key', 'study_queue', None)) is None
+        assert cache.get(('key', 'recent_items', None)) == 'items'
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(maxsize=2)
+        cache.set(('a', 'study_queue', None), 'a')
+        cache.set(('b', 'study_queue', None), 'b')
+        cache.get(('a', 'study_queue', None))
+        cache.set(('c', 'study_queue', None), 'c')
+
+        assert cache.get(('b', 'study_queue', None)) is None
+        assert cache.get(('a', 'study_queue', None)) == 'a'
+        assert cache.get(('c', 'study_queue', None)) == 'c'
+        assert cache.stats.evictions == 1
+        assert len(cache) == 2
+
+    def test_clear(self):
+        cache = ResponseCache()
+        cache.set(('a', 'study_queue', None), 'a')
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            ResponseCache(maxsize=0)
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pybunpro.singleflight import SingleFlight, AsyncSingleFlight
+
+
+class TestSingleFlight(object):
+
+    def test_do(self):
+        flight = SingleFlight()
+        assert flight.do('key', lambda: 'result') == 'result'
+        assert len(flight) == 0
+
+    @pytest.fixture
+    def blocked_call(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def call(result):
+            def fn():
+                calls.append(1)
+                started.set()
+                release.wait(5)
+
+                if isinstance(result, Exception):
+                    raise result
+
+                return result
+
+            return fn
+
+        return started, release, calls, call
+
+    def test_concurrent_calls_coalesced(self, blocked_call):
+        started, release, calls, call = blocked_call
+        flight = SingleFlight()
+        result = object()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            leader = executor.submit(flight.do, 'key', call(result))
+            started.wait(5)
+            followers = [executor.submit(flight.do, 'key', call(None))
+                         for _ in range(7)]
+            time.sleep(0.1)
+            release.set()
+
+            assert leader.result() is result
+            assert all(f.result() is result for f in followers)
+
+        assert len(calls) == 1
+        assert len(flight) == 0
+
+    def test_exception_shared(self, blocked_call):
+        started, release, calls, call = blocked_call
+        flight = SingleFlight()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, 'key',
+                                     call(ValueError('failed')))
+            started.wait(5)
+            follower = executor.submit(flight.do, 'key', call('other'))
+            time.sleep(0.1)
+            release.set()
+
+            with pytest.raises(ValueError):
+                leader.result()
+
+            with pytest.raises(ValueError):
+                follower.result()
+
+        assert len(calls) == 1
+
+    def test_follower_timeout(self, blocked_call):
+        started, release, calls, call = blocked_call
+        flight = SingleFlight()
+        result = object()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(flight.do, 'key', call(result))
+            started.wait(5)
+
+            with pytest.raises(TimeoutError):
+                flight.do('key', call(None), timeout=0.05)
+
+            release.set()
+            assert leader.result() is result
+
+        assert len(calls) == 1
+
+    def test_different_keys_not_coalesced(self):
+        flight = SingleFlight()
+        assert flight.do('a', lambda: 'a') == 'a'
+        assert flight.do('b', lambda: 'b') == 'b'
+
+
+class TestAsyncSingleFlight(object):
+
+    def test_concurrent_calls_coalesced(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def call():
+            return await asyncio.gather(
+                *(flight.do('key', fn) for _ in range(10)))
+
+        results = asyncio.run(call())
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert len(flight) == 0
+
+    def test_exception_shared(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError('failed')
+
+        async def call():
+            return await asyncio.gather(
+                *(flight.do('key', fn) for _ in range(3)),
+                return_exceptions=True)
+
+        results = asyncio.run(call())
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelled_caller_does_not_cancel_call(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        async def call():
+            first = asyncio.ensure_future(flight.do('key', fn))
+            second = asyncio.ensure_future(flight.do('key', fn))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(call()) == 'result'
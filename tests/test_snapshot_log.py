@@ -0,0 +1,110 @@
+import numpy
+import pytest
+
+from pybunpro import UserInformation, StudyQueue
+from pybunpro.snapshots import (SnapshotLog, Snapshot, RECORD, HEADER,
+                                user_id)
+
+
+class TestSnapshotLog(object):
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / 'snapshots.log')
+
+    @pytest.fixture
+    def snapshots(self):
+        return [(UserInformation(f'user{i}', 100 + i, i, 0),
+                 StudyQueue(i, 2000 + i, 2 * i, 3 * i)) for i in range(3)]
+
+    def test_empty(self, path):
+        with SnapshotLog(path) as log:
+            assert len(log) == 0
+            assert len(log.read()) == 0
+            assert list(log.records()) == []
+
+    def test_append_and_read(self, path, user_information, study_queue):
+        with SnapshotLog(path) as log:
+            log.append(user_information, study_queue, epoch=1000)
+            snapshots = log.read()
+
+        assert len(snapshots) == 1
+        snapshot = snapshots[0]
+        assert snapshot['epoch'] == 1000
+        assert snapshot['user'] == user_id(user_information.username)
+        assert snapshot['next_review'] == study_queue.next_review_timestamp
+        assert snapshot['reviews_available'] == study_queue.reviews_available
+        assert snapshot['next_hour'] == \
+            study_queue.reviews_available_next_hour
+        assert snapshot['next_day'] == study_queue.reviews_available_next_day
+        assert snapshot['ghost_review_count'] == \
+            user_information.ghost_review_count
+        assert snapshot['grammar_point_count'] == \
+            user_information.grammar_point_count
+
+    def test_fixed_width_records(self, path, snapshots):
+        with SnapshotLog(path) as log:
+            assert log.append_many(snapshots, epoch=1000) == 3
+
+        with open(path, 'rb') as f:
+            assert len(f.read()) == HEADER.size + 3 * RECORD.size
+
+    def test_read_is_memory_mapped(self, path, snapshots):
+        with SnapshotLog(path) as log:
+            log.append_many(snapshots, epoch=1000)
+            array = log.read()
+
+        assert not array.flags.owndata
+        assert not array.flags.writeable
+        assert list(array['reviews_available']) == [0, 1, 2]
+        assert numpy.sum(array['next_day']) == 9
+
+    def test_reopen_appends(self, path, snapshots):
+        with SnapshotLog(path) as log:
+            log.append_many(snapshots[:2], epoch=1000)
+
+        with SnapshotLog(path) as log:
+            log.append_many(snapshots[2:], epoch=2000)
+            assert list(log.read()['epoch']) == [1000, 1000, 2000]
+
+    def test_records(self, path, snapshots):
+        with SnapshotLog(path) as log:
+            log.append_many(snapshots, epoch=1000)
+            records = list(log.records())
+
+        assert records[1] == Snapshot(1000, user_id('user1'), 2001, 1, 2, 3,
+                                      1, 101)
+
+    def test_filter_by_user(self, path, snapshots):
+        with SnapshotLog(path) as log:
+            for epoch in range(5):
+                log.append_many(snapshots, epoch=epoch)
+
+            array = log.read()
+
+        mine = array[array['user'] == user_id('user2')]
+        assert list(mine['epoch']) == [0, 1, 2, 3, 4]
+
+    def test_incomplete_record_discarded(self, path, snapshots):
+        with SnapshotLog(path) as log:
+            log.append_many(snapshots, epoch=1000)
+
+        with open(path, 'ab') as f:
+            f.write(b'partial')
+
+        with SnapshotLog(path) as log:
+            assert len(log) == 3
+            log.append_many(snapshots[:1], epoch=2000)
+            assert list(log.read()['epoch']) == [1000, 1000, 1000, 2000]
+
+    def test_not_a_snapshot_log(self, path):
+        with open(path, 'wb') as f:
+            f.write(b'something else entirely')
+
+        with pytest.raises(ValueError):
+            SnapshotLog(path)
+
+    def test_user_id(self):
+        assert user_id('a') == user_id('a')
+        assert user_id('a') != user_id('b')
+        assert 0 <= user_id('a') < 2 ** 64
@@ -0,0 +1,156 @@
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+
+import pytest
+
+from pybunpro import SQLiteCache, CacheStats, GrammarPoint
+
+
+class TestSQLiteCache(object):
+
+    @pytest.fixture
+    def clock(self):
+        class Clock(object):
+            now = 1000.0
+
+            def __call__(self):
+                return self.now
+
+        return Clock()
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / 'cache.sqlite')
+
+    @pytest.fixture
+    def study_queue_result(self, user_information, study_queue):
+        return user_information, study_queue
+
+    @pytest.fixture
+    def recent_items_result(self, user_information, grammar_point):
+        return user_information, [grammar_point, grammar_point]
+
+    def test_get_missing(self, path):
+        cache = SQLiteCache(path)
+
+        assert cache.get(('key', 'study_queue', None)) is None
+        assert cache.stats == CacheStats(misses=1)
+
+    def test_study_queue_round_trip(self, path, study_queue_result):
+        cache = SQLiteCache(path)
+        cache.set(('key', 'study_queue', None), study_queue_result)
+
+        assert cache.get(('key', 'study_queue', None)) == study_queue_result
+        assert cache.stats == CacheStats(hits=1, size=1)
+
+    def test_recent_items_round_trip(self, path, recent_items_result):
+        cache = SQLiteCache(path)
+        cache.set(('key', 'recent_items', 5), recent_items_result)
+
+        user_information, grammar_points = cache.get(
+            ('key', 'recent_items', 5))
+        assert (user_information, grammar_points) == recent_items_result
+        assert all(isinstance(g, GrammarPoint) for g in grammar_points)
+        assert cache.get(('key', 'recent_items', 10)) is None
+
+    def test_shared_between_instances(self, path, study_queue_result):
+        SQLiteCache(path).set(('key', 'study_queue', None),
+                              study_queue_result)
+
+        assert SQLiteCache(path).get(('key', 'study_queue', None)) == \
+            study_queue_result
+
+    def test_api_keys_not_stored(self, path, api_key, study_queue_result):
+        SQLiteCache(path).set((api_key, 'study_queue', None),
+                              study_queue_result)
+
+        with open(path, 'rb') as f:
+            assert api_key.encode() not in f.read()
+
+    def test_wal_mode(self, path):
+        SQLiteCache(path)
+
+        with sqlite3.connect(path) as connection:
+            assert connection.execute('PRAGMA journal_mode').fetchone() == \
+                ('wal',)
+
+    def test_expiry(self, path, clock, study_queue_result):
+        cache = SQLiteCache(path, ttl=10, ttls=dict(recent_items=100),
+                            timer=clock)
+        cache.set(('key', 'study_queue', None), study_queue_result)
+
+        clock.now += 9.9
+        assert cache.get(('key', 'study_queue', None)) is not None
+
+        clock.now += 0.1
+        assert cache.get(('key', 'study_queue', None)) is None
+        assert cache.stats == CacheStats(hits=1, misses=1, expirations=1,
+                                         size=1)
+
+    def test_expired_entries_removed_on_set(self, path, clock,
+                                            study_queue_result):
+        cache = SQLiteCache(path, ttl=10, timer=clock)
+        cache.set(('a', 'study_queue', None), study_queue_result)
+
+        clock.now += 10
+        cache.set(('b', 'study_queue', None), study_queue_result)
+
+        assert len(cache) == 1
+
+    def test_eviction(self, path, clock, study_queue_result):
+        cache = SQLiteCache(path, maxsize=2, timer=clock)
+
+        for key in 'abc':
+            clock.now += 1
+            cache.set((key, 'study_queue', None), study_queue_result)
+
+        assert cache.get(('a', 'study_queue', None)) is None
+        assert cache.get(('c', 'study_queue', None)) is not None
+        assert cache.stats.evictions == 1
+        assert len(cache) == 2
+
+    def test_unsupported_endpoint(self, path):
+        cache = SQLiteCache(path)
+        cache.set(('key', 'other', None), ('a', 'b'))
+
+        assert len(cache) == 0
+
+    def test_clear(self, path, study_queue_result):
+        cache = SQLiteCache(path)
+        cache.set(('key', 'study_queue', None), study_queue_result)
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_schema_version_change(self, path, study_queue_result):
+        SQLiteCache(path).set(('key', 'study_queue', None),
+                              study_queue_result)
+
+        with sqlite3.connect(path) as connection:
+            connection.execute('PRAGMA user_version = 0')
+
+        assert len(SQLiteCache(path)) == 0
+
+    def test_invalid_maxsize(self, path):
+        with pytest.raises(ValueError):
+            SQLiteCache(path, maxsize=0)
+
+    def test_concurrent_writers(self, path, study_queue_result):
+        caches = [SQLiteCache(path), SQLiteCache(path)]
+
+        def work(i):
+            cache = caches[i % 2]
+            cache.set((str(i), 'study_queue', None), study_queue_result)
+            return cache.get((str(i), 'study_queue', None))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(work, range(100)))
+
+        assert results == [study_queue_result] * 100
+        assert len(caches[0]) == 100
+
+    def test_close(self, path):
+        cache = SQLiteCache(path)
+        cache.close()
+
+        assert len(cache) == 0
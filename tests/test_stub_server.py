@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+
+import pytest
+import requests
+
+from click.testing import CliRunner
+
+from pybunpro import BunproClient, BunproAPIError
+from pybunpro.__main__ import cli
+from pybunpro.aio import AsyncBunproClient
+from pybunpro.stubserver import StubServer, parse_latency
+
+
+class TestParseLatency(object):
+
+    @pytest.mark.parametrize('spec', ['0.25', 'constant:0.25'])
+    def test_constant(self, spec):
+        assert parse_latency(spec)(random.Random(0)) == 0.25
+
+    def test_uniform(self):
+        latency = parse_latency('uniform:0.1,0.2')
+        rng = random.Random(0)
+        assert all(0.1 <= latency(rng) <= 0.2 for _ in range(100))
+
+    def test_lognormal(self):
+        latency = parse_latency('lognormal:0.05,0.5')
+        rng = random.Random(0)
+        samples = sorted(latency(rng) for _ in range(1001))
+        assert samples[500] == pytest.approx(0.05, rel=0.2)
+
+    @pytest.mark.parametrize('spec', ['normal:1', 'uniform:1', 'fast'])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_latency(spec)
+
+
+class TestStubServer(object):
+
+    @pytest.fixture
+    def stub(self):
+        with StubServer(seed=0) as stub:
+            yield stub
+
+    def test_study_queue(self, stub):
+        with BunproClient('key', base_url=stub.url) as client:
+            user_information, study_queue = client.study_queue()
+            again = client.study_queue()
+
+        assert user_information.username.startswith('user-')
+        assert (user_information, study_queue) == again
+        assert stub.requests == {200: 2}
+
+    def test_users_differ_by_key(self, stub):
+        with BunproClient(base_url=stub.url) as client:
+            first, _ = client.study_queue(api_key='first')
+            second, _ = client.study_queue(api_key='second')
+
+        assert first.username != second.username
+
+    def test_recent_items_limit(self, stub):
+        user_information, _, grammar_points = stub.user('key')
+        limit = min(len(grammar_points), 5)
+
+        with BunproClient('key', base_url=stub.url) as client:
+            _, recent = client.recent_items(limit=limit)
+            _, everything = client.recent_items()
+
+        assert len(recent) == limit
+        assert len(everything) == min(user_information['grammar_point_count'],
+                                      50)
+        updated = [g.updated_at_timestamp for g in everything]
+        assert updated == sorted(updated, reverse=True)
+
+    def test_invalid_key(self):
+        with StubServer(valid_keys={'valid'}) as stub, \
+                BunproClient(base_url=stub.url) as client:
+            client.study_queue(api_key='valid')
+
+            with pytest.raises(BunproAPIError) as e:
+                client.study_queue(api_key='invalid')
+
+        assert e.value.status_code == 400
+        assert e.value.errors == ['User does not exist.']
+
+    def test_unknown_path(self, stub):
+        assert requests.get(f'{stub.url}/key/unknown').status_code == 404
+
+    def test_errors(self):
+        with StubServer(error_rate=1) as stub, \
+                BunproClient('key', base_url=stub.url) as client:
+            with pytest.raises(BunproAPIError) as e:
+                client.study_queue()
+
+        assert e.value.status_code == 500
+
+    def test_rate_limited(self):
+        with StubServer(rate_limit_rate=1, retry_after=2) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             retry_policy=None) as client:
+            with pytest.raises(BunproAPIError) as e:
+                client.study_queue()
+
+        assert e.value.status_code == 429
+        assert e.value.retry_after == 2
+
+    def test_rates_are_seeded(self):
+        def statuses():
+            with StubServer(error_rate=0.3, rate_limit_rate=0.3, seed=1) \
+                    as stub:
+                return [requests.get(f'{stub.url}/key/study_queue')
+                        .status_code for _ in range(20)]
+
+        first = statuses()
+        assert first == statuses()
+        assert set(first) == {200, 429, 500}
+
+    def test_invalid_rates(self):
+        with pytest.raises(ValueError):
+            StubServer(error_rate=0.6, rate_limit_rate=0.6)
+
+    def test_latency_and_slow_body(self):
+        with StubServer(latency=lambda rng: 0.05, body_duration=0.1,
+                        body_chunks=4) as stub, \
+                BunproClient('key', base_url=stub.url) as client:
+            start = time.monotonic()
+            client.recent_items()
+
+        assert time.monotonic() - start >= 0.15
+
+    def test_async_client(self, stub):
+        async def call():
+            async with AsyncBunproClient('key', base_url=stub.url) as client:
+                return await client.study_queue()
+
+        with BunproClient('key', base_url=stub.url) as client:
+            assert asyncio.run(call()) == client.study_queue()
+
+    def test_cli(self, stub):
+        result = CliRunner().invoke(cli, ['--base-url', stub.url,
+                                          '--api-key', 'key', 'study-queue',
+                                          '--format', 'json'])
+
+        assert result.exit_code == 0
+        assert stub.user('key')[0]['username'] in result.output
@@ -16,3 +16,17 @@ class TestStudyQueue(object):
             reviews_available_next_hour
         assert study_queue.reviews_available_next_day == \
             reviews_available_next_day
+
+    def test_slots(self, study_queue):
+        assert not hasattr(study_queue, '__dict__')
+
+    def test_lazy_timestamps(self, reviews_available, next_review_date,
+                             next_review_date_ts,
+                             reviews_available_next_hour,
+                             reviews_available_next_day):
+        study_queue = StudyQueue(reviews_available, next_review_date_ts,
+                                 reviews_available_next_hour,
+                                 reviews_available_next_day)
+
+        assert study_queue.next_review_date == next_review_date
+        assert study_queue.next_review_timestamp == next_review_date_ts
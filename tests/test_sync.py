@@ -0,0 +1,140 @@
+import pytest
+
+from pybunpro import UserInformation, GrammarPoint
+from pybunpro.sync import GrammarPointStore, sync_recent_items
+
+
+class FakeClient(object):
+    """
+    Serves recent items from a history ordered most recently updated first
+    """
+
+    def __init__(self, api_key, history):
+        self.api_key = api_key
+        self.history = history
+        self.limits = []
+
+    def recent_items(self, limit=None, api_key=None):
+        self.limits.append(limit)
+        user_information = UserInformation('username', len(self.history), 0,
+                                           0)
+        return user_information, self.history[:limit]
+
+
+def history(count, start=0):
+    return [GrammarPoint(f'point {i}', 1000 + i, 1000 + i)
+            for i in reversed(range(start, start + count))]
+
+
+class TestSync(object):
+
+    @pytest.fixture
+    def store(self):
+        return GrammarPointStore()
+
+    def test_first_sync(self, api_key, store):
+        client = FakeClient(api_key, history(20))
+
+        result = sync_recent_items(client, store)
+
+        assert client.limits == [50]
+        assert len(result.added) == 20
+        assert result.updated == []
+        assert result.requests == 1
+        assert store.count(api_key) == 20
+        assert store.high_water_mark(api_key) == 1019
+
+    def test_nothing_new(self, api_key, store):
+        client = FakeClient(api_key, history(20))
+        sync_recent_items(client, store)
+
+        result = sync_recent_items(client, store)
+
+        assert client.limits == [50, 5]
+        assert result.added == result.updated == []
+
+    def test_few_new(self, api_key, store):
+        client = FakeClient(api_key, history(20))
+        sync_recent_items(client, store)
+        client.history = history(3, start=20) + client.history
+
+        result = sync_recent_items(client, store)
+
+        assert client.limits == [50, 5]
+        assert [g.grammar_point for g in result.added] == \
+            ['point 22', 'point 21', 'point 20']
+        assert store.count(api_key) == 23
+
+    def test_many_new_raises_limit(self, api_key, store):
+        client = FakeClient(api_key, history(20))
+        sync_recent_items(client, store)
+        client.history = history(12, start=20) + client.history
+
+        result = sync_recent_items(client, store)
+
+        assert client.limits == [50, 5, 13]
+        assert len(result.added) == 12
+        assert result.requests == 2
+        assert result.limit == 13
+        assert store.count(api_key) == 32
+
+    def test_updated(self, api_key, store):
+        client = FakeClient(api_key, history(20))
+        sync_recent_items(client, store)
+        client.history = [GrammarPoint('point 3', 1003, 2000)] + \
+            client.history
+
+        result = sync_recent_items(client, store)
+
+        assert result.added == []
+        assert [g.grammar_point for g in result.updated] == ['point 3']
+        assert store.high_water_mark(api_key) == 2000
+        assert store.grammar_points(api_key)[0] == \
+            GrammarPoint('point 3', 1003, 2000)
+
+    def test_users_are_separate(self, store):
+        sync_recent_items(FakeClient('a', history(3)), store)
+        sync_recent_items(FakeClient('b', history(2)), store, api_key='b')
+
+        assert store.count('a') == 3
+        assert store.count('b') == 2
+        assert store.high_water_mark('c') is None
+
+    def test_grammar_points(self, api_key, store):
+        sync_recent_items(FakeClient(api_key, history(3)), store)
+
+        batch = store.grammar_points(api_key)
+
+        assert list(batch.grammar_points) == ['point 2', 'point 1',
+                                              'point 0']
+        assert list(batch.updated_at_epochs) == [1002, 1001, 1000]
+
+    def test_persistent(self, api_key, tmp_path):
+        path = str(tmp_path / 'store.sqlite')
+        store = GrammarPointStore(path)
+        sync_recent_items(FakeClient(api_key, history(3)), store)
+        store.close()
+
+        assert GrammarPointStore(path).count(api_key) == 3
+
+    def test_api_key_not_stored(self, api_key, tmp_path):
+        path = tmp_path / 'store.sqlite'
+        store = GrammarPointStore(str(path))
+        sync_recent_items(FakeClient(api_key, history(3)), store)
+        store.close()
+
+        assert api_key.encode() not in path.read_bytes()
+
+    @pytest.mark.parametrize('min_limit', [0, 51])
+    def test_invalid_min_limit(self, api_key, store, min_limit):
+        with pytest.raises(ValueError):
+            sync_recent_items(FakeClient(api_key, []), store,
+                              min_limit=min_limit)
+
+    def test_no_api_key(self, store):
+        client = FakeClient(None, [])
+
+        with pytest.raises(ValueError):
+            sync_recent_items(client, store)
+
+        assert client.limits == []
@@ -0,0 +1,219 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+
+import pytest
+from urllib3 import HTTPResponse
+
+from pybunpro import (BunproClient, BunproAPIError, BunproTimeoutError,
+                      HedgePolicy, MetricsRecorder, RateLimiter, RetryPolicy)
+from pybunpro.aio import AsyncBunproClient
+from pybunpro.stubserver import StubServer
+
+
+class TestTimeouts(object):
+
+    def test_read_timeout(self):
+        with StubServer(latency=lambda rng: 0.5) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             read_timeout=0.05) as client:
+            started = time.monotonic()
+
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue()
+
+            elapsed = time.monotonic() - started
+
+        assert elapsed < 0.4
+
+    def test_slow_body(self):
+        with StubServer(body_duration=1) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             read_timeout=0.05) as client:
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue()
+
+    @pytest.mark.skipif(not hasattr(HTTPResponse, 'read1'),
+                        reason='urllib3 before 2.2 waits for full chunks')
+    def test_slow_body_deadline(self):
+        with StubServer(body_duration=3, body_chunks=30) as stub, \
+                BunproClient('key', base_url=stub.url) as client:
+            started = time.monotonic()
+
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue(deadline=0.5)
+
+            elapsed = time.monotonic() - started
+
+            # The connection of the abandoned body is not reused
+            user_information, _ = client.study_queue(deadline=5)
+
+        assert elapsed < 0.8
+        assert user_information.username
+
+    def test_timeout_is_distinguishable(self):
+        error = BunproTimeoutError('The deadline passed')
+
+        assert isinstance(error, TimeoutError)
+        assert not isinstance(error, BunproAPIError)
+        assert error.message == 'The deadline passed'
+
+    def test_call_deadline(self):
+        recorder = MetricsRecorder()
+
+        with StubServer(latency=lambda rng: 0.5) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             metrics=recorder) as client:
+            started = time.monotonic()
+
+            with pytest.raises(BunproTimeoutError):
+                client.recent_items(deadline=0.1)
+
+            elapsed = time.monotonic() - started
+
+        assert elapsed < 0.4
+        metrics, = recorder.records
+        assert metrics.outcome == 'error'
+        assert isinstance(metrics.error, BunproTimeoutError)
+
+    def test_client_deadline(self):
+        with StubServer(latency=lambda rng: 0.5) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             deadline=0.1) as client:
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue()
+
+    def test_deadline_covers_retries(self):
+        with StubServer(rate_limit_rate=1, retry_after=1) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             retry_policy=RetryPolicy(max_retries=5),
+                             deadline=0.5) as client:
+            started = time.monotonic()
+
+            with pytest.raises(BunproTimeoutError) as e:
+                client.study_queue()
+
+            elapsed = time.monotonic() - started
+
+        # Gives up straight away rather than backing off past the deadline
+        assert elapsed < 0.4
+        assert isinstance(e.value.__cause__, BunproAPIError)
+        assert stub.requests == {429: 1}
+
+    def test_deadline_covers_rate_limit(self):
+        limiter = RateLimiter(rate=0.1, burst=1)
+
+        with StubServer() as stub, \
+                BunproClient('key', base_url=stub.url,
+                             rate_limiter=limiter) as client:
+            client.study_queue()
+
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue(deadline=0.1)
+
+        assert stub.requests == {200: 1}
+        # The rejected call gave its reservation back
+        assert not limiter.acquire('key', timeout=5)
+
+    def test_deadline_covers_hedges(self):
+        with StubServer(latency=lambda rng: 0.5) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             hedge_policy=HedgePolicy(delay=0.05),
+                             deadline=0.2) as client:
+            started = time.monotonic()
+
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue()
+
+            elapsed = time.monotonic() - started
+
+        assert elapsed < 0.4
+
+    def test_coalesced_deadline(self):
+        with StubServer(latency=lambda rng: 1) as stub, \
+                BunproClient('key', base_url=stub.url,
+                             coalesce=True) as client, \
+                ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(client.study_queue)
+            time.sleep(0.1)
+            started = time.monotonic()
+
+            with pytest.raises(BunproTimeoutError):
+                client.study_queue(deadline=0.2)
+
+            elapsed = time.monotonic() - started
+
+            # The follower timing out does not affect the leader
+            user_information, _ = leader.result()
+
+        assert elapsed < 0.5
+        assert user_information.username
+        assert stub.requests == {200: 1}
+
+    def test_async_read_timeout(self):
+        async def call(url):
+            async with AsyncBunproClient('key', base_url=url,
+                                         read_timeout=0.05) as client:
+                await client.study_queue()
+
+        with StubServer(latency=lambda rng: 0.5) as stub:
+            with pytest.raises(BunproTimeoutError):
+                asyncio.run(call(stub.url))
+
+    def test_async_deadline(self):
+        async def call(url):
+            async with AsyncBunproClient('key', base_url=url) as client:
+                started = time.monotonic()
+
+                with pytest.raises(BunproTimeoutError):
+                    await client.recent_items(deadline=0.1)
+
+                return time.monotonic() - started
+
+        with StubServer(body_duration=0.5) as stub:
+            assert asyncio.run(call(stub.url)) < 0.4
+
+    def test_async_deadline_covers_retries(self):
+        async def call(url):
+            async with AsyncBunproClient('key', base_url=url,
+                                         deadline=0.5) as client:
+                await client.study_queue()
+
+        with StubServer(rate_limit_rate=1, retry_after=1) as stub:
+            with pytest.raises(BunproTimeoutError):
+                asyncio.run(call(stub.url))
+
+        assert stub.requests == {429: 1}
+
+    def test_async_cancellation(self):
+        async def call(url):
+            async with AsyncBunproClient('key', base_url=url) as client:
+                task = asyncio.ensure_future(client.study_queue())
+                await asyncio.sleep(0.05)
+                task.cancel()
+
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+                return await client.study_queue(deadline=5)
+
+        with StubServer(latency=lambda rng: 0.2) as stub:
+            user_information, study_queue = asyncio.run(call(stub.url))
+
+        assert user_information.username
+
+    def test_async_coalesced_deadline(self):
+        async def call(url):
+            async with AsyncBunproClient('key', base_url=url,
+                                         coalesce=True) as client:
+                return await asyncio.gather(client.study_queue(),
+                                            client.study_queue(deadline=0.05),
+                                            return_exceptions=True)
+
+        with StubServer(latency=lambda rng: 0.2) as stub:
+            result, error = asyncio.run(call(stub.url))
+
+        # The caller which timed out did not cancel the shared request
+        assert isinstance(error, BunproTimeoutError)
+        assert result[0].username
+        assert stub.requests == {200: 1}
@@ -11,3 +11,15 @@ class TestUserInformation(object):
         assert user_info.grammar_point_count == grammar_point_count
         assert user_info.ghost_review_count == ghost_review_count
         assert user_info.creation_date == creation_date
+
+    def test_slots(self, user_information):
+        assert not hasattr(user_information, '__dict__')
+
+    def test_lazy_timestamps(self, username, grammar_point_count,
+                             ghost_review_count, creation_date,
+                             creation_date_ts):
+        user_info = UserInformation(username, grammar_point_count,
+                                    ghost_review_count, creation_date_ts)
+
+        assert user_info.creation_date == creation_date
+        assert user_info.creation_timestamp == creation_date_ts
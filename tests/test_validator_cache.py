@@ -0,0 +1,44 @@
+import pytest
+
+from pybunpro import ValidatorCache, Validators
+
+
+class TestValidatorCache(object):
+
+    def test_get_missing(self):
+        cache = ValidatorCache()
+        assert cache.get('url') is None
+
+    def test_set_and_get(self):
+        cache = ValidatorCache()
+        validators = Validators('"etag"', None, b'digest', 'result')
+        cache.set('url', validators)
+
+        assert cache.get('url') is validators
+
+    def test_lru_eviction(self):
+        cache = ValidatorCache(maxsize=1)
+        cache.set('a', Validators(None, None, b'a', 'a'))
+        cache.set('b', Validators(None, None, b'b', 'b'))
+
+        assert cache.get('a') is None
+        assert len(cache) == 1
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            ValidatorCache(maxsize=0)
+
+
+class TestValidators(object):
+
+    def test_request_headers(self):
+        validators = Validators('"etag"', 'Sat, 11 May 2019 00:00:00 GMT',
+                                b'digest', 'result')
+
+        assert validators.request_headers() == {
+            'If-None-Match': '"etag"',
+            'If-Modified-Since': 'Sat, 11 May 2019 00:00:00 GMT'}
+
+    def test_request_headers_without_validators(self):
+        validators = Validators(None, None, b'digest', 'result')
+        assert validators.request_headers() == dict()
@@ -0,0 +1,106 @@
+import pytest
+import requests
+
+from pybunpro import BunproAPIError, BunproTimeoutError, StudyQueue
+from pybunpro.watch import next_poll_delay, watch_study_queue
+
+
+class FakeClient(object):
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def study_queue(self, api_key=None):
+        self.calls += 1
+        result = self.results.pop(0)
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+def api_error(status_code):
+    return BunproAPIError(Exception(), status_code, dict(errors=[]), dict())
+
+
+class TestWatch(object):
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr('pybunpro.watch.time.sleep', sleeps.append)
+        return sleeps
+
+    @pytest.mark.parametrize('queue,expected', [
+        # Next review in 10 minutes, nothing else due
+        (StudyQueue(0, 1600, 0, 3), 601),
+        # Next review far off
+        (StudyQueue(0, 100000, 0, 0), 900),
+        # Next review due soon, but clamped to the minimum interval
+        (StudyQueue(0, 1005, 0, 0), 30),
+        # Reviews available now
+        (StudyQueue(5, 900, 0, 0), 30),
+        # Nothing available and no reviews scheduled
+        (StudyQueue(0, 900, 0, 0), 900),
+        # Many reviews coming due within the hour
+        (StudyQueue(0, 3000, 20, 20), 180),
+    ])
+    def test_next_poll_delay(self, queue, expected):
+        assert next_poll_delay(queue, 1000) == expected
+
+    def test_yields_changes_only(self, sleeps, user_information,
+                                 study_queue):
+        changed = StudyQueue(0, study_queue.next_review_date, 0, 0)
+        client = FakeClient([(user_information, study_queue),
+                             (user_information, study_queue),
+                             (user_information, changed)])
+
+        watch = watch_study_queue(client, timer=lambda: 0)
+
+        assert next(watch) == (user_information, study_queue)
+        assert next(watch) == (user_information, changed)
+        assert client.calls == 3
+        assert len(sleeps) == 2
+
+    def test_transient_failures(self, sleeps, user_information,
+                                study_queue):
+        client = FakeClient([BunproTimeoutError('timed out'),
+                             api_error(503),
+                             requests.ConnectionError('refused'),
+                             api_error(429),
+                             api_error(500),
+                             (user_information, study_queue)])
+
+        watch = watch_study_queue(client, min_interval=30, max_interval=100,
+                                  timer=lambda: 0)
+
+        assert next(watch) == (user_information, study_queue)
+        assert sleeps == [30, 60, 100, 100, 100]
+
+    def test_backoff_resets(self, sleeps, user_information, study_queue):
+        changed = StudyQueue(0, study_queue.next_review_date, 0, 0)
+        client = FakeClient([api_error(502),
+                             (user_information, study_queue),
+                             api_error(502),
+                             (user_information, changed)])
+
+        watch = watch_study_queue(client, timer=lambda: 0)
+
+        assert next(watch) == (user_information, study_queue)
+        assert next(watch) == (user_information, changed)
+        assert sleeps[0] == sleeps[2] == 30
+
+    def test_fatal_failure(self, sleeps):
+        client = FakeClient([api_error(400)])
+
+        with pytest.raises(BunproAPIError):
+            next(watch_study_queue(client))
+
+        assert sleeps == []
+
+    def test_invalid_intervals(self):
+        with pytest.raises(ValueError):
+            next(watch_study_queue(FakeClient([]), min_interval=60,
+                                   max_interval=30))